@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url
@@ -12,12 +13,14 @@ load_dotenv(os.path.join(BASE_DIR, '.env'))
 
 SECRET_KEY = os.getenv("SECRET_KEY", "unsafe-secret")
 
-# DEBUG = os.getenv("DEBUG", "0") == "1"
-DEBUG = True
+# Off unless DEBUG=1 (set it in .env for local development, see .env.example):
+# with DEBUG on, static URLs are not content-hashed (see home/storage.py)
+DEBUG = os.getenv("DEBUG", "0") == "1"
 
-CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
+CSRF_TRUSTED_ORIGINS = [o for o in os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",") if o]
 
-ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
+# Local hosts only unless ALLOWED_HOSTS lists the site's domains
+ALLOWED_HOSTS = [h for h in os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1,[::1]").split(",") if h]
 
 
 # Application definition
@@ -47,6 +50,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'home.middleware.CatalogVersionMiddleware',
 ]
 
 ROOT_URLCONF = 'ExtraPaints.urls'
@@ -118,7 +122,17 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'static'))
+
+# Hashed file names plus .gz/.br siblings, written by collectstatic (see home/storage.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'home.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# manage.py test runs without a collected manifest
+if sys.argv[1:2] == ['test']:
+    STORAGES['staticfiles'] = {'BACKEND': 'home.storage.CheckedStaticFilesStorage'}
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -174,3 +188,61 @@ ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'jamesmatata@schnell.solutions')
 
 
 
+
+# ----------------------------------------------------------------------
+#                         IMAGE PROCESSING
+# ----------------------------------------------------------------------
+
+# Worker processes for photo palette extraction (kept off the web workers)
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+
+# Seconds a request waits for the image pool before giving up
+IMAGE_PROCESSING_TIMEOUT = int(os.getenv('IMAGE_PROCESSING_TIMEOUT', 10))
+
+# Largest customer photo accepted, in bytes
+IMAGE_UPLOAD_MAX_SIZE = int(os.getenv('IMAGE_UPLOAD_MAX_SIZE', 20 * 1024 * 1024))
+
+# Visualizer renders are cached here; keep it outside MEDIA_ROOT/STATIC_ROOT so nginx never serves them
+VISUALIZER_CACHE_ROOT = os.getenv('VISUALIZER_CACHE_ROOT', os.path.join(BASE_DIR, 'var', 'visualizer'))
+
+# Seconds a cached render is kept, and the most disk the render cache may use, in bytes
+VISUALIZER_CACHE_TTL = int(os.getenv('VISUALIZER_CACHE_TTL', 60 * 60 * 24))
+VISUALIZER_CACHE_MAX_BYTES = int(os.getenv('VISUALIZER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Each worker prunes the render cache after this many writes (or run prune_visualizer_cache from cron),
+# so the cache can briefly overshoot its cap by this many renders per worker
+VISUALIZER_CACHE_PRUNE_EVERY = int(os.getenv('VISUALIZER_CACHE_PRUNE_EVERY', 100))
+
+# ----------------------------------------------------------------------
+#                         VIEW TRACKING
+# ----------------------------------------------------------------------
+
+# Seconds between writes of the buffered view counts (also the most a crashed worker can lose)
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', 60))
+
+# ----------------------------------------------------------------------
+#                         CATALOG FEEDS
+# ----------------------------------------------------------------------
+
+# Public origin used for absolute links in exported feeds
+SITE_URL = os.getenv('SITE_URL', 'https://extrapaints.co.ke')
+
+# Shared secret partners pass as ?token= to fetch /products/feed.*; empty allows staff only
+CATALOG_FEED_TOKEN = os.getenv('CATALOG_FEED_TOKEN', '')
+
+# ----------------------------------------------------------------------
+#                         SITEMAPS
+# ----------------------------------------------------------------------
+
+# Where generate_sitemaps writes sitemap.xml and its shards (served by nginx at the site root)
+SITEMAP_ROOT = os.getenv('SITEMAP_ROOT', os.path.join(STATIC_ROOT, 'sitemaps'))
+
+# ----------------------------------------------------------------------
+#                         SAFETY DOCUMENTS
+# ----------------------------------------------------------------------
+
+# Hand safety documents to nginx with X-Accel-Redirect; set to 0 when running without nginx
+SAFETY_DOCS_X_ACCEL = os.getenv('SAFETY_DOCS_X_ACCEL', '1') == '1'
+
+# Processes extracting searchable text from safety document PDFs (extract_document_text)
+DOCUMENT_TEXT_WORKERS = int(os.getenv('DOCUMENT_TEXT_WORKERS', 2))
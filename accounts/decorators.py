@@ -0,0 +1,27 @@
+from functools import wraps
+
+from django.http import JsonResponse
+
+from .models import User
+
+
+def is_trade_user(user):
+    """Distributors and staff can use the trade tools (tint formulas, bulk lookups)."""
+    return user.is_authenticated and (
+        user.is_staff or user.role in (User.Roles.DISTRIBUTOR, User.Roles.STAFF, User.Roles.ADMIN)
+    )
+
+
+def trade_required(view_func):
+    """
+    For AJAX/API views: returns a JSON 403 instead of redirecting to the login page
+    when the user isn't a distributor or staff member.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not is_trade_user(request.user):
+            return JsonResponse(
+                {'status': 'error', 'message': 'This tool is available to distributors only.'}, status=403
+            )
+        return view_func(request, *args, **kwargs)
+    return wrapper
@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
 
+from home import counters
+
 
 class User(AbstractUser):
     """
@@ -33,6 +35,11 @@ class User(AbstractUser):
     is_email_verified = models.BooleanField(default=False)
     is_phone_verified = models.BooleanField(default=False)
 
+    # "My Collection" totals, maintained by the bookmark code (see home/counters.py)
+    saved_colors_count = models.PositiveIntegerField(default=0, editable=False)
+    saved_products_count = models.PositiveIntegerField(default=0, editable=False)
+    saved_ideas_count = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         """
         Returns a human-readable identifier for the user.
@@ -40,6 +47,10 @@ class User(AbstractUser):
         """
         return self.username or self.email
 
+    def save(self, *args, **kwargs):
+        counters.exclude_counters(self, kwargs)
+        super().save(*args, **kwargs)
+
 
 class Address(models.Model):
     """
@@ -1,3 +1,16 @@
+from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
 
-# Create your tests here.
+from .decorators import is_trade_user
+from .models import User
+
+
+class TradeUserTests(TestCase):
+    def test_distributors_and_staff_are_trade_users(self):
+        for role in (User.Roles.DISTRIBUTOR, User.Roles.STAFF, User.Roles.ADMIN):
+            self.assertTrue(is_trade_user(User(username=role, role=role)))
+        self.assertTrue(is_trade_user(User(username="ops", is_staff=True)))
+
+    def test_customers_and_visitors_are_not(self):
+        self.assertFalse(is_trade_user(User(username="jo", role=User.Roles.CUSTOMER)))
+        self.assertFalse(is_trade_user(AnonymousUser()))
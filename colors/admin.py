@@ -1,4 +1,6 @@
 from django.contrib import admin
+
+from .codes import resolve_codes, split_codes
 from .models import (
     ColorCollection,
     Finish,
@@ -7,6 +9,10 @@ from .models import (
     ColorImage,
     Color,
     SavedColor,
+    Colorant,
+    TintBase,
+    ColorHarmony,
+    ColorContrastPair,
 )
 
 
@@ -76,6 +82,8 @@ class ColorAdmin(admin.ModelAdmin):
         "undertone",
         "opacity_strength",
         "is_active",
+        "save_count",
+        "view_count",
         "created_at",
         "color_preview",  # <--- Added color_preview to list_display for quick view
     )
@@ -90,7 +98,8 @@ class ColorAdmin(admin.ModelAdmin):
 
     # FIX: Removed 'prepopulated_fields' entirely because 'slug' is in 'readonly_fields'.
     # The slug generation logic is safely handled in the Color model's save() method.
-    readonly_fields = ("created_at", "updated_at", "slug", "color_preview")
+    readonly_fields = ("created_at", "updated_at", "slug", "color_preview",
+                       "red", "green", "blue", "hue", "saturation", "lightness", "lab_l", "lab_a", "lab_b")
 
     autocomplete_fields = ("collection",)
     filter_horizontal = (
@@ -130,6 +139,10 @@ class ColorAdmin(admin.ModelAdmin):
         ("Technical Details", {
             "fields": ("coverage_per_liter", "drying_time_hours")
         }),
+        ("Color Channels (derived from HEX)", {
+            "classes": ("collapse",),
+            "fields": (("red", "green", "blue"), ("hue", "saturation", "lightness"), ("lab_l", "lab_a", "lab_b"))
+        }),
         ("Images", {
             "fields": ("main_image",)
         }),
@@ -147,6 +160,22 @@ class ColorAdmin(admin.ModelAdmin):
     color_preview.allow_tags = True
     color_preview.short_description = "Preview"
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        On the changelist, a comma/line separated list of codes (e.g. pasted from an
+        order) is resolved in one query, on top of the normal search_fields matches.
+        Autocomplete widgets keep the plain search.
+        """
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        raw_codes = split_codes(search_term)
+        changelist = f"{self.opts.app_label}_{self.opts.model_name}_changelist"
+        if len(raw_codes) < 2 or getattr(request.resolver_match, "url_name", None) != changelist:
+            return results, may_have_duplicates
+        # The code index only covers active colors, so also try the codes as typed
+        resolved = {r["code"] for r in resolve_codes(raw_codes, fuzzy=False) if r["code"]}
+        by_code = queryset.filter(code__in=resolved | {code.upper() for code in raw_codes})
+        return results | by_code, may_have_duplicates
+
 
 # --- SavedColor Admin ---
 @admin.register(SavedColor)
@@ -157,4 +186,54 @@ class SavedColorAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "color__name", "color__code")
     autocomplete_fields = ("user", "color")
     readonly_fields = ("saved_at",)
-    ordering = ("-saved_at",)
\ No newline at end of file
+    ordering = ("-saved_at",)
+
+
+# --- Colorant Admin ---
+@admin.register(Colorant)
+class ColorantAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "hex_code", "strength", "is_active")
+    list_filter = ("is_active",)
+    search_fields = ("code", "name")
+    ordering = ("code",)
+
+
+# --- TintBase Admin ---
+@admin.register(TintBase)
+class TintBaseAdmin(admin.ModelAdmin):
+    list_display = ("name", "code", "hex_code", "product", "max_colorant_ml_per_liter", "is_active")
+    list_filter = ("is_active",)
+    search_fields = ("name", "code", "product__name")
+    autocomplete_fields = ("product",)
+    ordering = ("name",)
+
+
+# --- ColorHarmony Admin ---
+@admin.register(ColorHarmony)
+class ColorHarmonyAdmin(admin.ModelAdmin):
+    """Read-only: rows are rebuilt by the compute_color_harmonies command."""
+    list_display = ("color", "rule", "rank", "match", "delta_e", "computed_at")
+    list_filter = ("rule",)
+    search_fields = ("color__name", "color__code", "match__name", "match__code")
+    list_select_related = ("color", "match")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# --- ColorContrastPair Admin ---
+@admin.register(ColorContrastPair)
+class ColorContrastPairAdmin(admin.ModelAdmin):
+    """Read-only: rows are rebuilt by the compute_contrast_pairs command."""
+    list_display = ("color", "partner", "contrast_ratio", "lrv_difference")
+    search_fields = ("color__name", "color__code", "partner__name", "partner__code")
+    list_select_related = ("color", "partner")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,99 @@
+"""
+Resolves pasted lists of color codes ("OB-202, gg 305, ...") to catalog colors.
+
+Codes are compared by a key made of their letters and digits only, so case,
+spacing and dash style don't matter ("ob 202", "OB_202" and "OB–202" all
+hit OB-202). The key -> code index is kept per process and rebuilt only when
+the Color table changes. Codes that still don't match are fuzzy-matched with
+difflib against the keys sharing the same letter prefix; codes whose prefix
+no catalog code has get no suggestions, and only the first
+MAX_FUZZY_LOOKUPS distinct unknown codes of a request are fuzzy-matched, so
+a pasted list of junk can't turn into millions of comparisons. Codes past
+that cap are flagged "fuzzy_skipped" rather than passed off as misses.
+"""
+import difflib
+import re
+
+from home import invalidation
+from .models import Color
+
+# Separators between codes in pasted text (spaces can be part of a code)
+CODE_SEPARATORS = re.compile(r"[,;|\t\r\n]+")
+
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+_PREFIX = re.compile(r"^[A-Z]*")
+
+# difflib ratio needed to accept a fuzzy match on its own
+FUZZY_ACCEPT = 0.85
+# Lower bound for codes offered as suggestions
+FUZZY_SUGGEST = 0.6
+MAX_SUGGESTIONS = 3
+# Distinct unknown codes fuzzy-matched per call; the rest come back unknown with fuzzy_skipped set
+MAX_FUZZY_LOOKUPS = 50
+
+
+def split_codes(text):
+    """Splits pasted text into individual (non-empty) codes."""
+    return [part.strip() for part in CODE_SEPARATORS.split(text or "") if part.strip()]
+
+
+def code_key(code):
+    """Canonical comparison key: upper-case letters and digits only."""
+    return _NON_ALNUM.sub("", str(code).upper())
+
+
+def _build_index():
+    index, by_prefix = {}, {}
+    for code in Color.objects.filter(is_active=True).values_list("code", flat=True):
+        key = code_key(code)
+        index.setdefault(key, code)
+        by_prefix.setdefault(_PREFIX.match(key).group(), []).append(key)
+    return index, by_prefix
+
+
+def code_index():
+    """Returns ({key: code}, {letter prefix: [keys]}) for all active colors."""
+    return invalidation.versioned("colors:code-index", [Color], _build_index)
+
+
+def resolve_codes(raw_codes, fuzzy=True):
+    """
+    Returns one dict per input code, in order:
+    {"input", "code" (catalog code or None), "match": "exact" | "fuzzy" | None,
+     "suggestions": [catalog codes], "fuzzy_skipped": bool}.
+    fuzzy_skipped marks unknown codes that had fuzzy candidates but came after
+    the first MAX_FUZZY_LOOKUPS lookups, so they may not be true misses.
+    Doesn't touch the database unless the index needs rebuilding.
+    """
+    index, by_prefix = code_index()
+    results = []
+    fuzzy_cache = {}
+    lookups = 0
+    for raw in raw_codes:
+        key = code_key(raw)
+        result = {"input": raw, "code": None, "match": None, "suggestions": [], "fuzzy_skipped": False}
+        if key in index:
+            result.update(code=index[key], match="exact")
+        elif key and fuzzy:
+            if key not in fuzzy_cache:
+                candidates = by_prefix.get(_PREFIX.match(key).group())
+                if not candidates:
+                    fuzzy_cache[key] = []
+                elif lookups < MAX_FUZZY_LOOKUPS:
+                    lookups += 1
+                    fuzzy_cache[key] = difflib.get_close_matches(key, candidates, n=MAX_SUGGESTIONS, cutoff=FUZZY_SUGGEST)
+                else:
+                    # Over the cap: None tells "not checked" apart from "no close match"
+                    fuzzy_cache[key] = None
+            close = fuzzy_cache[key]
+            if close is None:
+                result["fuzzy_skipped"] = True
+                results.append(result)
+                continue
+            result["suggestions"] = [index[k] for k in close]
+            # Only accept a clear winner; ties stay suggestions
+            ratios = [difflib.SequenceMatcher(None, key, k).ratio() for k in close[:2]]
+            if ratios and ratios[0] >= FUZZY_ACCEPT and (len(ratios) == 1 or ratios[1] < ratios[0]):
+                result.update(code=index[close[0]], match="fuzzy")
+        results.append(result)
+    return results
@@ -0,0 +1,183 @@
+"""
+Vectorized color conversions (NumPy).
+
+Every function takes and returns arrays with the channels on the last axis,
+so the same call works for one color, a whole palette or an image.
+RGB values are floats in the 0-255 range, sRGB with a D65 white point.
+"""
+import numpy as np
+
+# sRGB (D65) <-> CIE XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def hex_to_rgb(hex_codes):
+    """
+    Parses '#RRGGBB' / 'RRGGBB' / '#RGB' strings into an (N, 3) float array.
+    Invalid or empty codes become NaN rows.
+    """
+    values = np.full(len(hex_codes), -1, dtype=np.int64)
+    for i, code in enumerate(hex_codes):
+        code = (code or "").strip().lstrip("#")
+        if len(code) == 3:
+            code = "".join(ch * 2 for ch in code)
+        if len(code) != 6:
+            continue
+        try:
+            values[i] = int(code, 16)
+        except ValueError:
+            continue
+
+    rgb = np.stack([(values >> 16) & 0xFF, (values >> 8) & 0xFF, values & 0xFF], axis=-1).astype(float)
+    rgb[values < 0] = np.nan
+    return rgb
+
+
+def rgb_to_hex(rgb):
+    """Formats an (N, 3) RGB array as a list of '#RRGGBB' strings."""
+    rgb = np.clip(np.rint(np.asarray(rgb, dtype=float)), 0, 255).astype(int)
+    return [f"#{r:02X}{g:02X}{b:02X}" for r, g, b in rgb.reshape(-1, 3)]
+
+
+def normalize_hex(code):
+    """Returns a single hex code as '#RRGGBB', or None if it isn't valid."""
+    rgb = hex_to_rgb([code])
+    if np.isnan(rgb).any():
+        return None
+    return rgb_to_hex(rgb)[0]
+
+
+def rgb_to_cmyk(rgb):
+    """Naive (device independent) RGB -> CMYK, in percent (0-100)."""
+    rgb = np.asarray(rgb, dtype=float) / 255.0
+    k = 1.0 - rgb.max(axis=-1)
+    denom = np.where(k < 1.0, 1.0 - k, 1.0)
+    cmy = (1.0 - rgb - k[..., None]) / denom[..., None]
+    cmy[k >= 1.0] = 0.0
+    return np.concatenate([cmy, k[..., None]], axis=-1) * 100.0
+
+
+def cmyk_to_rgb(cmyk):
+    """CMYK in percent (0-100) -> RGB."""
+    cmyk = np.asarray(cmyk, dtype=float) / 100.0
+    cmy, k = cmyk[..., :3], cmyk[..., 3:]
+    return 255.0 * (1.0 - cmy) * (1.0 - k)
+
+
+def srgb_to_linear(rgb):
+    """sRGB (0-255) -> linear light (0-1)."""
+    c = np.asarray(rgb, dtype=float) / 255.0
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear):
+    """Linear light (0-1) -> sRGB (0-255), clipped to the gamut."""
+    c = np.clip(np.asarray(linear, dtype=float), 0.0, 1.0)
+    return 255.0 * np.where(c <= 0.0031308, c * 12.92, 1.055 * c ** (1 / 2.4) - 0.055)
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance (CIE Y), 0-1."""
+    return srgb_to_linear(rgb) @ _RGB_TO_XYZ[1]
+
+
+def light_reflectance_value(rgb):
+    """
+    Approximate LRV (0-100) from a screen color. Real LRVs are measured on
+    the dry film, so a supplied value should always win over this one.
+    """
+    return relative_luminance(rgb) * 100.0
+
+
+def rgb_to_lab(rgb):
+    """sRGB (0-255) -> CIE L*a*b* (D65)."""
+    xyz = (srgb_to_linear(rgb) @ _RGB_TO_XYZ.T) / _D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+    return np.stack([116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)], axis=-1)
+
+
+def lab_to_rgb(lab):
+    """CIE L*a*b* (D65) -> sRGB (0-255), clipped to the gamut."""
+    lab = np.asarray(lab, dtype=float)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    xyz = np.where(f > 6 / 29, f ** 3, 3 * (6 / 29) ** 2 * (f - 4 / 29)) * _D65_WHITE
+    return linear_to_srgb(xyz @ _XYZ_TO_RGB.T)
+
+
+def rgb_to_hsl(rgb):
+    """sRGB (0-255) -> HSL as (hue 0-360, saturation 0-100, lightness 0-100)."""
+    rgb = np.asarray(rgb, dtype=float) / 255.0
+    high, low = rgb.max(axis=-1), rgb.min(axis=-1)
+    chroma = high - low
+    lightness = (high + low) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        saturation = np.where(chroma > 0, chroma / (1 - np.abs(2 * lightness - 1)), 0.0)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        hue = np.select(
+            [chroma == 0, high == r, high == g],
+            [0.0, ((g - b) / chroma) % 6, (b - r) / chroma + 2],
+            (r - g) / chroma + 4,
+        ) * 60.0
+    return np.stack([hue, np.clip(saturation, 0, 1) * 100, lightness * 100], axis=-1)
+
+
+def lab_chroma(lab):
+    """Colorfulness (C*ab) of L*a*b* colors."""
+    lab = np.asarray(lab, dtype=float)
+    return np.hypot(lab[..., 1], lab[..., 2])
+
+
+def delta_e(lab1, lab2):
+    """
+    CIEDE2000 color difference. Inputs broadcast against each other, so
+    delta_e(a[:, None], b[None, :]) gives the full pairwise matrix.
+    """
+    lab1 = np.asarray(lab1, dtype=float)
+    lab2 = np.asarray(lab2, dtype=float)
+    l1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    l2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25.0 ** 7)))
+    a1p, a2p = a1 * (1 + g), a2 * (1 + g)
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dl = l2 - l1
+    dc = c2p - c1p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c1p * c2p == 0, 0.0, dh)
+    dh_big = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh / 2))
+
+    l_mean = (l1 + l2) / 2
+    cp_mean = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    hp_mean = np.where(
+        c1p * c2p == 0, h_sum,
+        np.where(np.abs(h1p - h2p) <= 180, h_sum / 2,
+                 np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2))
+    )
+
+    t = (1 - 0.17 * np.cos(np.radians(hp_mean - 30)) + 0.24 * np.cos(np.radians(2 * hp_mean))
+         + 0.32 * np.cos(np.radians(3 * hp_mean + 6)) - 0.20 * np.cos(np.radians(4 * hp_mean - 63)))
+    d_theta = 30 * np.exp(-(((hp_mean - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt(cp_mean ** 7 / (cp_mean ** 7 + 25.0 ** 7))
+    s_l = 1 + 0.015 * (l_mean - 50) ** 2 / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * cp_mean
+    s_h = 1 + 0.015 * cp_mean * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+
+    return np.sqrt(
+        (dl / s_l) ** 2 + (dc / s_c) ** 2 + (dh_big / s_h) ** 2
+        + r_t * (dc / s_c) * (dh_big / s_h)
+    )
@@ -0,0 +1,102 @@
+"""
+WCAG contrast ratios and LRV differences between catalog colors (NumPy).
+
+Two measures are used for accessible combinations (wall/trim, door/frame,
+signage): the WCAG 2.x contrast ratio computed from the screen color, and the
+difference in Light Reflectance Value that building guidance (e.g. BS 8300,
+ADA practice) asks for between adjacent surfaces.
+"""
+import numpy as np
+
+from . import colorspace
+
+# WCAG thresholds
+AA_LARGE = 3.0
+AA = 4.5
+AAA = 7.0
+
+# LRV points between adjacent surfaces for visually impaired users
+MIN_LRV_DIFFERENCE = 30.0
+
+# Pairs below this ratio are not stored (the palette check computes any pair live)
+MIN_STORED_CONTRAST = AA
+
+# Strongest partners stored per color; keeps the table at O(colors), not O(colors^2)
+PARTNERS_PER_COLOR = 100
+
+BLOCK_SIZE = 1024
+
+
+def effective_lrv(measured, rgb):
+    """Measured LRVs where known (None/NaN otherwise), estimated from the screen color elsewhere."""
+    measured = np.array([np.nan if v is None else float(v) for v in measured], dtype=float)
+    return np.where(np.isnan(measured), colorspace.light_reflectance_value(rgb), measured)
+
+
+def contrast_ratio(luminance1, luminance2):
+    """WCAG contrast ratio (1-21). Inputs broadcast against each other."""
+    high = np.maximum(luminance1, luminance2)
+    low = np.minimum(luminance1, luminance2)
+    return (high + 0.05) / (low + 0.05)
+
+
+def wcag_level(ratio):
+    """Best WCAG level a contrast ratio passes: "AAA", "AA", "AA Large" or None."""
+    if ratio >= AAA:
+        return "AAA"
+    if ratio >= AA:
+        return "AA"
+    if ratio >= AA_LARGE:
+        return "AA Large"
+    return None
+
+
+def accessible_pairs(luminance, lrv, limit=PARTNERS_PER_COLOR):
+    """
+    Yields (i, j, ratio, lrv_difference) arrays for the `limit` highest-contrast
+    partners j of each color i that reach MIN_STORED_CONTRAST, one chunk per
+    block of source colors.
+    """
+    luminance = np.asarray(luminance, dtype=float)
+    lrv = np.asarray(lrv, dtype=float)
+    n = len(luminance)
+    keep = min(limit, n)
+
+    for start in range(0, n, BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, n)
+        ratio = contrast_ratio(luminance[start:stop, None], luminance[None, :])
+        # Column indexes of the `keep` largest ratios in each row (unordered)
+        top = np.argpartition(-ratio, keep - 1, axis=1)[:, :keep]
+        rows = np.repeat(np.arange(stop - start), keep)
+        cols = top.ravel()
+        passing = ratio[rows, cols] >= MIN_STORED_CONTRAST
+        rows, cols = rows[passing], cols[passing]
+        yield rows + start, cols, ratio[rows, cols], np.abs(lrv[rows + start] - lrv[cols])
+
+
+def best_partners(luminance, lrv, target_luminance, target_lrv, min_ratio=AA, min_lrv=0.0,
+                  limit=PARTNERS_PER_COLOR):
+    """
+    Live counterpart of accessible_pairs for one target color against any set
+    of candidates. Returns (indexes, ratio, lrv_difference) arrays for the
+    `limit` strongest candidates passing both thresholds, strongest first.
+    """
+    luminance = np.asarray(luminance, dtype=float)
+    ratio = contrast_ratio(target_luminance, luminance)
+    difference = np.abs(np.asarray(lrv, dtype=float) - target_lrv)
+    passing = np.flatnonzero((ratio >= min_ratio) & (difference >= min_lrv))
+    order = passing[np.argsort(-ratio[passing], kind="stable")][:limit]
+    return order, ratio[order], difference[order]
+
+
+def palette_report(luminance, lrv):
+    """
+    Full pairwise check of a small palette.
+    Returns (ratio, lrv_difference) matrices, each (n, n).
+    """
+    luminance = np.asarray(luminance, dtype=float)
+    lrv = np.asarray(lrv, dtype=float)
+    return (
+        contrast_ratio(luminance[:, None], luminance[None, :]),
+        np.abs(lrv[:, None] - lrv[None, :]),
+    )
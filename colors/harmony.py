@@ -0,0 +1,103 @@
+"""
+Color harmony matching over the whole catalog (NumPy).
+
+For every color, each harmony rule gives one or more hue angles to aim for
+(e.g. +180 degrees for complementary). The ideal partner keeps the color's
+chroma at the rotated hue; every catalog color is scored by its CIEDE2000
+distance to that ideal at its own lightness, so a lighter or darker version
+of the right hue still counts. Partners must differ enough in LRV to read
+as separate colors, and clashing undertones are penalized.
+
+Sources are processed in blocks so the pairwise matrices stay small.
+"""
+import numpy as np
+
+from . import colorspace
+
+# Hue offsets (degrees) per rule; a partner only has to match one of them
+RULE_ANGLES = {
+    "complementary": (180,),
+    "analogous": (-30, 30),
+    "triadic": (120, 240),
+    "split_complementary": (150, 210),
+}
+
+# Partners further than this from the ideal harmony color are dropped
+DELTA_E_TOLERANCE = 20.0
+
+# Minimum LRV difference between a color and its partner
+MIN_LRV_CONTRAST = 8.0
+
+# Added to the score when one color is warm and the other cool. Complementary
+# pairs cross temperature by definition, so they are exempt.
+UNDERTONE_PENALTY = 6.0
+UNDERTONE_EXEMPT_RULES = ("complementary",)
+
+BLOCK_SIZE = 256
+
+
+def _undertone_codes(undertones):
+    mapping = {"warm": 1, "cool": -1}
+    return np.array([mapping.get(u, 0) for u in undertones], dtype=np.int8)
+
+
+def compute_harmonies(lab, lrv, undertones, chromatic, per_rule=4):
+    """
+    lab: (n, 3) L*a*b* of the catalog
+    lrv: (n,) light reflectance values
+    undertones: n strings ("warm", "cool", "neutral" or None)
+    chromatic: (n,) bool, False for grays (they get and give no harmonies)
+
+    Returns {rule: (index, score)} where index is an (n, per_rule) int array
+    of partner positions (-1 when there are fewer matches) and score holds
+    the matching distances.
+    """
+    lab = np.asarray(lab, dtype=float)
+    lrv = np.asarray(lrv, dtype=float)
+    chromatic = np.asarray(chromatic, dtype=bool)
+    tone = _undertone_codes(undertones)
+    n = len(lab)
+    per_rule = max(1, min(per_rule, n))
+
+    chroma = colorspace.lab_chroma(lab)
+    hue = np.arctan2(lab[:, 2], lab[:, 1])
+
+    results = {
+        rule: (np.full((n, per_rule), -1, dtype=np.int64), np.full((n, per_rule), np.inf))
+        for rule in RULE_ANGLES
+    }
+
+    for start in range(0, n, BLOCK_SIZE):
+        block = slice(start, min(start + BLOCK_SIZE, n))
+        rows = np.arange(block.start, block.stop)
+
+        # Constraints shared by every rule: (block, n)
+        allowed = chromatic[block, None] & chromatic[None, :]
+        allowed &= np.abs(lrv[block, None] - lrv[None, :]) >= MIN_LRV_CONTRAST
+        allowed[np.arange(len(rows)), rows] = False
+        clash = (tone[block, None] * tone[None, :]) < 0
+
+        for rule, angles in RULE_ANGLES.items():
+            score = np.full((len(rows), n), np.inf)
+            for angle in angles:
+                target_hue = hue[block] + np.radians(angle)
+                ideal = np.empty((len(rows), n, 3))
+                ideal[..., 0] = lab[None, :, 0]
+                ideal[..., 1] = (chroma[block] * np.cos(target_hue))[:, None]
+                ideal[..., 2] = (chroma[block] * np.sin(target_hue))[:, None]
+                score = np.minimum(score, colorspace.delta_e(ideal, lab[None, :, :]))
+
+            if rule not in UNDERTONE_EXEMPT_RULES:
+                score = score + np.where(clash, UNDERTONE_PENALTY, 0.0)
+            score[~allowed | (score > DELTA_E_TOLERANCE)] = np.inf
+
+            best = np.argpartition(score, per_rule - 1, axis=1)[:, :per_rule]
+            best_score = np.take_along_axis(score, best, axis=1)
+            order = np.argsort(best_score, axis=1)
+            best = np.take_along_axis(best, order, axis=1)
+            best_score = np.take_along_axis(best_score, order, axis=1)
+
+            index, scores = results[rule]
+            index[block] = np.where(np.isfinite(best_score), best, -1)
+            scores[block] = best_score
+    return results
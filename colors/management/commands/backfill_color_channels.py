@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from colors.models import Color, CHANNEL_FIELDS, compute_channels
+from home import invalidation
+
+
+class Command(BaseCommand):
+    help = "Fill in the numeric channel columns (RGB, HSL, L*a*b*) of colors from their hex codes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every color, not only missing ones")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        colors = Color.objects.exclude(hex_code__isnull=True).exclude(hex_code="")
+        if not options["all"]:
+            colors = colors.filter(red__isnull=True)
+
+        batch_size = max(1, options["batch_size"])
+        batch, updated = [], 0
+        for color in colors.only("id", "hex_code").order_by("id").iterator(chunk_size=batch_size):
+            batch.append(color)
+            if len(batch) >= batch_size:
+                updated += self._flush(batch)
+                batch = []
+        if batch:
+            updated += self._flush(batch)
+
+        if updated:
+            invalidation.bump(Color)
+        self.stdout.write(self.style.SUCCESS(f"Updated channel columns for {updated} colors."))
+
+    def _flush(self, batch):
+        # One vectorized pass and one bulk UPDATE per batch
+        for color, channels in zip(batch, compute_channels([c.hex_code for c in batch])):
+            for field, value in channels.items():
+                setattr(color, field, value)
+        Color.objects.bulk_update(batch, CHANNEL_FIELDS)
+        return len(batch)
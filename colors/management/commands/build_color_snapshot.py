@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from colors.snapshot import write
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the content-hashed color catalog snapshot used for client-side filtering "
+        "to STATIC_ROOT. Web workers also rebuild it on demand after catalog changes; "
+        "run this on deploy so the first visitor doesn't pay for it."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f"Snapshot is {settings.STATIC_URL}{write()}"))
@@ -0,0 +1,59 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from colors import colorspace
+from colors.contrast import effective_lrv
+from colors.harmony import compute_harmonies
+from colors.models import Color, ColorHarmony, ACHROMATIC_CHROMA
+from home import invalidation
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the 'pairs well with' table (complementary, analogous, triadic, "
+        "split complementary) for every active color. Meant to run periodically, e.g. nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--per-rule", type=int, default=4, help="Matches kept per color and rule")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = list(
+            Color.objects.filter(is_active=True, lab_l__isnull=False)
+            .order_by("id")
+            .values_list("id", "lab_l", "lab_a", "lab_b", "lrv", "undertone", "red", "green", "blue")
+        )
+        if not rows:
+            self.stdout.write("No active colors with channel data. Run backfill_color_channels first.")
+            return
+
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        lab = np.array([row[1:4] for row in rows], dtype=float)
+        lrv = effective_lrv([row[4] for row in rows], np.array([row[6:9] for row in rows], dtype=float))
+        undertones = [row[5] for row in rows]
+        chromatic = colorspace.lab_chroma(lab) >= ACHROMATIC_CHROMA
+
+        results = compute_harmonies(lab, lrv, undertones, chromatic, per_rule=options["per_rule"])
+
+        harmonies = []
+        for rule, (index, scores) in results.items():
+            for i, j in zip(*np.nonzero(index >= 0)):
+                harmonies.append(ColorHarmony(
+                    color_id=int(ids[i]),
+                    match_id=int(ids[index[i, j]]),
+                    rule=rule,
+                    rank=int(j) + 1,
+                    delta_e=round(float(scores[i, j]), 2),
+                ))
+
+        with transaction.atomic():
+            ColorHarmony.objects.all().delete()
+            ColorHarmony.objects.bulk_create(harmonies, batch_size=options["batch_size"])
+        invalidation.bump(ColorHarmony)
+
+        with_matches = len({h.color_id for h in harmonies})
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {len(harmonies)} harmonies for {with_matches} of {len(ids)} colors."
+        ))
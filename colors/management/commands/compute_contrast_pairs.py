@@ -0,0 +1,61 @@
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from colors import colorspace
+from colors.contrast import accessible_pairs, effective_lrv
+from colors.models import Color, ColorCollection, ColorContrastPair
+from home import invalidation
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute WCAG contrast ratios and LRV differences between active colors and "
+        "store the accessible pairs. Limit the run to one collection with --collection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--collection", help="Collection name or slug (pairs within it only)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        colors = Color.objects.filter(is_active=True, red__isnull=False)
+        collection = None
+        if options["collection"]:
+            value = options["collection"]
+            collection = ColorCollection.objects.filter(Q(slug=value) | Q(name__iexact=value)).first()
+            if collection is None:
+                raise CommandError(f"Unknown collection '{value}'.")
+            colors = colors.filter(collection=collection)
+
+        rows = list(colors.order_by("id").values_list("id", "red", "green", "blue", "lrv"))
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        rgb = np.array([row[1:4] for row in rows], dtype=float).reshape(-1, 3)
+        luminance = colorspace.relative_luminance(rgb)
+        lrv = effective_lrv([row[4] for row in rows], rgb)
+
+        batch_size = max(1, options["batch_size"])
+        stored = 0
+        with transaction.atomic():
+            existing = ColorContrastPair.objects.all()
+            if collection is not None:
+                existing = existing.filter(color__collection=collection, partner__collection=collection)
+            existing.delete()
+
+            for i, j, ratio, difference in accessible_pairs(luminance, lrv):
+                pairs = [
+                    ColorContrastPair(
+                        color_id=int(ids[a]), partner_id=int(ids[b]),
+                        contrast_ratio=round(float(r), 2), lrv_difference=round(float(d), 2),
+                    )
+                    for a, b, r, d in zip(i, j, ratio, difference)
+                ]
+                ColorContrastPair.objects.bulk_create(pairs, batch_size=batch_size)
+                stored += len(pairs)
+        invalidation.bump(ColorContrastPair)
+
+        scope = f"collection '{collection.name}'" if collection else "the full palette"
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} accessible pairs across {len(ids)} colors in {scope}."
+        ))
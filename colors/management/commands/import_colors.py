@@ -0,0 +1,412 @@
+import time
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from colors import colorspace
+from colors.models import Color, ColorCollection, Finish, Surface, RoomType, CHANNEL_FIELDS, compute_channels
+from colors.swatch_files import ERROR_KEY, FORMATS, read_rows
+from home import invalidation
+from home.slugs import allocate_slugs
+
+# Scalar Color fields an import file may set
+COLOR_FIELDS = (
+    "name", "hex_code", "rgb_value", "cmyk_value", "undertone", "lrv", "opacity_strength",
+    "description", "coverage_per_liter", "drying_time_hours", "voc_level", "is_active",
+)
+DECIMAL_FIELDS = ("lrv", "coverage_per_liter", "drying_time_hours")
+# Upper bounds tighter than the column allows (LRV is a percentage)
+DECIMAL_MAX = {"lrv": Decimal("100")}
+CHOICE_FIELDS = ("undertone", "opacity_strength")
+
+# Import key -> (Color M2M field, related model)
+M2M_FIELDS = {
+    "finishes": ("available_finishes", Finish),
+    "surfaces": ("recommended_surfaces", Surface),
+    "rooms": ("recommended_rooms", RoomType),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import a color catalog from a CSV, JSON/JSON Lines or Adobe Swatch Exchange (.ase) file. "
+        "Colors are matched on 'code': new ones are inserted, existing ones updated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import")
+        parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+        parser.add_argument("--collection", help="Collection for rows that don't name one (e.g. ASE swatches)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per database round-trip")
+        parser.add_argument("--dry-run", action="store_true", help="Show what would change without writing")
+
+    def handle(self, *args, **options):
+        self.dry_run = options["dry_run"]
+        self.default_collection = options["collection"]
+        batch_size = max(1, options["batch_size"])
+
+        self.stats = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0, "links": 0}
+        self.errors = []
+        self.allocated_slugs = set()
+        self.seen_codes = set()
+        self.seen_names = {}
+        self.related_ids = {model: self._name_map(model) for model in (ColorCollection, Finish, Surface, RoomType)}
+        # --dry-run: what earlier batches would have written, so a code seen again compares against it
+        self.planned = {}
+        self.planned_links = {}
+
+        started = time.monotonic()
+        try:
+            with transaction.atomic():
+                batch = []
+                for line_no, raw in enumerate(read_rows(options["path"], options["format"]), start=1):
+                    batch.append((line_no, raw))
+                    if len(batch) >= batch_size:
+                        self._process_batch(batch)
+                        batch = []
+                if batch:
+                    self._process_batch(batch)
+
+                if not self.dry_run:
+                    # bulk_create() sends no signals, so invalidate caches ourselves
+                    invalidation.bump(
+                        Color, ColorCollection, Finish, Surface, RoomType,
+                        *(getattr(Color, field).through for field, _ in M2M_FIELDS.values())
+                    )
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        self._write_summary(time.monotonic() - started)
+
+    # --- Row cleaning ---
+
+    def _clean(self, raw):
+        """Validates one input row. Returns a dict or raises ValueError."""
+        if raw.get(ERROR_KEY):
+            raise ValueError(raw[ERROR_KEY])
+        # str(): JSON files may hold numbers, e.g. "code": 1234
+        code = str(raw.get("code") or "").strip().upper()
+        name = str(raw.get("name") or "").strip()
+        if not code:
+            raise ValueError("missing color code")
+        if not name:
+            raise ValueError("missing name")
+
+        row = {"code": code, "name": name}
+        for field in COLOR_FIELDS:
+            if field in ("name",) or field not in raw or raw[field] in ("", None):
+                continue
+            value = raw[field]
+            if field in DECIMAL_FIELDS:
+                value = self._decimal(field, value)
+            elif field in CHOICE_FIELDS:
+                value = str(value).lower()
+                choices = dict(Color._meta.get_field(field).choices)
+                if value not in choices:
+                    raise ValueError(f"{field} must be one of {', '.join(choices)}")
+            elif field == "is_active":
+                value = str(value).strip().lower() not in ("0", "false", "no", "n")
+            elif field == "hex_code":
+                value = colorspace.normalize_hex(str(value))
+                if value is None:
+                    raise ValueError(f"invalid hex code '{raw[field]}'")
+            row[field] = value
+
+        collection = raw.get("collection") or self.default_collection
+        if collection:
+            row["collection"] = str(collection).strip()
+        for key in M2M_FIELDS:
+            names = raw.get(key) or []
+            # CSV cells arrive as lists already (see swatch_files._normalize); JSON may hold anything
+            if not isinstance(names, list) or not all(isinstance(n, (str, int)) for n in names):
+                raise ValueError(f"{key} must be a list of names")
+            row[key] = [str(n).strip() for n in names if str(n).strip()]
+        return row
+
+    def _decimal(self, field, value):
+        """Parses a decimal field to two places, within what its column (and DECIMAL_MAX) allows."""
+        try:
+            number = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f"{field} '{value}' is not a number")
+        if not number.is_finite():
+            raise ValueError(f"{field} '{value}' is not a number")
+        column = Color._meta.get_field(field)
+        limit = DECIMAL_MAX.get(field, Decimal(10) ** (column.max_digits - column.decimal_places) - Decimal("0.01"))
+        if not 0 <= number <= limit:
+            raise ValueError(f"{field} must be between 0 and {limit}")
+        # min(): a value just under the limit may round up past it
+        return min(number.quantize(Decimal("0.01")), limit)
+
+    # --- Batch processing ---
+
+    def _process_batch(self, batch):
+        rows = {}
+        for line_no, raw in batch:
+            try:
+                row = self._clean(raw)
+            except ValueError as e:
+                self._skip(line_no, raw.get("code"), str(e))
+                continue
+            if row["code"] in self.seen_codes:
+                self.errors.append((line_no, row["code"], "duplicate code, later row wins"))
+            name_owner = self.seen_names.setdefault(row["name"].lower(), row["code"])
+            if name_owner != row["code"]:
+                self._skip(line_no, row["code"], f"name '{row['name']}' is already used by {name_owner} in this file")
+                continue
+            self.seen_codes.add(row["code"])
+            rows[row["code"]] = (line_no, row)
+
+        if not rows:
+            return
+
+        codes = list(rows)
+        existing = {
+            c["code"]: c for c in Color.objects.filter(code__in=codes).values(
+                "id", "code", "slug", "collection_id", *COLOR_FIELDS
+            )
+        }
+        # Names are unique too: a name owned by another code can't be imported
+        name_owners = dict(
+            Color.objects.filter(name__in=[row["name"] for _, row in rows.values()])
+            .values_list("name", "code")
+        )
+        for code, (line_no, row) in list(rows.items()):
+            owner = name_owners.get(row["name"])
+            if owner and owner != code:
+                self._skip(line_no, code, f"name '{row['name']}' already belongs to {owner}")
+                del rows[code]
+
+        if self.dry_run:
+            existing.update({code: self.planned[code] for code in codes if code in self.planned})
+        merged = self._merge(rows, existing)
+        existing_links = self._existing_links(existing)
+
+        if self.dry_run:
+            existing_links.update({k: v for k, v in self.planned_links.items() if k[1] in rows})
+            self._print_diff(merged, existing, existing_links)
+            self._plan(merged, existing_links)
+            return
+
+        self._resolve_related(merged)
+        for code, fields in merged.items():
+            if code not in existing:
+                self.stats["created"] += 1
+            elif self._changed_fields(fields, existing[code]) or self._new_links(code, fields, existing_links):
+                self.stats["updated"] += 1
+            else:
+                self.stats["unchanged"] += 1
+
+        slugs = self._allocate_slugs([code for code in merged if code not in existing], merged)
+        channels = compute_channels([fields.get("hex_code") for fields in merged.values()])
+        objs = []
+        for (code, fields), channel_values in zip(merged.items(), channels):
+            collection_name = fields.get("collection")
+            if collection_name:
+                collection_id = self.related_ids[ColorCollection][collection_name.lower()]
+            else:
+                collection_id = fields.get("collection_id")
+            values = {f: fields.get(f) for f in COLOR_FIELDS}
+            if values["is_active"] is None:
+                values["is_active"] = True
+            slug = existing[code]["slug"] if code in existing else slugs[code]
+            objs.append(Color(code=code, slug=slug, collection_id=collection_id, **values, **channel_values))
+
+        Color.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["code"],
+            update_fields=[*COLOR_FIELDS, *CHANNEL_FIELDS, "collection", "updated_at"],
+        )
+
+        ids = dict(Color.objects.filter(code__in=list(merged)).values_list("code", "id"))
+        self._insert_links(merged, ids, existing_links)
+
+    def _merge(self, rows, existing):
+        """
+        Overlays each incoming row on the stored values, then derives RGB/CMYK/LRV
+        from the hex code in one vectorized pass. Supplied values always win,
+        and a stored (measured) LRV is never overwritten by a derived one.
+        """
+        merged = {}
+        for code, (_, row) in rows.items():
+            current = dict(existing.get(code, {}))
+            for key in ("id", "code", "slug"):
+                current.pop(key, None)
+            current.update(row)
+            current["_derive_rgb"] = "hex_code" in row and "rgb_value" not in row
+            current["_derive_cmyk"] = "hex_code" in row and "cmyk_value" not in row
+            merged[code] = current
+
+        codes = list(merged)
+        rgb = colorspace.hex_to_rgb([merged[c].get("hex_code") for c in codes])
+        cmyk = colorspace.rgb_to_cmyk(rgb)
+        lrv = colorspace.light_reflectance_value(rgb)
+        valid = ~np.isnan(rgb).any(axis=1)
+
+        for i, code in enumerate(codes):
+            fields = merged[code]
+            derive_rgb = fields.pop("_derive_rgb") or not fields.get("rgb_value")
+            derive_cmyk = fields.pop("_derive_cmyk") or not fields.get("cmyk_value")
+            if not valid[i]:
+                continue
+            if derive_rgb:
+                fields["rgb_value"] = ",".join(str(int(v)) for v in rgb[i])
+            if derive_cmyk:
+                fields["cmyk_value"] = ",".join(str(int(round(v))) for v in cmyk[i])
+            if fields.get("lrv") is None:
+                fields["lrv"] = Decimal(f"{lrv[i]:.2f}")
+        return merged
+
+    def _plan(self, merged, existing_links):
+        """--dry-run: records the rows and links this batch would have written."""
+        for code, fields in merged.items():
+            state = {f: fields.get(f) for f in COLOR_FIELDS}
+            if state["is_active"] is None:
+                state["is_active"] = True
+            collection = fields.get("collection")
+            if collection:
+                # Collections the import would create get a placeholder id
+                ids = self.related_ids[ColorCollection]
+                state["collection_id"] = ids.setdefault(collection.lower(), -(len(ids) + 1))
+            else:
+                state["collection_id"] = fields.get("collection_id")
+            self.planned[code] = state
+            for key in M2M_FIELDS:
+                names = existing_links.get((key, code), set()) | {n.lower() for n in fields.get(key, [])}
+                if names:
+                    self.planned_links[(key, code)] = names
+
+    def _changed_fields(self, fields, current):
+        changes = {}
+        for field in COLOR_FIELDS:
+            if field in fields and fields[field] != current.get(field):
+                changes[field] = (current.get(field), fields[field])
+        collection = fields.get("collection")
+        if collection:
+            current_id = current.get("collection_id")
+            new_id = self.related_ids[ColorCollection].get(collection.lower())
+            if new_id is None or new_id != current_id:
+                changes["collection"] = (self._collection_name(current_id), collection)
+        return changes
+
+    def _collection_name(self, pk):
+        for name, collection_id in self.related_ids[ColorCollection].items():
+            if collection_id == pk:
+                return name
+        return None
+
+    # --- Related objects (collection, finishes, surfaces, rooms) ---
+
+    def _name_map(self, model):
+        return {name.lower(): pk for pk, name in model.objects.values_list("id", "name")}
+
+    def _resolve_related(self, merged):
+        """Creates missing collections/finishes/surfaces/rooms, one bulk insert per model."""
+        wanted = {model: {} for model in self.related_ids}
+        for fields in merged.values():
+            if fields.get("collection"):
+                wanted[ColorCollection][fields["collection"].lower()] = fields["collection"]
+            for key, (_, model) in M2M_FIELDS.items():
+                for name in fields.get(key, []):
+                    wanted[model][name.lower()] = name
+
+        for model, names in wanted.items():
+            missing = [name for key, name in names.items() if key not in self.related_ids[model]]
+            if not missing:
+                continue
+            if model is ColorCollection:
+                objs = [model(name=name, slug=slugify(name)[:120]) for name in missing]
+            else:
+                objs = [model(name=name) for name in missing]
+            model.objects.bulk_create(objs, ignore_conflicts=True)
+            self.related_ids[model] = self._name_map(model)
+
+    def _existing_links(self, existing):
+        """Returns {(import key, color code): {lower-cased related names}} for stored colors."""
+        links = {}
+        if not existing:
+            return links
+        for key, (field, _) in M2M_FIELDS.items():
+            through = getattr(Color, field).through
+            source = Color._meta.get_field(field).m2m_field_name()
+            target = Color._meta.get_field(field).m2m_reverse_field_name()
+            pairs = through.objects.filter(**{f"{source}__code__in": list(existing)}).values_list(
+                f"{source}__code", f"{target}__name"
+            )
+            for code, name in pairs:
+                links.setdefault((key, code), set()).add(name.lower())
+        return links
+
+    def _new_links(self, code, fields, existing_links):
+        new = {}
+        for key in M2M_FIELDS:
+            current = existing_links.get((key, code), set())
+            added = [name for name in fields.get(key, []) if name.lower() not in current]
+            if added:
+                new[key] = added
+        return new
+
+    def _insert_links(self, merged, ids, existing_links):
+        for key, (field, model) in M2M_FIELDS.items():
+            through = getattr(Color, field).through
+            source = Color._meta.get_field(field).m2m_column_name()
+            target = Color._meta.get_field(field).m2m_reverse_name()
+            rows = []
+            for code, fields in merged.items():
+                for name in self._new_links(code, fields, existing_links).get(key, []):
+                    rows.append(through(**{source: ids[code], target: self.related_ids[model][name.lower()]}))
+            through.objects.bulk_create(rows, ignore_conflicts=True)
+            self.stats["links"] += len(rows)
+
+    # --- Slugs ---
+
+    def _allocate_slugs(self, codes, merged):
+        """Picks a unique slug for every new color in the batch before anything is written."""
+        slugs = allocate_slugs(
+            Color, [f"{merged[code]['name']}-{code}" for code in codes], reserved=self.allocated_slugs
+        )
+        self.allocated_slugs.update(slugs)
+        return dict(zip(codes, slugs))
+
+    # --- Output ---
+
+    def _skip(self, line_no, code, reason):
+        self.stats["skipped"] += 1
+        self.errors.append((line_no, code or "?", reason))
+
+    def _print_diff(self, merged, existing, existing_links):
+        for code, fields in merged.items():
+            if code not in existing:
+                self.stats["created"] += 1
+                self.stats["links"] += sum(len(names) for names in self._new_links(code, fields, existing_links).values())
+                self.stdout.write(self.style.SUCCESS(f"+ {code} {fields['name']} ({fields.get('hex_code') or 'no hex'})"))
+                continue
+
+            changes = self._changed_fields(fields, existing[code])
+            links = self._new_links(code, fields, existing_links)
+            if not changes and not links:
+                self.stats["unchanged"] += 1
+                continue
+
+            self.stats["updated"] += 1
+            self.stdout.write(self.style.WARNING(f"~ {code} {fields['name']}"))
+            for field, (old, new) in changes.items():
+                self.stdout.write(f"    {field}: {old!r} -> {new!r}")
+            for key, names in links.items():
+                self.stats["links"] += len(names)
+                self.stdout.write(f"    {key}: + {', '.join(names)}")
+
+    def _write_summary(self, elapsed):
+        for line_no, code, reason in self.errors:
+            self.stderr.write(f"Row {line_no} ({code}): {reason}")
+
+        verb = "Would import" if self.dry_run else "Imported"
+        s = self.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} in {elapsed:.1f}s: {s['created']} created, {s['updated']} updated, "
+            f"{s['unchanged']} unchanged, {s['skipped']} skipped, {s['links']} finish/surface/room links added."
+        ))
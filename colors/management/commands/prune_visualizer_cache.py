@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from colors import render_cache
+
+
+class Command(BaseCommand):
+    help = "Remove expired visualizer renders and trim the render cache to VISUALIZER_CACHE_MAX_BYTES."
+
+    def handle(self, *args, **options):
+        removed = render_cache.prune()
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached renders."))
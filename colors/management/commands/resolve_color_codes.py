@@ -0,0 +1,59 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from colors.codes import MAX_FUZZY_LOOKUPS, resolve_codes, split_codes
+from colors.models import Color
+
+
+class Command(BaseCommand):
+    help = (
+        "Resolve a list of color codes (arguments, a file or stdin) to catalog colors. "
+        "Prints CSV: input, code, match, name, hex_code, suggestions. A match of 'unchecked' means "
+        "the code was past the fuzzy-matching cap and may still have a close catalog code."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("codes", nargs="*", help="Codes, or comma separated lists of codes")
+        parser.add_argument("--file", help="Read codes from this file ('-' for stdin)")
+        parser.add_argument("--no-fuzzy", action="store_true", help="Only accept exact (normalized) matches")
+
+    def handle(self, *args, **options):
+        raw_codes = []
+        for value in options["codes"]:
+            raw_codes.extend(split_codes(value))
+        if options["file"]:
+            try:
+                stream = sys.stdin if options["file"] == "-" else open(options["file"], encoding="utf-8-sig")
+            except OSError as e:
+                raise CommandError(str(e))
+            with stream:
+                raw_codes.extend(split_codes(stream.read()))
+        if not raw_codes:
+            raise CommandError("No codes given.")
+
+        resolved = resolve_codes(raw_codes, fuzzy=not options["no_fuzzy"])
+        colors = Color.objects.filter(code__in={r["code"] for r in resolved if r["code"]}).in_bulk(field_name="code")
+
+        writer = csv.writer(self.stdout)
+        writer.writerow(["input", "code", "match", "name", "hex_code", "suggestions"])
+        for result in resolved:
+            color = colors.get(result["code"])
+            writer.writerow([
+                result["input"],
+                result["code"] or "",
+                result["match"] or ("unchecked" if result["fuzzy_skipped"] else "unknown"),
+                color.name if color else "",
+                color.hex_code or "" if color else "",
+                " ".join(result["suggestions"]),
+            ])
+
+        unknown = sum(r["match"] is None for r in resolved)
+        self.stderr.write(f"{len(resolved) - unknown} of {len(resolved)} codes resolved.")
+        truncated = sum(r["fuzzy_skipped"] for r in resolved)
+        if truncated:
+            self.stderr.write(
+                f"{truncated} unknown codes were not fuzzy-matched (more than {MAX_FUZZY_LOOKUPS} distinct "
+                "unknown codes); resolve them in a separate run."
+            )
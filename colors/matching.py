@@ -0,0 +1,53 @@
+"""
+Nearest catalog color lookups by CIEDE2000.
+
+The L*a*b* matrix of all active colors is kept per process and rebuilt only
+when the Color table changes (see home/invalidation.py).
+"""
+import numpy as np
+
+from home import invalidation
+from . import colorspace
+from .models import Color
+
+# Target rows per CIEDE2000 block (each block holds BLOCK_SIZE x catalog distances)
+BLOCK_SIZE = 64
+
+
+def _build_catalog():
+    rows = list(
+        Color.objects.filter(is_active=True, lab_l__isnull=False)
+        .order_by("id")
+        .values_list("id", "lab_l", "lab_a", "lab_b")
+    )
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    lab = np.array([row[1:] for row in rows], dtype=float).reshape(-1, 3)
+    return ids, lab
+
+
+def catalog_lab():
+    """Returns (ids, lab) arrays for every active color with channel data."""
+    return invalidation.versioned("colors:catalog-lab", [Color], _build_catalog)
+
+
+def nearest_colors(lab, limit=1):
+    """
+    For each L*a*b* row, returns a list of (color_id, delta_e) tuples with the
+    `limit` closest active catalog colors, closest first.
+    Rows are compared BLOCK_SIZE at a time, so memory stays at
+    BLOCK_SIZE x catalog distances however many rows are passed.
+    """
+    ids, catalog = catalog_lab()
+    lab = np.atleast_2d(np.asarray(lab, dtype=float))
+    if not len(ids):
+        return [[] for _ in range(len(lab))]
+
+    limit = min(limit, len(ids))
+    results = []
+    for start in range(0, len(lab), BLOCK_SIZE):
+        distances = colorspace.delta_e(lab[start:start + BLOCK_SIZE, None, :], catalog[None, :, :])
+        nearest = np.argpartition(distances, limit - 1, axis=1)[:, :limit]
+        for i, row in enumerate(nearest):
+            row = row[np.argsort(distances[i, row])]
+            results.append([(int(ids[j]), round(float(distances[i, j]), 2)) for j in row])
+    return results
@@ -0,0 +1,96 @@
+"""
+Kubelka-Munk mixing math for the tint engine (see tinting.py).
+
+Runs inside the image worker pool (see processing.py), so this module must
+only depend on NumPy - never on Django or the database.
+"""
+import numpy as np
+
+from . import colorspace
+
+# Reflectance floor, keeps K/S finite for near-black colorants
+MIN_REFLECTANCE = 0.002
+
+# Concentrations below this (ml per liter) are dropped from a formula
+MIN_DOSE_ML = 0.1
+
+NNLS_ITERATIONS = 800
+
+
+def reflectance_to_ks(reflectance):
+    r = np.clip(reflectance, MIN_REFLECTANCE, 1.0)
+    return (1 - r) ** 2 / (2 * r)
+
+
+def ks_to_reflectance(ks):
+    ks = np.maximum(ks, 0.0)
+    return 1 + ks - np.sqrt(ks ** 2 + 2 * ks)
+
+
+def _ks_weights(ks):
+    """
+    Per-channel weights that turn K/S residuals into approximate sRGB
+    residuals (derivative of K/S -> reflectance -> gamma-encoded value).
+    Without them, dark channels (huge K/S) would dominate the fit.
+    """
+    ks = np.maximum(ks, 1e-6)
+    reflectance = np.clip(ks_to_reflectance(ks), MIN_REFLECTANCE, 1.0)
+    d_reflectance = np.abs(1 - (ks + 1) / np.sqrt(ks ** 2 + 2 * ks))
+    d_srgb = 1.055 / 2.4 * reflectance ** (1 / 2.4 - 1)
+    return d_reflectance * d_srgb
+
+
+def nnls_batch(a, y, upper_sum, weights=None, iterations=NNLS_ITERATIONS):
+    """
+    Solves min ||w * (a @ x - y)|| with x >= 0 and sum(x) <= upper_sum for a
+    whole batch at once (accelerated projected gradient).
+
+    a: (channels, m) shared design matrix
+    y: (batch, channels) targets
+    upper_sum: (batch,) cap on the total concentration per problem
+    weights: optional (batch, channels) residual weights
+    Returns x with shape (batch, m).
+    """
+    w2 = np.ones_like(y) if weights is None else weights ** 2
+    # Per-problem normal equations: (batch, m, m) and (batch, m)
+    ata = np.einsum("bc,cm,cn->bmn", w2, a, a)
+    aty = np.einsum("bc,bc,cm->bm", w2, y, a)
+    step = 1.0 / np.maximum(np.linalg.eigvalsh(ata)[:, -1], 1e-12)
+
+    x = np.zeros((len(y), a.shape[1]))
+    z, t = x.copy(), 1.0
+    for _ in range(iterations):
+        gradient = np.einsum("bm,bmn->bn", z, ata) - aty
+        x_next = np.maximum(z - step[:, None] * gradient, 0.0)
+        total = x_next.sum(axis=1)
+        over = total > upper_sum
+        x_next[over] *= (upper_sum[over] / total[over])[:, None]
+
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        z = x_next + ((t - 1) / t_next) * (x_next - x)
+        x, t = x_next, t_next
+    return x
+
+
+def solve_formulas(colorant_ks, base_ks, caps, target_rgb, target_lab):
+    """
+    Solves one NNLS problem per (target, base) pair in a single batch.
+
+    colorant_ks: (m, 3) K/S of each colorant at full strength
+    base_ks: (n_bases, 3); caps: (n_bases,) total colorant cap per base
+    target_rgb, target_lab: (n_targets, 3), NaN-free
+    Returns (x, mixed_rgb, errors): concentrations (n_targets * n_bases, m),
+    predicted sRGB per pair and the (n_targets, n_bases) CIEDE2000 matrix.
+    """
+    n_targets, n_bases = len(target_rgb), len(base_ks)
+    target_ks = reflectance_to_ks(colorspace.srgb_to_linear(target_rgb))
+    y = (target_ks[:, None, :] - base_ks[None, :, :]).reshape(-1, 3)
+    upper = np.tile(caps, n_targets)
+    weights = np.repeat(_ks_weights(target_ks), n_bases, axis=0)
+    x = nnls_batch(colorant_ks.T, y, upper, weights=weights)
+    x[x * 1000 < MIN_DOSE_ML] = 0.0
+
+    mixed_ks = np.repeat(base_ks[None], n_targets, axis=0).reshape(-1, 3) + x @ colorant_ks
+    mixed_rgb = colorspace.linear_to_srgb(ks_to_reflectance(mixed_ks))
+    errors = colorspace.delta_e(np.repeat(target_lab, n_bases, axis=0), colorspace.rgb_to_lab(mixed_rgb))
+    return x, mixed_rgb, errors.reshape(n_targets, n_bases)
@@ -1,8 +1,49 @@
+import numpy as np
 from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
 from django.conf import settings
 
+from home import counters
+from home.slugs import save_with_unique_slug
+from . import colorspace
+
+# Numeric channel columns derived from Color.hex_code
+CHANNEL_FIELDS = ("red", "green", "blue", "hue", "saturation", "lightness", "lab_l", "lab_a", "lab_b")
+
+# Below this L*a*b* chroma a color reads as gray/white/black and gets no hue
+ACHROMATIC_CHROMA = 5.0
+
+
+def compute_channels(hex_codes):
+    """
+    Returns one {field: value} dict of CHANNEL_FIELDS per hex code, computed
+    in a single vectorized pass. Missing or invalid codes give all-None dicts.
+    """
+    rgb = colorspace.hex_to_rgb(hex_codes)
+    hsl = colorspace.rgb_to_hsl(rgb)
+    lab = colorspace.rgb_to_lab(rgb)
+    chroma = colorspace.lab_chroma(lab)
+
+    results = []
+    for i in range(len(hex_codes)):
+        if np.isnan(rgb[i]).any():
+            results.append(dict.fromkeys(CHANNEL_FIELDS))
+            continue
+        red, green, blue = (int(v) for v in rgb[i])
+        results.append({
+            "red": red,
+            "green": green,
+            "blue": blue,
+            "hue": None if chroma[i] < ACHROMATIC_CHROMA else round(float(hsl[i, 0]), 2),
+            "saturation": round(float(hsl[i, 1]), 2),
+            "lightness": round(float(hsl[i, 2]), 2),
+            "lab_l": round(float(lab[i, 0]), 3),
+            "lab_a": round(float(lab[i, 1]), 3),
+            "lab_b": round(float(lab[i, 2]), 3),
+        })
+    return results
+
 
 class ColorCollection(models.Model):
     """Group of colors, e.g., Designer Series, Coastal Collection."""
@@ -101,6 +142,19 @@ class Color(models.Model):
 
     main_image = models.ImageField(upload_to="colors/swatches/", blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    save_count = models.PositiveIntegerField(default=0, editable=False, help_text="Times saved by users")
+    view_count = models.PositiveIntegerField(default=0, editable=False, help_text="Detail page views")
+
+    # --- Numeric channels, derived from hex_code on save (see compute_channels) ---
+    red = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    green = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    blue = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    hue = models.FloatField(blank=True, null=True, editable=False, help_text="HSL hue 0-360, empty for grays")
+    saturation = models.FloatField(blank=True, null=True, editable=False, help_text="HSL saturation 0-100")
+    lightness = models.FloatField(blank=True, null=True, editable=False, help_text="HSL lightness 0-100")
+    lab_l = models.FloatField(blank=True, null=True, editable=False, help_text="CIE L* (perceived lightness)")
+    lab_a = models.FloatField(blank=True, null=True, editable=False)
+    lab_b = models.FloatField(blank=True, null=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -109,27 +163,142 @@ class Color(models.Model):
         verbose_name = "Color"
         verbose_name_plural = "Colors"
         ordering = ["name"]
+        indexes = [
+            # Spectrum sort and hue range filters
+            models.Index(fields=["is_active", "hue", "lab_l"], name="color_active_hue_idx"),
+            # Lightness sort and light/dark range filters
+            models.Index(fields=["is_active", "lab_l"], name="color_active_lab_l_idx"),
+            models.Index(fields=["saturation"], name="color_saturation_idx"),
+            # "Most popular" sort
+            models.Index(fields=["is_active", "-save_count"], name="color_active_popular_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.code})"
 
+    def update_channels(self):
+        """Recomputes the numeric channel columns from hex_code."""
+        for field, value in compute_channels([self.hex_code])[0].items():
+            setattr(self, field, value)
+
     def save(self, *args, **kwargs):
-        # Automatically generate slug if not set
+        counters.exclude_counters(self, kwargs)
+        self.update_channels()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "hex_code" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *CHANNEL_FIELDS}
+
+        # Automatically generate a unique slug if not set (retries on concurrent collisions)
         if not self.slug:
-            base_slug = slugify(f"{self.name}-{self.code}")
-            slug = base_slug
-            # Ensure uniqueness
-            counter = 1
-            while Color.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug[:150]  # truncate safely
+            save_with_unique_slug(self, f"{self.name}-{self.code}", super().save, *args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("color_detail", args=[self.slug])
 
 
+class ColorHarmony(models.Model):
+    """
+    Precomputed "pairs well with" matches for a color, one row per
+    (color, rule, rank). Rebuilt by the compute_color_harmonies command.
+    """
+    RULE_CHOICES = [
+        ("complementary", "Complementary"),
+        ("analogous", "Analogous"),
+        ("triadic", "Triadic"),
+        ("split_complementary", "Split Complementary"),
+    ]
+
+    color = models.ForeignKey(Color, on_delete=models.CASCADE, related_name="harmonies")
+    match = models.ForeignKey(Color, on_delete=models.CASCADE, related_name="+")
+    rule = models.CharField(max_length=20, choices=RULE_CHOICES)
+    rank = models.PositiveSmallIntegerField()
+    delta_e = models.FloatField(help_text="Distance from the ideal harmony color (CIEDE2000, lightness ignored)")
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["color", "rule", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["color", "rule", "rank"], name="unique_color_harmony_rank"),
+        ]
+        verbose_name = "Color Harmony"
+        verbose_name_plural = "Color Harmonies"
+
+    def __str__(self):
+        return f"{self.color_id} {self.rule} #{self.rank}: {self.match_id}"
+
+
+class ColorContrastPair(models.Model):
+    """
+    WCAG contrast ratio and LRV difference between two colors. Each color
+    keeps only its strongest partners that pass the thresholds in
+    colors/contrast.py (PARTNERS_PER_COLOR), so "partners of X" is one
+    indexed lookup and the table grows linearly with the catalog.
+    Rebuilt by the compute_contrast_pairs command.
+    """
+    color = models.ForeignKey(Color, on_delete=models.CASCADE, related_name="contrast_pairs")
+    partner = models.ForeignKey(Color, on_delete=models.CASCADE, related_name="+")
+    contrast_ratio = models.FloatField()
+    lrv_difference = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["color", "partner"], name="unique_color_contrast_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["color", "-contrast_ratio"], name="contrast_color_ratio_idx"),
+        ]
+        verbose_name = "Color Contrast Pair"
+        verbose_name_plural = "Color Contrast Pairs"
+
+    def __str__(self):
+        return f"{self.color_id} / {self.partner_id}: {self.contrast_ratio:.2f}:1"
+
+
+class Colorant(models.Model):
+    """
+    Universal tinting colorant dispensed into a base (e.g. Oxide Red, Phthalo Blue).
+    Used by the tint engine (see colors/tinting.py) to match off-catalog colors.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    code = models.CharField(max_length=20, unique=True, help_text="Dispenser code, e.g. AXX")
+    hex_code = models.CharField(max_length=7, help_text="Masstone (undiluted) color")
+    strength = models.DecimalField(
+        max_digits=5, decimal_places=2, default=1,
+        help_text="Tinting strength relative to a standard colorant (1.00 = standard)"
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+
+class TintBase(models.Model):
+    """A tintable base (white, pastel, deep, clear) that colorants are added to."""
+    name = models.CharField(max_length=100, unique=True)
+    code = models.CharField(max_length=20, unique=True)
+    hex_code = models.CharField(max_length=7, help_text="Color of the untinted base")
+    product = models.ForeignKey(
+        "products.Product", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="tint_bases", help_text="The paint this base is sold as"
+    )
+    max_colorant_ml_per_liter = models.DecimalField(
+        max_digits=6, decimal_places=2, default=60,
+        help_text="Most colorant the base can take before film properties suffer"
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
 class SavedColor(models.Model):
     """
     Stores colors that users have saved (favorites/bookmarks).
@@ -140,7 +309,7 @@ class SavedColor(models.Model):
     color = models.ForeignKey(
         Color, on_delete=models.CASCADE, related_name="saved_by_users"
     )
-    saved_at = models.DateTimeField(auto_now_add=True)
+    saved_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = ("user", "color")
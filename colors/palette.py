@@ -0,0 +1,85 @@
+"""
+Dominant color extraction for customer photos.
+
+Runs inside the image worker pool (see processing.py), so this module must
+only depend on NumPy and Pillow - never on Django or the database.
+"""
+import io
+
+import numpy as np
+from PIL import Image
+
+from . import colorspace
+
+# Longest side the photo is decoded/downsampled to before clustering
+WORKING_SIZE = 256
+
+# Pixels fed to k-means; more adds time but barely changes the palette
+SAMPLE_PIXELS = 20000
+
+
+def load_downsampled(data, size=WORKING_SIZE):
+    """
+    Decodes image bytes straight to a small RGB array. For JPEGs, draft()
+    makes the decoder scale down by up to 8x while decoding, so a 24 MP phone
+    photo never exists in memory at full resolution.
+    """
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", (size, size))
+    image = image.convert("RGB")
+    image.thumbnail((size, size), Image.Resampling.BILINEAR)
+    return np.asarray(image, dtype=np.uint8)
+
+
+def kmeans(points, k, iterations=20, seed=0):
+    """
+    Vectorized k-means (k-means++ seeding). Returns (centers, counts),
+    biggest cluster first.
+    """
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(len(points))]]
+    dist = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = dist.sum()
+        if total == 0:
+            break
+        centers.append(points[rng.choice(len(points), p=dist / total)])
+        dist = np.minimum(dist, ((points - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        # (N, k) squared distances without materializing an (N, k, 3) array
+        d = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+        labels = d.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        moved = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        if np.allclose(moved, centers, atol=0.05):
+            centers = moved
+            break
+        centers = moved
+
+    counts = np.bincount(labels, minlength=len(centers))
+    order = np.argsort(-counts)
+    keep = counts[order] > 0
+    return centers[order][keep], counts[order][keep]
+
+
+def extract_palette(data, colors=6):
+    """
+    Returns the `colors` dominant colors of an image as a list of
+    {"hex": "#RRGGBB", "lab": [L, a, b], "weight": share of the photo}.
+    Clustering happens in L*a*b* so clusters match perceived differences.
+    """
+    pixels = load_downsampled(data).reshape(-1, 3).astype(float)
+    if len(pixels) > SAMPLE_PIXELS:
+        pixels = pixels[np.random.default_rng(0).choice(len(pixels), SAMPLE_PIXELS, replace=False)]
+
+    centers, counts = kmeans(colorspace.rgb_to_lab(pixels), colors)
+    weights = counts / counts.sum()
+    hexes = colorspace.rgb_to_hex(colorspace.lab_to_rgb(centers))
+    return [
+        {"hex": hex_code, "lab": [round(float(v), 3) for v in lab], "weight": round(float(weight), 4)}
+        for hex_code, lab, weight in zip(hexes, centers, weights)
+    ]
@@ -0,0 +1,53 @@
+"""
+Process pool for CPU-heavy image work (photo palettes, visualizer renders, tint formulas).
+
+Pillow/NumPy work would otherwise hold a gunicorn worker for the whole
+computation; the pool keeps it off the web workers and caps how many images
+are processed at once. Functions submitted here must not touch Django.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+_executor = None
+_lock = threading.Lock()
+
+
+class ProcessingError(Exception):
+    """The pool could not produce a result (timeout or crashed worker)."""
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                # spawn: never fork a process that holds DB connections and threads
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def run(fn, *args, timeout=None):
+    """Runs fn(*args) in the pool and waits for the result."""
+    timeout = timeout or settings.IMAGE_PROCESSING_TIMEOUT
+    try:
+        return get_executor().submit(fn, *args).result(timeout=timeout)
+    except TimeoutError:
+        raise ProcessingError("Image processing timed out.")
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start a fresh pool next time
+        shutdown()
+        raise ProcessingError("Image processing failed.")
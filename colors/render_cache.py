@@ -0,0 +1,105 @@
+"""
+Private on-disk cache of room visualizer renders.
+
+Renders are keyed by a hash of the photo, the wall mask and the paint color, so
+repeat previews of the same combination skip the image pool. They live under
+VISUALIZER_CACHE_ROOT, which nginx does not serve: a render of a customer's room
+only comes back through the visualizer_render view, at an address derived from
+the photo itself. Entries expire after VISUALIZER_CACHE_TTL seconds and the
+oldest are dropped once the directory grows past VISUALIZER_CACHE_MAX_BYTES.
+Pruning walks the whole directory, so each worker only does it every
+VISUALIZER_CACHE_PRUNE_EVERY writes; the prune_visualizer_cache command does
+the same from cron.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+
+KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Renders this process has written since it last pruned
+_puts = 0
+
+
+def render_key(image_data, mask_data, lab, hex_code):
+    digest = hashlib.sha256()
+    # Hash each file separately so no photo/mask split can collide with another
+    digest.update(hashlib.sha256(image_data).digest())
+    digest.update(hashlib.sha256(mask_data).digest())
+    digest.update(f"{lab[0]:.4f},{lab[1]:.4f},{lab[2]:.4f}|{hex_code}".encode())
+    return digest.hexdigest()
+
+
+def _path(key):
+    return os.path.join(settings.VISUALIZER_CACHE_ROOT, key[:2], f"{key}.jpg")
+
+
+def get(key):
+    """Returns the path of a fresh cached render, or None."""
+    if not KEY_RE.match(key):
+        return None
+    path = _path(key)
+    try:
+        age = time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+    if age > settings.VISUALIZER_CACHE_TTL:
+        _remove(path)
+        return None
+    return path
+
+
+def put(key, data):
+    global _puts
+    path = _path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename, so a concurrent get never serves half a JPEG
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _puts += 1
+    if _puts >= settings.VISUALIZER_CACHE_PRUNE_EVERY:
+        _puts = 0
+        prune()
+
+
+def prune():
+    """
+    Removes expired renders, then the oldest ones until the cache fits its size cap.
+    Returns the number of renders removed.
+    """
+    now = time.time()
+    entries, removed = [], 0
+    for directory, _, files in os.walk(settings.VISUALIZER_CACHE_ROOT):
+        for name in files:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > settings.VISUALIZER_CACHE_TTL:
+                _remove(path)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= settings.VISUALIZER_CACHE_MAX_BYTES:
+            break
+        _remove(path)
+        removed += 1
+        total -= size
+    return removed
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
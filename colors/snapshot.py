@@ -0,0 +1,123 @@
+"""
+Static snapshot of the active color catalog for client-side filtering.
+
+The color wall loads one JSON file with every active color as a compact row
+plus the facet memberships as id arrays ({finish id: [color ids]} ...), and
+then filters and sorts in the browser without calling Django.
+
+The file name carries a hash of its contents
+(SNAPSHOT_DIR/colors.<hash>.json), so nginx can serve it with immutable
+caching and a changed catalog is simply a new URL. snapshot_url() rebuilds
+and writes the file lazily, once per worker, after any change to the models
+in SNAPSHOT_MODELS (see home/invalidation.py). save_count is included as of
+the last rebuild, since counter updates don't bump catalog versions.
+"""
+import hashlib
+import json
+import os
+import time
+
+from django.conf import settings
+
+from home import invalidation
+from .models import Color, ColorCollection
+
+# Any change to these makes a new snapshot
+SNAPSHOT_MODELS = ("colors.Color", "colors.ColorCollection", "colors.Finish", "colors.Surface", "colors.RoomType")
+
+# Subdirectory of STATIC_ROOT holding the snapshots
+SNAPSHOT_DIR = "snapshots"
+
+# Superseded snapshots are kept this long for pages still open in browsers
+SNAPSHOT_KEEP_SECONDS = 24 * 60 * 60
+
+# Columns of each row in "colors"
+SNAPSHOT_FIELDS = (
+    "id", "name", "code", "hex_code", "slug", "image", "undertone", "collection",
+    "lrv", "hue", "lab_l", "saturation", "save_count", "created",
+)
+
+# Facet name (the color list's query parameter) -> M2M field on Color
+SNAPSHOT_FACETS = {
+    "finish": "available_finishes",
+    "surface": "recommended_surfaces",
+    "room": "recommended_rooms",
+}
+
+
+def _round(value, digits=2):
+    return None if value is None else round(float(value), digits)
+
+
+def build():
+    """Returns the snapshot dict (one values query per table, no instances)."""
+    colors = Color.objects.filter(is_active=True).order_by("pk")
+    rows = [
+        [
+            pk, name, code, hex_code or "", slug, image or "", undertone or "", collection_id,
+            _round(lrv), _round(hue), _round(lab_l), _round(saturation), save_count, int(created_at.timestamp()),
+        ]
+        for pk, name, code, hex_code, slug, image, undertone, collection_id, lrv, hue, lab_l, saturation, save_count, created_at
+        in colors.values_list(
+            "pk", "name", "code", "hex_code", "slug", "main_image", "undertone", "collection_id",
+            "lrv", "hue", "lab_l", "saturation", "save_count", "created_at",
+        )
+    ]
+
+    facets = {}
+    for facet, field in SNAPSHOT_FACETS.items():
+        through = getattr(Color, field).through
+        target = getattr(Color, field).field.m2m_reverse_field_name()
+        members = {}
+        for target_id, color_id in (
+            through.objects.filter(color__is_active=True)
+            .order_by(f"{target}_id", "color_id")
+            .values_list(f"{target}_id", "color_id")
+        ):
+            members.setdefault(str(target_id), []).append(color_id)
+        facets[facet] = members
+
+    return {
+        "fields": SNAPSHOT_FIELDS,
+        "colors": rows,
+        "collections": {str(pk): [slug, name] for pk, slug, name in ColorCollection.objects.values_list("pk", "slug", "name")},
+        "facets": facets,
+        "media_url": settings.MEDIA_URL,
+    }
+
+
+def _prune(directory, keep):
+    cutoff = time.time() - SNAPSHOT_KEEP_SECONDS
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name != keep and name.startswith("colors.") and os.path.getmtime(path) < cutoff:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def write():
+    """Builds the snapshot, writes it if that content isn't on disk yet, and returns its static path."""
+    data = json.dumps(build(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    name = f"colors.{hashlib.sha256(data).hexdigest()[:16]}.json"
+    directory = os.path.join(settings.STATIC_ROOT, SNAPSHOT_DIR)
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        _prune(directory, name)
+    return f"{SNAPSHOT_DIR}/{name}"
+
+
+def snapshot_url():
+    """URL of the current snapshot; rebuilt only after the catalog changed. None if it can't be written."""
+    try:
+        # Not static(): the file is written at runtime, so it is never in a staticfiles manifest
+        return settings.STATIC_URL + invalidation.versioned("colors:snapshot", SNAPSHOT_MODELS, write)
+    except OSError as e:
+        print(f"Color snapshot error: {e}")
+        return None
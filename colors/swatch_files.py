@@ -0,0 +1,261 @@
+"""
+Readers for manufacturer color catalogs: CSV, JSON / JSON Lines and
+Adobe Swatch Exchange (.ase) files.
+
+Each reader is a generator of plain dicts (one per color) so that large
+fan decks are never loaded in memory at once. Keys follow the Color model
+field names, plus "collection", "finishes", "surfaces" and "rooms" which
+hold names of the related objects. A color the reader can't use (e.g. an
+unsupported ASE color model) is yielded with an ERROR_KEY entry saying why,
+so the import can skip and report it like any other bad row.
+"""
+import csv
+import itertools
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+from . import colorspace
+
+FORMATS = ("csv", "json", "jsonl", "ase")
+
+# Set on a row the reader could not turn into a color; holds the reason
+ERROR_KEY = "_error"
+
+# Characters read at a time from a JSON array file
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Fields that hold several names, e.g. "Matte|Satin"
+LIST_FIELDS = ("finishes", "surfaces", "rooms")
+LIST_SEPARATOR = re.compile(r"[|;,]")
+
+# Accepted alternative column names -> model field names
+ALIASES = {
+    "hex": "hex_code",
+    "rgb": "rgb_value",
+    "cmyk": "cmyk_value",
+    "collection_name": "collection",
+    "available_finishes": "finishes",
+    "recommended_surfaces": "surfaces",
+    "recommended_rooms": "rooms",
+}
+
+
+def detect_format(path):
+    """Guesses the file format from its extension."""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext == "ndjson":
+        return "jsonl"
+    if ext not in FORMATS:
+        raise ValueError(f"Unknown file type '.{ext}'. Use one of: {', '.join(FORMATS)}.")
+    return ext
+
+
+def read_rows(path, fmt=None):
+    """Yields one dict per color from the file at `path`."""
+    fmt = fmt or detect_format(path)
+    if fmt == "ase":
+        with open(path, "rb") as stream:
+            yield from read_ase(stream)
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as stream:
+        if fmt == "csv":
+            yield from read_csv(stream)
+        else:
+            yield from read_json(stream)
+
+
+def _normalize(row):
+    """Lower-cases keys, applies aliases and splits list fields."""
+    clean = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip().lower().replace(" ", "_")
+        key = ALIASES.get(key, key)
+        if isinstance(value, str):
+            value = value.strip()
+        if key in LIST_FIELDS and isinstance(value, str):
+            value = [v.strip() for v in LIST_SEPARATOR.split(value) if v.strip()]
+        clean[key] = value
+    return clean
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        yield _normalize(row)
+
+
+def _json_row(item):
+    if not isinstance(item, dict):
+        return {ERROR_KEY: "not a JSON object"}
+    return _normalize(item)
+
+
+def read_json(stream):
+    """Reads a JSON array of objects, or JSON Lines (one object per line)."""
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+
+    if first == "[":
+        for item in _json_array_items(stream):
+            yield _json_row(item)
+        return
+
+    lines = [first + stream.readline()] if first else []
+    for line in itertools.chain(lines, stream):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {ERROR_KEY: f"invalid JSON ({e.msg})"}
+            continue
+        yield _json_row(item)
+
+
+def _json_array_items(stream):
+    """
+    Yields the items of a JSON array whose opening '[' has already been read,
+    decoding them one at a time from JSON_CHUNK_SIZE reads.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = stream.read(JSON_CHUNK_SIZE)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                raise ValueError("Unexpected end of JSON array.")
+            fill()
+
+    if next_char() == "]":
+        return
+    while True:
+        next_char()
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The item runs past the buffer (or is invalid, which the last read will show)
+            fill()
+            continue
+        if end == len(buf) and not eof:
+            # A number at the end of the buffer may continue in the next read
+            fill()
+            continue
+        pos = end
+        yield item
+
+        separator = next_char()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, found '{separator}'.")
+
+
+# --- Adobe Swatch Exchange ---
+
+_ASE_GROUP_START = 0xC001
+_ASE_GROUP_END = 0xC002
+_ASE_COLOR = 0x0001
+
+# "OB-202 Ocean Breeze", "OB-202 - Ocean Breeze" or "Ocean Breeze OB-202"
+_LEADING_CODE = re.compile(r"^([A-Za-z]{0,6}[- ]?\d[\w-]*)\s*[-:–]?\s+(.+)$")
+_TRAILING_CODE = re.compile(r"^(.+?)\s*[-:–(]?\s+([A-Za-z]{0,6}[- ]?\d[\w-]*)\)?$")
+
+
+def split_swatch_name(label):
+    """Splits a swatch label into (code, name). code is None if none is found."""
+    label = label.strip()
+    match = _LEADING_CODE.match(label)
+    if match:
+        return match.group(1).upper(), match.group(2).strip()
+    match = _TRAILING_CODE.match(label)
+    if match:
+        return match.group(2).upper(), match.group(1).strip()
+    return None, label
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated ASE file.")
+    return data
+
+
+def _read_ase_string(data, offset):
+    (length,) = struct.unpack_from(">H", data, offset)
+    offset += 2
+    text = data[offset:offset + length * 2].decode("utf-16-be").rstrip("\x00")
+    return text, offset + length * 2
+
+
+def _ase_color_to_rgb(model, values):
+    if model == "RGB":
+        return np.array(values) * 255.0
+    if model == "CMYK":
+        return colorspace.cmyk_to_rgb(np.array(values) * 100.0)
+    if model == "LAB":
+        # L is stored as 0-1, a/b as-is
+        return colorspace.lab_to_rgb(np.array([values[0] * 100.0, values[1], values[2]]))
+    if model == "Gray":
+        return np.repeat(values[0] * 255.0, 3)
+    return None
+
+
+def read_ase(stream):
+    """Yields {code, name, hex_code, collection} for every swatch in an .ase file."""
+    header = _read_exact(stream, 12)
+    if header[:4] != b"ASEF":
+        raise ValueError("Not an Adobe Swatch Exchange file.")
+    (block_count,) = struct.unpack(">I", header[8:12])
+
+    group = None
+    for _ in range(block_count):
+        block_type, length = struct.unpack(">HI", _read_exact(stream, 6))
+        data = _read_exact(stream, length)
+
+        try:
+            if block_type == _ASE_GROUP_START:
+                group, _ = _read_ase_string(data, 0)
+                continue
+            if block_type == _ASE_GROUP_END:
+                group = None
+                continue
+            if block_type != _ASE_COLOR:
+                continue
+            label, offset = _read_ase_string(data, 0)
+            model = data[offset:offset + 4].decode("ascii").strip()
+            count = {"RGB": 3, "CMYK": 4, "LAB": 3, "Gray": 1}.get(model, 0)
+            values = struct.unpack_from(f">{count}f", data, offset + 4)
+        except struct.error:
+            # A block shorter than its contents claim (truncated or corrupt file)
+            raise ValueError("Malformed ASE file.")
+
+        code, name = split_swatch_name(label)
+        row = {"code": code, "name": name}
+        rgb = _ase_color_to_rgb(model, values) if np.isfinite(values).all() else None
+        if rgb is None:
+            row[ERROR_KEY] = f"unsupported ASE color model '{model}'" if not count else "invalid color values"
+        else:
+            row["hex_code"] = colorspace.rgb_to_hex(rgb)[0]
+        if group:
+            row["collection"] = group
+        yield row
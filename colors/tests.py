@@ -1,3 +1,637 @@
-from django.test import TestCase
+import io
+import json
+import os
+import struct
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from PIL import Image
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from colors import (
+    codes, colorspace, contrast, harmony, matching, mixing, palette, processing, render_cache, snapshot,
+    swatch_files, tinting, visualizer,
+)
+from colors.models import Color, ColorCollection, Colorant, ColorHarmony, Finish, TintBase, compute_channels
+from colors.views import CODE_RESOLVE_MAX, PALETTE_MAX_COLORS, TINT_MATCH_MAX_TARGETS
+from home import invalidation
+from products.models import Category, Product, Size
+
+
+class ColorspaceTests(TestCase):
+    def test_normalize_hex(self):
+        self.assertEqual(colorspace.normalize_hex("5dade3"), "#5DADE3")
+        self.assertEqual(colorspace.normalize_hex("#abc"), "#AABBCC")
+        self.assertIsNone(colorspace.normalize_hex("zzz"))
+        self.assertIsNone(colorspace.normalize_hex(""))
+
+    def test_hex_to_rgb_marks_invalid_rows(self):
+        rgb = colorspace.hex_to_rgb(["#FF8000", None, "#12345"])
+        self.assertEqual(rgb[0].tolist(), [255.0, 128.0, 0.0])
+        self.assertTrue(np.isnan(rgb[1:]).all())
+
+    def test_rgb_to_cmyk(self):
+        cmyk = colorspace.rgb_to_cmyk(np.array([[255, 0, 0], [0, 0, 0]]))
+        np.testing.assert_allclose(cmyk, [[0, 100, 100, 0], [0, 0, 0, 100]])
+
+
+class ImportColorsTests(TestCase):
+    def import_file(self, content, *args, suffix=".csv", errors=False):
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with tempfile.NamedTemporaryFile(mode, suffix=suffix, delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command("import_colors", f.name, *args, stdout=out, stderr=err)
+        return (out.getvalue(), err.getvalue()) if errors else out.getvalue()
+
+    CSV = (
+        "code,name,hex,collection,finishes\n"
+        "OB-202,Ocean Breeze,#5DADE3,Coastal Collection,Matte|Eggshell\n"
+        "FD-0001,Fern,#4F7942,,\n"
+        "XX-1,Bad,zzz,,\n"
+    )
+
+    def test_creates_colors_and_related_rows(self):
+        summary = self.import_file(self.CSV)
+        self.assertIn("2 created, 0 updated, 0 unchanged, 1 skipped, 2 finish/surface/room links", summary)
+        color = Color.objects.get(code="OB-202")
+        self.assertEqual(color.rgb_value, "93,173,227")
+        self.assertEqual(color.collection, ColorCollection.objects.get(name="Coastal Collection"))
+        self.assertEqual(color.available_finishes.count(), 2)
+        self.assertTrue(color.slug)
+
+    def test_reimport_is_unchanged(self):
+        self.import_file(self.CSV)
+        summary = self.import_file(self.CSV)
+        self.assertIn("0 created, 0 updated, 2 unchanged", summary)
+
+    def test_dry_run_matches_real_import_across_batches(self):
+        content = self.CSV + "OB-202,Ocean Breeze,#5DADE4,,\nFD-0001,Fern,#4F7942,,\n"
+        dry = self.import_file(content, "--dry-run", "--batch-size", "2")
+        self.assertFalse(Color.objects.exists())
+        real = self.import_file(content, "--batch-size", "2")
+        self.assertEqual(dry.splitlines()[-1].split(":", 1)[1], real.splitlines()[-1].split(":", 1)[1])
+
+    def test_numeric_json_codes(self):
+        summary = self.import_file(json.dumps([{"code": 1234, "name": 5678, "hex": "#4F7942"}]), suffix=".json")
+        self.assertIn("1 created", summary)
+        self.assertEqual(Color.objects.get(code="1234").name, "5678")
+
+    def test_bad_json_values_are_skipped_and_reported(self):
+        rows = [
+            {"code": "OB-202", "name": "Ocean Breeze", "hex": "#5DADE3", "lrv": 61.5, "finishes": ["Matte"]},
+            {"code": "NA-1", "name": "Not a number", "lrv": "NaN"},
+            {"code": "IN-1", "name": "Infinite", "coverage_per_liter": "Infinity"},
+            {"code": "HI-1", "name": "Too bright", "lrv": 250},
+            {"code": "BIG-1", "name": "Too big", "drying_time_hours": 1e30},
+            {"code": "FI-1", "name": "Finish count", "finishes": 3},
+            ["not", "an", "object"],
+        ]
+        with mock.patch.object(swatch_files, "JSON_CHUNK_SIZE", 16):
+            summary, errors = self.import_file(json.dumps(rows), suffix=".json", errors=True)
+        self.assertIn("1 created, 0 updated, 0 unchanged, 6 skipped", summary)
+        self.assertEqual(Color.objects.get().lrv, Decimal("61.50"))
+        for expected in ("(NA-1): lrv 'NaN' is not a number", "(IN-1): coverage_per_liter", "(HI-1): lrv must be",
+                         "(BIG-1): drying_time_hours must be", "(FI-1): finishes must be a list", "not a JSON object"):
+            self.assertIn(expected, errors)
+
+    def test_unsupported_ase_swatches_are_skipped(self):
+        def swatch(label, model, *values):
+            name = (label + "\0").encode("utf-16-be")
+            body = struct.pack(">H", len(name) // 2) + name + model + struct.pack(f">{len(values)}f", *values) + b"\0\2"
+            return struct.pack(">HI", 0x0001, len(body)) + body
+
+        content = (b"ASEF\0\1\0\0" + struct.pack(">I", 2) + swatch("OB-202 Ocean Breeze", b"RGB ", 0.4, 0.7, 0.9)
+                   + swatch("SP-1 Spot", b"HSV ", 0.1, 0.2, 0.3))
+        summary, errors = self.import_file(content, suffix=".ase", errors=True)
+        self.assertIn("1 created, 0 updated, 0 unchanged, 1 skipped", summary)
+        self.assertIn("Row 2 (SP-1): unsupported ASE color model 'HSV'", errors)
+        self.assertTrue(Color.objects.filter(code="OB-202").exists())
+
+    def test_truncated_ase_block_is_reported(self):
+        # One color block whose one-byte body can't even hold its name length
+        content = b"ASEF" + b"\x00\x01\x00\x00" + b"\x00\x00\x00\x01" + b"\x00\x01" + b"\x00\x00\x00\x01" + b"\x00"
+        with self.assertRaisesMessage(CommandError, "Malformed ASE file."):
+            self.import_file(content, suffix=".ase")
+
+
+class ColorChannelTests(TestCase):
+    def test_compute_channels(self):
+        red, gray, missing = compute_channels(["#FF0000", "#808080", None])
+        self.assertEqual((red["red"], red["green"], red["blue"]), (255, 0, 0))
+        self.assertEqual(red["hue"], 0)
+        self.assertAlmostEqual(red["lab_l"], 53.24, places=1)
+        self.assertIsNone(gray["hue"])
+        self.assertEqual(set(missing.values()), {None})
+
+    def test_save_keeps_channels_in_sync(self):
+        color = Color.objects.create(name="Fern", code="FD-1", hex_code="#4F7942")
+        self.assertEqual(color.green, 121)
+        color.hex_code = ""
+        color.save()
+        self.assertIsNone(Color.objects.get(pk=color.pk).green)
+
+
+class ColorListChannelFilterTests(TestCase):
+    def setUp(self):
+        for name, hex_code in [("Crimson", "#DC143C"), ("Scarlet", "#FF2400"), ("Sky", "#87CEEB"), ("Slate", "#808080")]:
+            Color.objects.create(name=name, code=name.upper(), hex_code=hex_code)
+
+    def names(self, **params):
+        response = self.client.get(reverse("color_list"), params, headers={"x-requested-with": "XMLHttpRequest"})
+        return [c["name"] for c in response.json()["colors"]]
+
+    def test_red_family_wraps_around_360(self):
+        self.assertEqual(self.names(family="red"), ["Crimson", "Scarlet"])
+
+    def test_neutral_family_is_colors_without_hue(self):
+        self.assertEqual(self.names(family="neutral"), ["Slate"])
+
+    def test_spectrum_sort_puts_grays_last(self):
+        self.assertEqual(self.names(sort="spectrum"), ["Scarlet", "Sky", "Crimson", "Slate"])
+
+    def test_invalid_range_is_ignored(self):
+        self.assertEqual(len(self.names(hue_min="abc")), 4)
+        self.assertEqual(self.names(tone="light"), ["Sky"])
+
+
+def image_bytes(colors, size=(64, 64), fmt="PNG"):
+    """A test image split into vertical stripes of the given colors."""
+    image = Image.new("RGB", size)
+    width = size[0] // len(colors)
+    for i, color in enumerate(colors):
+        image.paste(color, (i * width, 0, (i + 1) * width, size[1]))
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class PhotoPaletteTests(TestCase):
+    def setUp(self):
+        # Catalog caches are bumped on commit, which TestCase never reaches
+        invalidation.clear()
+
+    def test_extract_palette_finds_the_stripes(self):
+        swatches = palette.extract_palette(image_bytes([(255, 0, 0), (0, 0, 255)]), colors=5)
+        self.assertEqual({s["hex"] for s in swatches}, {"#FF0000", "#0000FF"})
+        self.assertAlmostEqual(sum(s["weight"] for s in swatches), 1.0, places=3)
+
+    def test_nearest_colors(self):
+        red = Color.objects.create(name="Red", code="R", hex_code="#FF0000")
+        Color.objects.create(name="Blue", code="B", hex_code="#0000FF")
+        lab = colorspace.rgb_to_lab(np.array([250.0, 10.0, 10.0]))
+        [[(color_id, distance)]] = matching.nearest_colors(lab)
+        self.assertEqual(color_id, red.pk)
+        self.assertLess(distance, 5)
+
+    def test_nearest_colors_in_blocks(self):
+        red = Color.objects.create(name="Red", code="R", hex_code="#FF0000")
+        blue = Color.objects.create(name="Blue", code="B", hex_code="#0000FF")
+        lab = colorspace.rgb_to_lab(np.array([[250.0, 10.0, 10.0], [10.0, 10.0, 250.0]] * 3))
+        with mock.patch.object(matching, "BLOCK_SIZE", 4):
+            rows = matching.nearest_colors(lab, limit=2)
+        self.assertEqual(
+            [[color_id for color_id, _ in row] for row in rows], [[red.pk, blue.pk], [blue.pk, red.pk]] * 3
+        )
+
+
+class MatchPhotoViewTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+
+    def post(self, data):
+        return self.client.post(reverse("match_photo"), data)
+
+    def test_requires_an_image(self):
+        self.assertEqual(self.post({}).status_code, 400)
+
+    def test_rejects_files_that_are_not_images(self):
+        response = self.post({"image": SimpleUploadedFile("room.jpg", b"not an image")})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=10)
+    def test_rejects_large_uploads(self):
+        response = self.post({"image": SimpleUploadedFile("room.png", image_bytes([(255, 0, 0)]))})
+        self.assertEqual(response.status_code, 400)
+
+    def test_matches_catalog_colors(self):
+        self.addCleanup(processing.shutdown)
+        red = Color.objects.create(name="Red", code="R", hex_code="#FF0000")
+        response = self.post({"image": SimpleUploadedFile("room.png", image_bytes([(255, 0, 0)]))})
+        self.assertEqual(response.status_code, 200)
+        [swatch] = response.json()["swatches"]
+        self.assertEqual(swatch["matches"][0]["id"], red.pk)
+
+
+class VisualizerTests(TestCase):
+    def setUp(self):
+        self.red = Color.objects.create(name="Red", code="R", hex_code="#FF0000")
+        self.cache_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(VISUALIZER_CACHE_ROOT=self.cache_root))
+
+    def test_recolor_paints_only_the_masked_half(self):
+        mask = image_bytes([(0, 0, 0), (255, 255, 255)])
+        photo = image_bytes([(128, 128, 128)])
+        rendered = visualizer.recolor(photo, mask, (self.red.lab_l, self.red.lab_a, self.red.lab_b))
+        image = Image.open(io.BytesIO(rendered)).convert("RGB")
+        left, right = image.getpixel((8, 32)), image.getpixel((56, 32))
+        self.assertLess(abs(left[0] - left[2]), 10)
+        self.assertGreater(right[0], right[2] + 100)
+
+    def test_recolor_rejects_an_empty_mask(self):
+        with self.assertRaises(ValueError):
+            visualizer.recolor(image_bytes([(128, 128, 128)]), image_bytes([(0, 0, 0)]), (50, 0, 0))
+
+    def post(self, **data):
+        data.setdefault("color_id", self.red.pk)
+        data.setdefault("mask", SimpleUploadedFile("mask.png", image_bytes([(255, 255, 255)])))
+        return self.client.post(reverse("visualize_color"), data)
+
+    def test_requires_a_color_and_a_mask(self):
+        self.assertEqual(self.client.post(reverse("visualize_color"), {"color_id": self.red.pk}).status_code, 400)
+
+    def test_unknown_color(self):
+        self.assertEqual(self.post(color_id="abc").status_code, 404)
+        self.assertEqual(self.post(color_id=self.red.pk + 1).status_code, 404)
+
+    def test_requires_a_room_photo(self):
+        self.assertEqual(self.post().status_code, 400)
+        self.assertEqual(self.post(color_image_id="x").status_code, 400)
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=10)
+    def test_rejects_a_large_mask(self):
+        response = self.post(image=SimpleUploadedFile("room.png", b"x"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("mask", response.json()["message"])
+
+    def test_caches_the_render_privately(self):
+        self.addCleanup(processing.shutdown)
+        photo = image_bytes([(128, 128, 128)])
+        response = self.post(image=SimpleUploadedFile("room.png", photo))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-store")
+        url = response.json()["image_url"]
+
+        with mock.patch.object(processing, "run") as run:
+            again = self.post(image=SimpleUploadedFile("room.png", photo))
+        run.assert_not_called()
+        self.assertEqual(again.json()["image_url"], url)
+
+        render = self.client.get(url)
+        self.assertEqual(render.status_code, 200)
+        self.assertEqual(render["Content-Type"], "image/jpeg")
+        self.assertTrue(render["Cache-Control"].startswith("private"))
+        self.assertEqual(Image.open(io.BytesIO(b"".join(render.streaming_content))).format, "JPEG")
+
+    def test_unknown_render(self):
+        self.assertEqual(self.client.get(reverse("visualizer_render", args=["0" * 64])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("visualizer_render", args=["..%2Fx"])).status_code, 404)
+
+    def test_cache_drops_expired_and_oldest_renders(self):
+        self.enterContext(mock.patch.object(render_cache, "_puts", 0))
+        keys = [render_cache.render_key(bytes([i]), b"mask", (50, 0, 0), "#808080") for i in range(3)]
+        with override_settings(VISUALIZER_CACHE_MAX_BYTES=15, VISUALIZER_CACHE_TTL=10 ** 12,
+                               VISUALIZER_CACHE_PRUNE_EVERY=3):
+            for i, key in enumerate(keys):
+                render_cache.put(key, b"x" * 10)
+                os.utime(render_cache.get(key), (1000 + i, 1000 + i))
+                if i == 1:
+                    # Over the cap, but not yet due for a prune
+                    self.assertIsNotNone(render_cache.get(keys[0]))
+            self.assertIsNone(render_cache.get(keys[0]))
+            self.assertIsNone(render_cache.get(keys[1]))
+            self.assertIsNotNone(render_cache.get(keys[2]))
+        # Outside the override the day-long TTL applies, and these renders are from 1970
+        out = StringIO()
+        call_command("prune_visualizer_cache", stdout=out)
+        self.assertIn("Removed 1 ", out.getvalue())
+        self.assertFalse(os.path.exists(render_cache._path(keys[2])))
+
+
+class TintMatchTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+        TintBase.objects.create(name="White Base", code="WB", hex_code="#FAFAFA")
+        Colorant.objects.create(name="Oxide Red", code="R", hex_code="#9B2D1F")
+        Colorant.objects.create(name="Phthalo Blue", code="B", hex_code="#0F2A6B")
+        Colorant.objects.create(name="Yellow Oxide", code="Y", hex_code="#C89B2A")
+        self.distributor = User.objects.create_user("dist", password="pw", role=User.Roles.DISTRIBUTOR)
+
+    def test_nnls_batch_respects_bounds(self):
+        a = np.eye(3)
+        x = mixing.nnls_batch(a, np.array([[1.0, -1.0, 0.5], [3.0, 3.0, 3.0]]), upper_sum=np.array([10.0, 3.0]))
+        np.testing.assert_allclose(x[0], [1.0, 0.0, 0.5], atol=1e-3)
+        self.assertLessEqual(x[1].sum(), 3.0 + 1e-9)
+        self.assertTrue((x >= 0).all())
+
+    def test_match_tints(self):
+        self.addCleanup(processing.shutdown)
+        pink, invalid = tinting.match_tints(["#E8B4A8", "nope"])
+        self.assertEqual(pink["base"].code, "WB")
+        self.assertLess(pink["delta_e"], 10)
+        self.assertTrue(all(dose["ml_per_liter"] > 0 for dose in pink["formula"]))
+        self.assertEqual(invalid["error"], "invalid hex code")
+
+    def post(self, payload):
+        return self.client.post(reverse("tint_match"), json.dumps(payload), content_type="application/json")
+
+    def test_customers_get_403(self):
+        self.assertEqual(self.post({"targets": ["#E8B4A8"]}).status_code, 403)
+        self.client.force_login(User.objects.create_user("jo", password="pw"))
+        self.assertEqual(self.post({"targets": ["#E8B4A8"]}).status_code, 403)
+
+    def test_invalid_requests_get_400(self):
+        self.client.force_login(self.distributor)
+        self.assertEqual(self.post({}).status_code, 400)
+        self.assertEqual(self.post({"targets": "#E8B4A8"}).status_code, 400)
+        self.assertEqual(self.post(["#E8B4A8"]).status_code, 400)
+        for bases in ("WB", {"WB": 1}, ["WB", 1]):
+            with self.subTest(bases=bases):
+                self.assertEqual(self.post({"targets": ["#E8B4A8"], "bases": bases}).status_code, 400)
+        response = self.client.post(reverse("tint_match"), "{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        too_many = ["#E8B4A8"] * (TINT_MATCH_MAX_TARGETS + 1)
+        self.assertEqual(self.post({"targets": too_many}).status_code, 400)
+
+    def test_returns_formulas(self):
+        self.client.force_login(self.distributor)
+        response = self.post({"targets": ["#E8B4A8"], "bases": ["WB"]})
+        self.assertEqual(response.status_code, 200)
+        [result] = response.json()["results"]
+        self.assertEqual(result["base"]["code"], "WB")
+
+
+class HarmonyTests(TestCase):
+    LAB = [[50, 40, 0], [70, -40, 0], [30, 38, 12], [60, 0, 0]]
+    LRV = [18, 41, 6, 28]
+
+    def test_complementary_partner(self):
+        results = harmony.compute_harmonies(self.LAB, self.LRV, [None] * 4, [True, True, True, False], per_rule=2)
+        index, score = results["complementary"]
+        self.assertEqual(index[0].tolist(), [1, -1])
+        self.assertEqual(index[1, 0], 0)
+        # Grays neither get nor give harmonies
+        self.assertEqual(index[3].tolist(), [-1, -1])
+        self.assertTrue(np.isinf(score[3]).all())
+
+    def test_lrv_contrast_is_required(self):
+        lrv = [18, 20, 6, 28]
+        index, _ = harmony.compute_harmonies(self.LAB, lrv, [None] * 4, [True] * 4, per_rule=1)["complementary"]
+        self.assertEqual(index[0, 0], -1)
+
+    def test_undertone_clash_is_penalized(self):
+        lab = [[50, 40, 0], [60, 35, 20], [60, 35, -20]]
+        lrv = [18, 28, 28]
+        neutral = harmony.compute_harmonies(lab, lrv, [None] * 3, [True] * 3, per_rule=2)["analogous"][1]
+        clash = harmony.compute_harmonies(lab, lrv, ["warm", "cool", "warm"], [True] * 3, per_rule=2)["analogous"][1]
+        self.assertAlmostEqual(clash[0].max() - neutral[0].max(), harmony.UNDERTONE_PENALTY)
+
+    def test_command_stores_ranked_matches(self):
+        Color.objects.create(name="Red", code="R", hex_code="#A4515B", lrv=15)
+        Color.objects.create(name="Teal", code="T", hex_code="#36BDBC", lrv=41)
+        call_command("compute_color_harmonies", stdout=StringIO())
+        pairs = set(ColorHarmony.objects.filter(rule="complementary").values_list("color__code", "match__code", "rank"))
+        self.assertEqual(pairs, {("R", "T", 1), ("T", "R", 1)})
+
+
+class ContrastTests(TestCase):
+    def test_contrast_ratio_and_levels(self):
+        self.assertAlmostEqual(float(contrast.contrast_ratio(1.0, 0.0)), 21.0)
+        self.assertEqual(float(contrast.contrast_ratio(0.2, 0.2)), 1.0)
+        self.assertEqual(contrast.wcag_level(7.0), "AAA")
+        self.assertEqual(contrast.wcag_level(4.5), "AA")
+        self.assertEqual(contrast.wcag_level(3.2), "AA Large")
+        self.assertIsNone(contrast.wcag_level(2.9))
+
+    def test_effective_lrv_prefers_measured_values(self):
+        lrv = contrast.effective_lrv([None, 12.5], np.array([[255.0, 255, 255], [255, 255, 255]]))
+        np.testing.assert_allclose(lrv, [100.0, 12.5], atol=1e-3)
+
+    def test_accessible_pairs_keeps_the_top_partners(self):
+        luminance = np.random.default_rng(1).random(300)
+        lrv = luminance * 100
+        ratio = contrast.contrast_ratio(luminance[:, None], luminance[None, :])
+        pairs = {}
+        for rows, cols, ratios, _ in contrast.accessible_pairs(luminance, lrv, limit=10):
+            for i, j, r in zip(rows, cols, ratios):
+                pairs.setdefault(i, []).append(r)
+        for i, found in pairs.items():
+            expected = np.sort(ratio[i])[::-1][:10]
+            expected = expected[expected >= contrast.MIN_STORED_CONTRAST]
+            np.testing.assert_allclose(sorted(found, reverse=True), expected)
+
+
+class ContrastViewTests(TestCase):
+    def setUp(self):
+        self.white = Color.objects.create(name="White", code="W", hex_code="#FFFFFF")
+        self.black = Color.objects.create(name="Black", code="K", hex_code="#000000")
+        self.gray = Color.objects.create(name="Gray", code="G", hex_code="#767676")
+
+    def validate(self, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(reverse("validate_palette"), body, content_type="application/json")
+
+    def test_validate_palette_rejects_malformed_requests(self):
+        for payload in (
+            "{", [1, 2], {"colors": ["W"]}, {"colors": "WK"},
+            {"colors": ["W"] * (PALETTE_MAX_COLORS + 1)},
+            {"colors": [[1], ["W"]]}, {"colors": [{"id": 1}, "W"]}, {"colors": [True, "W"]},
+            {"colors": ["W", "NOPE"]},
+            {"colors": ["W", "K"], "pairs": [["W", "G"]]}, {"colors": ["W", "K"], "pairs": [[["W"], "K"]]},
+        ):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.validate(payload).status_code, 400)
+
+    def test_validate_palette_checks_every_pair(self):
+        response = self.validate({"colors": ["W", self.black.pk, "G"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["valid"])
+        results = {tuple(r["colors"]): r for r in response.json()["pairs"]}
+        self.assertEqual(set(results), {("W", "K"), ("W", "G"), ("K", "G")})
+        self.assertEqual(results[("W", "K")]["contrast_ratio"], 21.0)
+        self.assertEqual(results[("W", "K")]["wcag"], "AAA")
+
+    def test_accessible_partners(self):
+        call_command("compute_contrast_pairs", stdout=StringIO())
+        response = self.client.get(reverse("accessible_partners", args=[self.white.pk]), {"limit": "x"})
+        self.assertEqual([p["code"] for p in response.json()["partners"]], ["K", "G"])
+        response = self.client.get(reverse("accessible_partners", args=[self.white.pk]), {"min_ratio": 7})
+        self.assertEqual([p["code"] for p in response.json()["partners"]], ["K"])
+        missing = self.client.get(reverse("accessible_partners", args=[self.gray.pk + 1]))
+        self.assertEqual(missing.status_code, 404)
+
+    def test_collection_and_lrv_partners_are_computed_live(self):
+        # Nothing stored: a collection's partners may all fall outside a color's global top N
+        trim = ColorCollection.objects.create(name="Trim", slug="trim")
+        Color.objects.filter(pk__in=[self.black.pk, self.gray.pk]).update(collection=trim)
+        Color.objects.create(name="Navy", code="N", hex_code="#000080")
+        url = reverse("accessible_partners", args=[self.white.pk])
+        response = self.client.get(url, {"collection": "trim"})
+        partners = response.json()["partners"]
+        self.assertEqual([p["code"] for p in partners], ["K", "G"])
+        self.assertEqual(partners[0]["wcag"], "AAA")
+        response = self.client.get(url, {"collection": "trim", "min_lrv": 90})
+        self.assertEqual([p["code"] for p in response.json()["partners"]], ["K"])
+
+
+class CodeResolutionTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+        for code in ("OB-202", "OB-203", "GG-305", "FD-1200"):
+            Color.objects.create(name=f"Color {code}", code=code)
+
+    def test_split_and_normalize(self):
+        self.assertEqual(codes.split_codes("OB-202, gg 305;\n\tFD-1200||"), ["OB-202", "gg 305", "FD-1200"])
+        self.assertEqual(codes.code_key("ob\u2013202"), codes.code_key("OB_202"))
+        self.assertEqual(codes.code_key(" ob 202 "), "OB202")
+
+    def test_exact_and_fuzzy_matches(self):
+        exact, fuzzy, tie, unknown = codes.resolve_codes(["ob 202", "GG-3005", "OB-20", "XY-202"])
+        self.assertEqual((exact["code"], exact["match"]), ("OB-202", "exact"))
+        self.assertEqual((fuzzy["code"], fuzzy["match"]), ("GG-305", "fuzzy"))
+        self.assertIsNone(tie["code"])
+        self.assertEqual(set(tie["suggestions"]), {"OB-202", "OB-203"})
+        # No catalog code starts with XY: no suggestions at all
+        self.assertEqual((unknown["code"], unknown["suggestions"]), (None, []))
+
+    def test_fuzzy_lookups_are_capped(self):
+        raw = [f"OB-202-{i}" for i in range(codes.MAX_FUZZY_LOOKUPS + 5)]
+        results = codes.resolve_codes(raw)
+        self.assertTrue(all(r["suggestions"] for r in results[:codes.MAX_FUZZY_LOOKUPS]))
+        self.assertFalse(any(r["suggestions"] for r in results[codes.MAX_FUZZY_LOOKUPS:]))
+        self.assertEqual([r["fuzzy_skipped"] for r in results].count(True), 5)
+        self.assertTrue(all(r["fuzzy_skipped"] for r in results[codes.MAX_FUZZY_LOOKUPS:]))
+        # No candidates at all is a real miss, not a skipped lookup
+        [junk] = codes.resolve_codes(["XY-1"])
+        self.assertFalse(junk["fuzzy_skipped"])
+
+    def test_fuzzy_can_be_disabled(self):
+        [result] = codes.resolve_codes(["GG-3005"], fuzzy=False)
+        self.assertEqual((result["code"], result["suggestions"]), (None, []))
+
+
+class ColorAdminSearchTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+        for code in ("OB-202", "GG-305", "FD-1200"):
+            Color.objects.create(name=f"Color {code}", code=code)
+        Color.objects.create(name="Red, Deep", code="RD-1")
+        self.client.force_login(User.objects.create_superuser("admin", password="pw"))
+
+    def search(self, term):
+        response = self.client.get(reverse("admin:colors_color_changelist"), {"q": term})
+        self.assertEqual(response.status_code, 200)
+        return sorted(c.code for c in response.context["cl"].result_list)
+
+    def test_pasted_codes_are_resolved(self):
+        self.assertEqual(self.search("ob 202, GG-305\nfd-1200"), ["FD-1200", "GG-305", "OB-202"])
+
+    def test_names_with_commas_still_match(self):
+        self.assertEqual(self.search("Red, Deep"), ["RD-1"])
+
+    def test_autocomplete_keeps_the_plain_search(self):
+        response = self.client.get(reverse("admin:autocomplete"), {
+            "term": "OB-202, GG-305", "app_label": "colors", "model_name": "savedcolor", "field_name": "color",
+        })
+        self.assertEqual(response.json()["results"], [])
+
+
+class ResolveCodesViewTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+        self.color = Color.objects.create(name="Ocean Breeze", code="OB-202")
+        self.other = Color.objects.create(name="Fern", code="FD-1")
+        self.product = Product.objects.create(
+            name="Silk Emulsion", description="Interior", category=Category.objects.create(name="Paints")
+        )
+        self.product.available_colors.add(self.color)
+        self.size = Size.objects.create(name="5L")
+        self.client.force_login(User.objects.create_user("dist", password="pw", role=User.Roles.DISTRIBUTOR))
+
+    def post(self, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(reverse("resolve_codes"), body, content_type="application/json")
+
+    def test_requires_a_trade_account(self):
+        self.client.logout()
+        self.assertEqual(self.post({"codes": ["OB-202"]}).status_code, 403)
+
+    def test_rejects_malformed_requests(self):
+        for payload in ("{", "[]", {}, {"text": " , "}, {"codes": ["X"] * (CODE_RESOLVE_MAX + 1)}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+
+    def test_rejects_invalid_quote_options(self):
+        for quote in (
+            "yes", {"product_id": "abc"}, {"product_id": self.product.pk + 1},
+            {"product_id": self.product.pk, "size_id": "x"},
+            {"product_id": self.product.pk, "quantity": "many"},
+            {"product_id": self.product.pk, "quantity": float("inf")},
+        ):
+            with self.subTest(quote=quote):
+                response = self.client.post(
+                    reverse("resolve_codes"),
+                    json.dumps({"codes": ["OB-202"], "quote": quote}, allow_nan=True),
+                    content_type="application/json",
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_resolves_and_adds_available_colors_to_the_quote(self):
+        response = self.post({
+            "text": "ob202, FD-1, ZZ-9",
+            "quote": {"product_id": self.product.pk, "size_id": self.size.pk, "quantity": 2},
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["summary"], {"exact": 2, "fuzzy": 0, "unknown": 1, "fuzzy_truncated": 0})
+        self.assertEqual(data["results"][0]["color"]["products"][0]["id"], self.product.pk)
+        self.assertEqual(data["quote"]["not_available"], ["FD-1"])
+        self.assertEqual(data["quote"]["quote_item_count"], 1)
+
+
+class ColorSnapshotTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+        self.static_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(STATIC_ROOT=self.static_root))
+        coastal = ColorCollection.objects.create(name="Coastal", slug="coastal")
+        self.sky = Color.objects.create(name="Sky", code="SK-1", hex_code="#87CEEB", collection=coastal)
+        self.matte = Finish.objects.create(name="Matte")
+        self.sky.available_finishes.add(self.matte)
+        Color.objects.create(name="Old", code="OLD", is_active=False).available_finishes.add(self.matte)
+
+    def test_build(self):
+        data = snapshot.build()
+        [row] = data["colors"]
+        color = dict(zip(data["fields"], row))
+        self.assertEqual((color["id"], color["code"], color["collection"]), (self.sky.pk, "SK-1", self.sky.collection_id))
+        self.assertEqual(data["facets"]["finish"], {str(self.matte.pk): [self.sky.pk]})
+        self.assertEqual(data["collections"], {str(self.sky.collection_id): ["coastal", "Coastal"]})
+
+    def test_file_name_follows_the_content(self):
+        path = snapshot.write()
+        self.assertEqual(snapshot.write(), path)
+        with open(os.path.join(self.static_root, path), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["colors"][0][1], "Sky")
+
+        Color.objects.filter(pk=self.sky.pk).update(name="Sky Blue")
+        self.assertNotEqual(snapshot.write(), path)
+        # The superseded file stays for pages that still reference it
+        self.assertTrue(os.path.exists(os.path.join(self.static_root, path)))
+
+    def test_snapshot_url_is_rebuilt_after_catalog_changes(self):
+        first = snapshot.snapshot_url()
+        self.assertTrue(first.startswith(settings.STATIC_URL + snapshot.SNAPSHOT_DIR))
+        Color.objects.filter(pk=self.sky.pk).update(name="Sky Blue")
+        self.assertEqual(snapshot.snapshot_url(), first)
+        invalidation.bump(Color)
+        self.assertNotEqual(snapshot.snapshot_url(), first)
@@ -0,0 +1,94 @@
+"""
+Tint engine: finds colorant formulas for arbitrary target colors.
+
+Mixing is modelled with single-constant Kubelka-Munk theory per linear RGB
+channel: the K/S of a tinted base is the base's K/S plus the sum of each
+colorant's K/S times its concentration. That makes the mixture linear in
+the concentrations, so every (target, base) pair becomes a non-negative
+least squares problem. All pairs of a request are solved together with a
+batched projected-gradient NNLS, then the base giving the lowest CIEDE2000
+is kept for each target. The batch is solved in the image worker pool
+(see processing.py), off the web workers; the math lives in mixing.py.
+"""
+import numpy as np
+
+from home import invalidation
+from . import colorspace, processing
+from .matching import nearest_colors
+from .mixing import reflectance_to_ks, solve_formulas
+from .models import Colorant, TintBase
+
+
+def _load_tables():
+    colorants = list(Colorant.objects.filter(is_active=True).order_by("code"))
+    bases = list(TintBase.objects.filter(is_active=True).select_related("product").order_by("name"))
+    return colorants, bases
+
+
+def tint_tables():
+    """Active colorants and bases, cached per process until they change."""
+    return invalidation.versioned("colors:tint-tables", [Colorant, TintBase], _load_tables)
+
+
+def match_tints(target_hexes, base_codes=None):
+    """
+    Returns one result dict per target hex code:
+    {"target", "base", "formula": [{"code", "name", "ml_per_liter"}],
+     "predicted_hex", "delta_e", "nearest_stock": (color_id, delta_e) or None}.
+    Invalid hex codes get {"target", "error"}.
+    Raises processing.ProcessingError if the worker pool can't solve the batch.
+    """
+    colorants, bases = tint_tables()
+    if base_codes:
+        bases = [b for b in bases if b.code in base_codes]
+
+    target_rgb = colorspace.hex_to_rgb(target_hexes)
+    valid = ~np.isnan(target_rgb).any(axis=1)
+    target_lab = colorspace.rgb_to_lab(np.where(valid[:, None], target_rgb, 0))
+    stock = nearest_colors(target_lab[valid], limit=1)
+    stock_iter = iter(stock)
+
+    results = []
+    if not colorants or not bases:
+        for i, hex_code in enumerate(target_hexes):
+            if not valid[i]:
+                results.append({"target": hex_code, "error": "invalid hex code"})
+                continue
+            nearest = next(stock_iter)
+            results.append({"target": hex_code, "base": None, "formula": [], "predicted_hex": None,
+                            "delta_e": None, "nearest_stock": nearest[0] if nearest else None})
+        return results
+
+    colorant_ks = reflectance_to_ks(colorspace.srgb_to_linear(
+        colorspace.hex_to_rgb([c.hex_code for c in colorants])
+    )) * np.array([float(c.strength) for c in colorants])[:, None]  # (m, 3)
+    base_ks = reflectance_to_ks(colorspace.srgb_to_linear(colorspace.hex_to_rgb([b.hex_code for b in bases])))
+    caps = np.array([float(b.max_colorant_ml_per_liter) / 1000.0 for b in bases])
+
+    # One NNLS problem per (target, base) pair, all solved in one batch in the pool
+    x, mixed_rgb, errors = processing.run(
+        solve_formulas, colorant_ks, base_ks, caps, np.nan_to_num(target_rgb), target_lab
+    )
+    n_bases = len(bases)
+    best = errors.argmin(axis=1)
+
+    for i, hex_code in enumerate(target_hexes):
+        if not valid[i]:
+            results.append({"target": hex_code, "error": "invalid hex code"})
+            continue
+        j = best[i]
+        row = i * n_bases + j
+        formula = [
+            {"code": c.code, "name": c.name, "ml_per_liter": round(float(x[row, k]) * 1000, 2)}
+            for k, c in enumerate(colorants) if x[row, k] > 0
+        ]
+        nearest = next(stock_iter)
+        results.append({
+            "target": colorspace.normalize_hex(hex_code),
+            "base": bases[j],
+            "formula": sorted(formula, key=lambda f: -f["ml_per_liter"]),
+            "predicted_hex": colorspace.rgb_to_hex(mixed_rgb[row])[0],
+            "delta_e": round(float(errors[i, j]), 2),
+            "nearest_stock": nearest[0] if nearest else None,
+        })
+    return results
@@ -5,5 +5,12 @@ urlpatterns = [
     path("", views.color_list, name="color_list"),
     path("save-toggle/", views.save_color_toggle, name="save_color_toggle"),
     path("ajax-products/<int:color_id>/", views.ajax_get_color_products, name="ajax_get_color_products"),
+    path("match-photo/", views.match_photo, name="match_photo"),
+    path("visualize/", views.visualize_color, name="visualize_color"),
+    path("visualize/<str:key>.jpg", views.visualizer_render, name="visualizer_render"),
+    path("tint-match/", views.tint_match, name="tint_match"),
+    path("accessible-partners/<int:color_id>/", views.accessible_partners, name="accessible_partners"),
+    path("validate-palette/", views.validate_palette, name="validate_palette"),
+    path("resolve-codes/", views.resolve_codes, name="resolve_codes"),
     path("<slug:slug>/", views.color_detail, name="color_detail"),
 ]
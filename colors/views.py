@@ -1,14 +1,97 @@
-from django.http import JsonResponse
+import hashlib
+import json
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q, Exists, OuterRef, Value, BooleanField
-from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.urls import reverse
+from django.db.models import Q, F, Exists, OuterRef, Prefetch
+from django.db import transaction
+from django.views.decorators.http import require_GET, require_POST
 
 # --- Import Models ---
 # Note: Ensure 'products.models' imports match your actual model names.
 # Based on previous context, 'Category' is now the Main Category.
-from products.models import Product, Category, SavedProducts
-from .models import Color, ColorCollection, Finish, Surface, RoomType, SavedColor
+from products.models import Product, Category, SavedProducts, Size
+from ideas.models import IdeaImage
+from accounts.decorators import trade_required
+from home import bookmarks, reference_data, view_tracking
+from quote_request.quote import QuoteList
+from . import codes, colorspace, contrast, processing, render_cache, snapshot
+from .matching import nearest_colors
+from .models import Color, ColorContrastPair, ColorHarmony, ColorImage, SavedColor
+from .palette import extract_palette
+from .tinting import match_tints
+from .visualizer import recolor
+
+# HSL hue ranges for the "color family" filter (min > max wraps around 360)
+HUE_FAMILIES = {
+    "red": (345, 15),
+    "orange": (15, 45),
+    "yellow": (45, 70),
+    "green": (70, 170),
+    "blue": (170, 260),
+    "purple": (260, 300),
+    "pink": (300, 345),
+}
+
+# L* (perceived lightness) ranges for the "tone" filter
+TONES = {"light": (70, 101), "mid": (40, 70), "dark": (0, 40)}
+
+
+# Caps for the contrast endpoints (no more partners are stored per color)
+ACCESSIBLE_PARTNERS_MAX = contrast.PARTNERS_PER_COLOR
+PALETTE_MAX_COLORS = 50
+
+
+def _float_param(request, name):
+    try:
+        return float(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def filter_by_channels(colors, request):
+    """
+    Applies the color family / tone presets and the raw numeric range filters
+    (hue_min, hue_max, lightness_min, lightness_max, saturation_min, saturation_max).
+    Everything runs as indexed SQL on the numeric channel columns.
+    """
+    family = request.GET.get("family")
+    if family == "neutral":
+        colors = colors.filter(hue__isnull=True)
+        hue_min = hue_max = None
+    else:
+        hue_min, hue_max = HUE_FAMILIES.get(family, (_float_param(request, "hue_min"), _float_param(request, "hue_max")))
+
+    if hue_min is not None and hue_max is not None and hue_min > hue_max:
+        # e.g. reds: 345..360 or 0..15
+        colors = colors.filter(Q(hue__gte=hue_min) | Q(hue__lt=hue_max))
+    else:
+        if hue_min is not None:
+            colors = colors.filter(hue__gte=hue_min)
+        if hue_max is not None:
+            colors = colors.filter(hue__lt=hue_max)
+
+    tone = request.GET.get("tone")
+    lightness_min, lightness_max = TONES.get(
+        tone, (_float_param(request, "lightness_min"), _float_param(request, "lightness_max"))
+    )
+    if lightness_min is not None:
+        colors = colors.filter(lab_l__gte=lightness_min)
+    if lightness_max is not None:
+        colors = colors.filter(lab_l__lt=lightness_max)
+
+    saturation_min = _float_param(request, "saturation_min")
+    saturation_max = _float_param(request, "saturation_max")
+    if saturation_min is not None:
+        colors = colors.filter(saturation__gte=saturation_min)
+    if saturation_max is not None:
+        colors = colors.filter(saturation__lte=saturation_max)
+    return colors
 
 
 def color_list(request):
@@ -18,11 +101,11 @@ def color_list(request):
     # Start with active colors
     colors = Color.objects.filter(is_active=True)
 
-    # Fetch filter options efficiently
-    collections = ColorCollection.objects.all().order_by("name")
-    finishes = Finish.objects.all().order_by("name")
-    surfaces = Surface.objects.all().order_by("name")
-    rooms = RoomType.objects.all().order_by("name")
+    # Filter options come from the per-process reference cache (no queries on a warm worker)
+    collections = reference_data.color_collections.all()
+    finishes = reference_data.finishes.all()
+    surfaces = reference_data.surfaces.all()
+    rooms = reference_data.room_types.all()
 
     # --- GET Parameters ---
     undertone = request.GET.get("undertone")
@@ -30,6 +113,8 @@ def color_list(request):
     finish_id = request.GET.get("finish")
     surface_id = request.GET.get("surface")
     room_id = request.GET.get("room")
+    family = request.GET.get("family")
+    tone = request.GET.get("tone")
     query = request.GET.get("q")
     sort = request.GET.get("sort", "name")
 
@@ -50,6 +135,7 @@ def color_list(request):
             Q(code__icontains=query) |
             Q(description__icontains=query)
         )
+    colors = filter_by_channels(colors, request)
 
     # --- Apply Sorting ---
     if sort == "newest":
@@ -58,6 +144,13 @@ def color_list(request):
         colors = colors.order_by("-lrv")
     elif sort == "lrv_low":
         colors = colors.order_by("lrv")
+    elif sort == "spectrum":
+        # Red -> violet, grays (no hue) last
+        colors = colors.order_by(F("hue").asc(nulls_last=True), F("lab_l").desc())
+    elif sort == "lightness":
+        colors = colors.order_by(F("lab_l").desc(nulls_last=True))
+    elif sort == "popular":
+        colors = colors.order_by("-save_count", "name")
     else:
         colors = colors.order_by("name")
 
@@ -69,7 +162,7 @@ def color_list(request):
         )
         colors = colors.annotate(is_saved=Exists(is_saved_subquery))
     else:
-        colors = colors.annotate(is_saved=Value(False, output_field=BooleanField()))
+        colors = colors.annotate(is_saved=bookmarks.session_saved_annotation(request.session, 'color'))
 
 
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -101,12 +194,25 @@ def color_list(request):
         "selected_finish": finish_id,
         "selected_surface": surface_id,
         "selected_room": room_id,
+        "selected_family": family,
+        "selected_tone": tone,
+        "hue_families": HUE_FAMILIES,
         "search_query": query or "",
         "sort": sort,
+        # Client-side filtering (see colors/snapshot.py)
+        "snapshot_url": snapshot.snapshot_url(),
+        "filter_ranges": {"families": HUE_FAMILIES, "tones": TONES},
+        "saved_color_ids": _saved_color_ids(request),
     }
     return render(request, "colors/color_list.html", context)
 
 
+def _saved_color_ids(request):
+    if request.user.is_authenticated:
+        return list(SavedColor.objects.filter(user=request.user).values_list('color_id', flat=True))
+    return list(bookmarks.session_ids(request.session, 'color'))
+
+
 def color_detail(request, slug):
     """
     Shows color details and fetches Main Categories for the "Shop this Color" drawer.
@@ -120,10 +226,13 @@ def color_detail(request, slug):
         is_active=True
     )
 
+    view_tracking.record(color)
+
     # --- 1. Check if user saved this color ---
-    is_saved = False
     if request.user.is_authenticated:
         is_saved = SavedColor.objects.filter(user=request.user, color=color).exists()
+    else:
+        is_saved = color.id in bookmarks.session_ids(request.session, 'color')
 
     # --- 2. Fetch Main Categories for "Shop this Color" ---
     # We only want main categories (e.g., "Paints") that have active products
@@ -133,10 +242,21 @@ def color_detail(request, slug):
         products__is_active=True
     ).distinct().order_by('name')
 
+    # --- 3. "Pairs well with" (precomputed by compute_color_harmonies) ---
+    matches = {rule: [] for rule, _ in ColorHarmony.RULE_CHOICES}
+    for harmony in ColorHarmony.objects.filter(
+        color=color, match__is_active=True
+    ).select_related('match').order_by('rank'):
+        matches[harmony.rule].append(harmony.match)
+    harmonies = [
+        (label, matches[rule]) for rule, label in ColorHarmony.RULE_CHOICES if matches[rule]
+    ]
+
     context = {
         'color': color,
         'is_saved': is_saved,
         'shop_categories': shop_categories,  # Renamed for clarity
+        'harmonies': harmonies,
     }
     return render(request, "colors/color_detail.html", context)
 
@@ -172,7 +292,7 @@ def ajax_get_color_products(request, color_id):
         )
         products = products.annotate(is_saved=Exists(saved_prod_subquery))
     else:
-        products = products.annotate(is_saved=Value(False, output_field=BooleanField()))
+        products = products.annotate(is_saved=bookmarks.session_saved_annotation(request.session, 'product'))
 
     # Order and prepare JSON response
     products = products.order_by('category__name', 'name')
@@ -200,11 +320,11 @@ def ajax_get_color_products(request, color_id):
     return JsonResponse(products_data, safe=False)
 
 
-@login_required
 @require_POST
 def save_color_toggle(request):
     """
-    AJAX: Toggles the saved status of a color for the logged-in user.
+    AJAX: Toggles the saved status of a color. Anonymous visitors' saves
+    are kept in their session until they log in (see home/bookmarks.py).
     """
     color_id = request.POST.get('color_id')
     if not color_id:
@@ -212,21 +332,489 @@ def save_color_toggle(request):
 
     try:
         color = Color.objects.get(id=color_id)
-        # get_or_create returns (obj, created_boolean)
-        saved_obj, created = SavedColor.objects.get_or_create(
-            user=request.user,
-            color=color
-        )
-
-        if created:
-            return JsonResponse({'status': 'success', 'is_saved': True})
-        else:
-            # If it wasn't created, it already existed, so we delete it (toggle off)
-            saved_obj.delete()
-            return JsonResponse({'status': 'success', 'is_saved': False})
+        if not request.user.is_authenticated:
+            is_saved = bookmarks.toggle_in_session(request.session, 'color', color.id)
+            return JsonResponse({'status': 'success', 'is_saved': is_saved})
+
+        with transaction.atomic():
+            # get_or_create returns (obj, created_boolean)
+            saved_obj, created = SavedColor.objects.get_or_create(
+                user=request.user,
+                color=color
+            )
+
+            if created:
+                bookmarks.adjust_counts(request.user, 'color', color.id, 1)
+                return JsonResponse({'status': 'success', 'is_saved': True})
+            else:
+                # If it wasn't created, it already existed, so we delete it (toggle off).
+                # Only the request that actually deleted the row decrements the counter.
+                deleted, _ = SavedColor.objects.filter(pk=saved_obj.pk).delete()
+                if deleted:
+                    bookmarks.adjust_counts(request.user, 'color', color.id, -1)
+                return JsonResponse({'status': 'success', 'is_saved': False})
 
     except Color.DoesNotExist:
         return JsonResponse({'status': 'error', 'message': 'Color not found'}, status=404)
     except Exception as e:
         # Catch-all for other potential DB errors
-        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+
+@require_POST
+def match_photo(request):
+    """
+    AJAX: Extracts the dominant colors of an uploaded photo and maps each one
+    to the closest active catalog colors (CIEDE2000).
+    Palettes are cached by the image's content hash, so re-uploads are instant.
+    """
+    upload = request.FILES.get('image')
+    if not upload:
+        return JsonResponse({'status': 'error', 'message': 'Please upload a photo.'}, status=400)
+    if upload.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+        return JsonResponse({'status': 'error', 'message': 'The photo is too large.'}, status=400)
+
+    try:
+        count = min(max(int(request.POST.get('colors', 6)), 5), 8)
+    except (TypeError, ValueError):
+        count = 6
+
+    data = upload.read()
+    cache_key = f"photo-palette:{hashlib.sha256(data).hexdigest()}:{count}"
+    palette = cache.get(cache_key)
+    if palette is None:
+        try:
+            palette = processing.run(extract_palette, data, count)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+            return JsonResponse({'status': 'error', 'message': 'That file is not a supported image.'}, status=400)
+        except processing.ProcessingError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=503)
+        cache.set(cache_key, palette, 60 * 60 * 24)
+
+    matches = nearest_colors([swatch['lab'] for swatch in palette], limit=3)
+    colors = Color.objects.in_bulk({color_id for row in matches for color_id, _ in row})
+
+    swatches = []
+    for swatch, row in zip(palette, matches):
+        swatches.append({
+            'hex': swatch['hex'],
+            'weight': swatch['weight'],
+            'matches': [
+                {
+                    'id': color_id,
+                    'name': colors[color_id].name,
+                    'code': colors[color_id].code,
+                    'hex_code': colors[color_id].hex_code,
+                    'url': colors[color_id].get_absolute_url(),
+                    'delta_e': distance,
+                }
+                for color_id, distance in row if color_id in colors
+            ],
+        })
+    return JsonResponse({'status': 'success', 'swatches': swatches})
+
+
+def _visualizer_source(request):
+    """
+    Returns the image bytes of the room photo: an upload, or one of our
+    ColorImage / IdeaImage assets. Raises ValueError if none is usable.
+    """
+    upload = request.FILES.get('image')
+    if upload:
+        if upload.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise ValueError('The photo is too large.')
+        return upload.read()
+
+    for param, model in (('color_image_id', ColorImage), ('idea_image_id', IdeaImage)):
+        pk = request.POST.get(param)
+        if not pk:
+            continue
+        asset = model.objects.filter(pk=pk).first() if pk.isdigit() else None
+        if asset is None or not asset.image:
+            raise ValueError('Image not found.')
+        with asset.image.open('rb') as f:
+            return f.read()
+
+    raise ValueError('Please upload a room photo or pick one of ours.')
+
+
+@require_POST
+def visualize_color(request):
+    """
+    AJAX: Paints the masked wall of a room photo with a catalog color.
+    Renders are cached privately per (image, mask, color) - see render_cache.py -
+    so repeated previews of the same combination are served straight from disk.
+    """
+    color_id = request.POST.get('color_id')
+    mask = request.FILES.get('mask')
+    if not color_id or not mask:
+        return JsonResponse({'status': 'error', 'message': 'A color and a wall mask are required.'}, status=400)
+    if mask.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+        return JsonResponse({'status': 'error', 'message': 'The wall mask is too large.'}, status=400)
+
+    try:
+        color = Color.objects.get(id=color_id, is_active=True, lab_l__isnull=False)
+    except (Color.DoesNotExist, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'Color not found'}, status=404)
+
+    mask_data = mask.read()
+    try:
+        image_data = _visualizer_source(request)
+    except (ValueError, OSError) as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    lab = (color.lab_l, color.lab_a, color.lab_b)
+    key = render_cache.render_key(image_data, mask_data, lab, color.hex_code)
+    if render_cache.get(key) is None:
+        try:
+            rendered = processing.run(recolor, image_data, mask_data, lab)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+            return JsonResponse({'status': 'error', 'message': f'Could not render the preview: {e}'}, status=400)
+        except processing.ProcessingError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=503)
+        render_cache.put(key, rendered)
+
+    response = JsonResponse({
+        'status': 'success',
+        'image_url': reverse('visualizer_render', args=[key]),
+        'color': {'id': color.id, 'name': color.name, 'code': color.code, 'hex_code': color.hex_code},
+    })
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+@require_GET
+def visualizer_render(request, key):
+    """
+    Serves a cached visualizer render. The key is a hash of the photo itself,
+    so only whoever uploaded it can know the address.
+    """
+    path = render_cache.get(key)
+    if path is None:
+        raise Http404('Render not found')
+    response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+    # The render may show the inside of a customer's home: browsers may keep it, shared caches may not
+    response['Cache-Control'] = f'private, max-age={settings.VISUALIZER_CACHE_TTL}'
+    return response
+
+
+# Most targets accepted in one tint-match request; larger spreadsheets are sent in several requests
+TINT_MATCH_MAX_TARGETS = 200
+
+
+@trade_required
+@require_POST
+def tint_match(request):
+    """
+    AJAX: Computes the closest achievable colorant formula for each target color.
+    Accepts JSON {"targets": ["#AABBCC", ...], "bases": ["WB", ...]} (bases optional)
+    or a form field "targets" with one hex code per line / comma.
+    Each result also names the nearest stock catalog color as a fallback.
+    """
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON.'}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'status': 'error', 'message': 'Expected a JSON object.'}, status=400)
+        targets = payload.get('targets') or []
+        base_codes = payload.get('bases') or None
+    else:
+        targets = [t for t in request.POST.get('targets', '').replace(',', '\n').split() if t]
+        base_codes = request.POST.getlist('bases') or None
+
+    if not targets or not isinstance(targets, list):
+        return JsonResponse({'status': 'error', 'message': 'At least one target color is required.'}, status=400)
+    if base_codes is not None and (
+        not isinstance(base_codes, list) or not all(isinstance(code, str) for code in base_codes)
+    ):
+        return JsonResponse({'status': 'error', 'message': 'Bases must be a list of base codes.'}, status=400)
+    if len(targets) > TINT_MATCH_MAX_TARGETS:
+        return JsonResponse(
+            {'status': 'error', 'message': f'At most {TINT_MATCH_MAX_TARGETS} targets per request.'}, status=400
+        )
+
+    try:
+        results = match_tints([str(t) for t in targets], base_codes=base_codes)
+    except processing.ProcessingError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=503)
+    stock = Color.objects.in_bulk({r['nearest_stock'][0] for r in results if r.get('nearest_stock')})
+
+    data = []
+    for result in results:
+        if 'error' in result:
+            data.append(result)
+            continue
+        base = result['base']
+        nearest = result['nearest_stock']
+        color = stock.get(nearest[0]) if nearest else None
+        data.append({
+            'target': result['target'],
+            'base': {'code': base.code, 'name': base.name, 'product': base.product.name if base.product else None}
+            if base else None,
+            'formula': result['formula'],
+            'predicted_hex': result['predicted_hex'],
+            'delta_e': result['delta_e'],
+            'nearest_stock': {
+                'id': color.id, 'name': color.name, 'code': color.code,
+                'hex_code': color.hex_code, 'url': color.get_absolute_url(), 'delta_e': nearest[1],
+            } if color else None,
+        })
+    return JsonResponse({'status': 'success', 'results': data})
+
+
+def _float_value(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _color_summary(color):
+    return {
+        'id': color.id, 'name': color.name, 'code': color.code,
+        'hex_code': color.hex_code, 'url': color.get_absolute_url(),
+    }
+
+
+def _live_partners(color, collection, min_ratio, min_lrv, limit):
+    """
+    (partner, contrast ratio, LRV difference) for the strongest active partners
+    of a color, computed from the channel and LRV columns.
+    """
+    if color.red is None:
+        return []
+    candidates = Color.objects.filter(is_active=True, red__isnull=False).exclude(id=color.id)
+    if collection:
+        candidates = candidates.filter(collection__slug=collection)
+    rows = list(candidates.values_list('id', 'red', 'green', 'blue', 'lrv'))
+    if not rows:
+        return []
+
+    rgb = np.array([row[1:4] for row in rows], dtype=float)
+    own_rgb = np.array([[color.red, color.green, color.blue]], dtype=float)
+    indexes, ratios, differences = contrast.best_partners(
+        colorspace.relative_luminance(rgb),
+        contrast.effective_lrv([row[4] for row in rows], rgb),
+        float(colorspace.relative_luminance(own_rgb)[0]),
+        float(contrast.effective_lrv([color.lrv], own_rgb)[0]),
+        min_ratio, min_lrv, limit,
+    )
+    found = Color.objects.in_bulk([rows[i][0] for i in indexes])
+    return [
+        (found[rows[i][0]], round(float(r), 2), round(float(d), 2))
+        for i, r, d in zip(indexes, ratios, differences)
+    ]
+
+
+def accessible_partners(request, color_id):
+    """
+    AJAX: Colors that contrast enough with this one.
+    Optional GET params: min_ratio (default 4.5), min_lrv, collection (slug), limit.
+    Plain ratio queries read the precomputed ColorContrastPair table (see
+    compute_contrast_pairs). That table only keeps each color's strongest
+    partners across the whole palette, so collection and LRV queries are
+    computed live instead of filtering a list that may have cut their answers.
+    """
+    try:
+        color = Color.objects.only('id', 'red', 'green', 'blue', 'lrv').get(id=color_id, is_active=True)
+    except Color.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'Color not found or inactive'}, status=404)
+
+    min_ratio = _float_value(request.GET.get('min_ratio'), contrast.AA)
+    min_lrv = _float_value(request.GET.get('min_lrv'), 0.0)
+    try:
+        limit = min(max(int(request.GET.get('limit', 24)), 1), ACCESSIBLE_PARTNERS_MAX)
+    except (TypeError, ValueError):
+        limit = 24
+
+    collection = request.GET.get('collection')
+    if collection or min_lrv > 0:
+        found = _live_partners(color, collection, min_ratio, min_lrv, limit)
+    else:
+        pairs = ColorContrastPair.objects.filter(
+            color=color,
+            partner__is_active=True,
+            contrast_ratio__gte=min_ratio,
+        ).select_related('partner').order_by('-contrast_ratio')
+        found = [(pair.partner, pair.contrast_ratio, pair.lrv_difference) for pair in pairs[:limit]]
+
+    partners = [
+        {
+            **_color_summary(partner),
+            'contrast_ratio': ratio,
+            'wcag': contrast.wcag_level(ratio),
+            'lrv_difference': difference,
+        }
+        for partner, ratio, difference in found
+    ]
+    return JsonResponse({'status': 'success', 'partners': partners})
+
+
+@require_POST
+def validate_palette(request):
+    """
+    AJAX: Checks every pair of a palette (or just the given adjacent pairs)
+    against a contrast ratio and an LRV difference in one call.
+    JSON body: {"colors": [id or code, ...], "pairs": [[a, b], ...] (optional),
+                "min_ratio": 4.5, "min_lrv": 30}
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON.'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'status': 'error', 'message': 'Expected a JSON object.'}, status=400)
+
+    keys = payload.get('colors')
+    if not isinstance(keys, list) or len(keys) < 2:
+        return JsonResponse({'status': 'error', 'message': 'At least two colors are required.'}, status=400)
+    if len(keys) > PALETTE_MAX_COLORS:
+        return JsonResponse(
+            {'status': 'error', 'message': f'At most {PALETTE_MAX_COLORS} colors per palette.'}, status=400
+        )
+
+    if not all(isinstance(k, (int, str)) and not isinstance(k, bool) for k in keys):
+        return JsonResponse({'status': 'error', 'message': 'Colors must be ids or codes.'}, status=400)
+
+    ids = [k for k in keys if isinstance(k, int)]
+    color_codes = [str(k) for k in keys if not isinstance(k, int)]
+    found = Color.objects.filter(Q(id__in=ids) | Q(code__in=color_codes), is_active=True, red__isnull=False)
+    by_key = {}
+    for color in found:
+        by_key[color.id] = by_key[color.code] = color
+    missing = [k for k in keys if k not in by_key]
+    if missing:
+        return JsonResponse({'status': 'error', 'message': 'Unknown colors.', 'missing': missing}, status=400)
+
+    colors = [by_key[k] for k in keys]
+    rgb = np.array([[c.red, c.green, c.blue] for c in colors], dtype=float)
+    ratio, difference = contrast.palette_report(
+        colorspace.relative_luminance(rgb),
+        contrast.effective_lrv([c.lrv for c in colors], rgb),
+    )
+
+    position = {key: i for i, key in enumerate(keys)}
+    if payload.get('pairs'):
+        try:
+            checks = [(position[a], position[b]) for a, b in payload['pairs']]
+        except (KeyError, TypeError, ValueError):
+            return JsonResponse({'status': 'error', 'message': 'Pairs must reference palette colors.'}, status=400)
+    else:
+        checks = [(i, j) for i in range(len(colors)) for j in range(i + 1, len(colors))]
+
+    min_ratio = _float_value(payload.get('min_ratio'), contrast.AA)
+    min_lrv = _float_value(payload.get('min_lrv'), contrast.MIN_LRV_DIFFERENCE)
+    results = []
+    for i, j in checks:
+        passes = bool(ratio[i, j] >= min_ratio and difference[i, j] >= min_lrv)
+        results.append({
+            'colors': [colors[i].code, colors[j].code],
+            'contrast_ratio': round(float(ratio[i, j]), 2),
+            'wcag': contrast.wcag_level(ratio[i, j]),
+            'lrv_difference': round(float(difference[i, j]), 2),
+            'passes': passes,
+        })
+
+    return JsonResponse({
+        'status': 'success',
+        'valid': all(r['passes'] for r in results),
+        'colors': [_color_summary(c) for c in colors],
+        'pairs': results,
+    })
+
+
+# Most codes accepted in one resolve request
+CODE_RESOLVE_MAX = 5000
+
+
+@trade_required
+@require_POST
+def resolve_codes(request):
+    """
+    AJAX: Resolves a pasted list of color codes in one go.
+    Accepts JSON {"codes": [...]} or {"text": "OB-202, GG-305, ..."}, or a form
+    field "codes". Codes are normalized and unknown ones fuzzy-matched.
+    Optional "quote": {"product_id", "size_id", "quantity"} adds every color
+    available in that product to the quote list with a single session write.
+    """
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON.'}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'status': 'error', 'message': 'Expected a JSON object.'}, status=400)
+    else:
+        payload = {'text': request.POST.get('codes', ''), 'fuzzy': request.POST.get('fuzzy') != '0'}
+        if request.POST.get('product_id'):
+            payload['quote'] = {k: request.POST.get(k) for k in ('product_id', 'size_id', 'quantity')}
+
+    raw_codes = payload.get('codes')
+    if not isinstance(raw_codes, list):
+        raw_codes = codes.split_codes(str(payload.get('text') or ''))
+    raw_codes = [str(code) for code in raw_codes if str(code).strip()]
+    if not raw_codes:
+        return JsonResponse({'status': 'error', 'message': 'Please enter at least one color code.'}, status=400)
+    if len(raw_codes) > CODE_RESOLVE_MAX:
+        return JsonResponse(
+            {'status': 'error', 'message': f'At most {CODE_RESOLVE_MAX} codes per request.'}, status=400
+        )
+
+    resolved = codes.resolve_codes(raw_codes, fuzzy=payload.get('fuzzy', True) is not False)
+    colors = {
+        color.code: color
+        for color in Color.objects.filter(
+            code__in={r['code'] for r in resolved if r['code']}, is_active=True
+        ).prefetch_related(
+            Prefetch('products', queryset=Product.objects.filter(is_active=True).only('id', 'name', 'slug'))
+        )
+    }
+
+    results = []
+    for result in resolved:
+        color = colors.get(result['code'])
+        results.append({
+            **result,
+            'color': {
+                **_color_summary(color),
+                'products': [{'id': p.id, 'name': p.name, 'url': p.get_absolute_url()} for p in color.products.all()],
+            } if color else None,
+        })
+
+    data = {
+        'status': 'success',
+        'results': results,
+        'summary': {
+            'exact': sum(r['match'] == 'exact' for r in resolved),
+            'fuzzy': sum(r['match'] == 'fuzzy' for r in resolved),
+            'unknown': sum(r['match'] is None for r in resolved),
+            # Unknown codes that were never fuzzy-matched (over codes.MAX_FUZZY_LOOKUPS)
+            'fuzzy_truncated': sum(r['fuzzy_skipped'] for r in resolved),
+        },
+    }
+
+    quote = payload.get('quote')
+    if quote:
+        try:
+            if not isinstance(quote, dict):
+                raise TypeError('quote must be an object')
+            quantity = max(int(quote.get('quantity') or 1), 1)
+            product = Product.objects.get(id=quote.get('product_id'), is_active=True)
+            size = Size.objects.get(id=quote['size_id']) if quote.get('size_id') else None
+        except (Product.DoesNotExist, Size.DoesNotExist, TypeError, ValueError, OverflowError):
+            return JsonResponse(
+                {'status': 'error', 'message': 'Please choose a valid product, size and quantity.'}, status=400
+            )
+
+        available = [c for c in colors.values() if any(p.id == product.id for p in c.products.all())]
+        quote_list = QuoteList(request)
+        data['quote'] = {
+            'added': quote_list.add_many(
+                {'product': product, 'color': color, 'size': size, 'quantity': quantity} for color in available
+            ),
+            'not_available': sorted(set(colors) - {c.code for c in available}),
+            'quote_item_count': len(quote_list),
+        }
+    return JsonResponse(data)
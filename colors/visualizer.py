@@ -0,0 +1,63 @@
+"""
+Room visualizer: re-tints the masked part of a photo with a paint color.
+
+Runs inside the image worker pool (see processing.py), so this module must
+only depend on NumPy and Pillow - never on Django or the database.
+"""
+import io
+
+import numpy as np
+from PIL import Image
+
+from . import colorspace
+
+# Longest side of the rendered preview
+RENDER_SIZE = 1280
+
+
+def _load(data, mode, size=None):
+    image = Image.open(io.BytesIO(data))
+    image.draft(mode, (RENDER_SIZE, RENDER_SIZE))
+    image = image.convert(mode)
+    if size is None:
+        image.thumbnail((RENDER_SIZE, RENDER_SIZE), Image.Resampling.LANCZOS)
+    else:
+        image = image.resize(size, Image.Resampling.BILINEAR)
+    return image
+
+
+def recolor(image_data, mask_data, target_lab, quality=85):
+    """
+    Returns JPEG bytes of the photo with the masked region painted in `target_lab`.
+
+    The mask is a grayscale image (white = wall, black = keep); gray edges blend.
+    Inside the mask, a*/b* are replaced by the paint's chroma and L* is shifted
+    so the wall's average lightness matches the paint while keeping the
+    original shading (shadows, corners, light falloff).
+    """
+    image = _load(image_data, "RGB")
+    mask = _load(mask_data, "L", size=image.size)
+
+    rgb = np.asarray(image, dtype=np.float32)
+    alpha = np.asarray(mask, dtype=np.float32) / 255.0
+    painted = alpha > 0.01
+    if not painted.any():
+        raise ValueError("The mask does not cover any part of the photo.")
+
+    # Only convert the painted pixels; the rest of the photo is left untouched
+    weights = alpha[painted]
+    lab = colorspace.rgb_to_lab(rgb[painted])
+    mean_l = float(np.average(lab[:, 0], weights=weights))
+
+    target = np.asarray(target_lab, dtype=float)
+    new_lab = np.empty_like(lab)
+    new_lab[:, 0] = np.clip(lab[:, 0] + (target[0] - mean_l), 0, 100)
+    new_lab[:, 1] = target[1]
+    new_lab[:, 2] = target[2]
+
+    new_rgb = colorspace.lab_to_rgb(new_lab)
+    rgb[painted] = weights[:, None] * new_rgb + (1 - weights[:, None]) * rgb[painted]
+
+    out = io.BytesIO()
+    Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8)).save(out, "JPEG", quality=quality, optimize=True)
+    return out.getvalue()
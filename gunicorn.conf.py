@@ -0,0 +1,21 @@
+"""
+Gunicorn settings, read from the working directory when gunicorn starts.
+
+Each worker runs the flusher threads of the buffered view counts and live
+search logs (home/view_tracking.py, home/search_tracking.py), and writes
+whatever they still hold when it exits or is recycled.
+"""
+
+
+def post_worker_init(worker):
+    from home import search_tracking, view_tracking
+    view_tracking.start_flusher()
+    search_tracking.start_flusher()
+
+
+def worker_exit(server, worker):
+    from django.db import connection
+    from home import search_tracking, view_tracking
+    view_tracking.flush()
+    search_tracking.flush(everything=True)
+    connection.close()
@@ -1,6 +1,11 @@
+from datetime import timedelta
+
 from django.contrib import admin, messages
+from django.db.models import Sum
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils import timezone
-from .models import Newsletter, NewsletterSubscriber
+from .models import Newsletter, NewsletterSubscriber, CatalogVersion, DailyMetric, RollupWatermark, SearchQueryLog
 from .views import send_newsletter_email  # make sure this function exists in views.py
 
 
@@ -83,3 +88,102 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
             "fields": ("date_subscribed",),
         }),
     )
+
+
+# --- Catalog Version Admin (read-only, for checking cache invalidation) ---
+@admin.register(CatalogVersion)
+class CatalogVersionAdmin(admin.ModelAdmin):
+    list_display = ("key", "version", "updated_at")
+    search_fields = ("key",)
+    ordering = ("key",)
+    readonly_fields = ("key", "version", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+# --- Daily Metric Admin (rollups + analytics dashboard) ---
+DASHBOARD_PERIODS = (7, 30, 90, 365)
+DASHBOARD_METRICS = (
+    ("saved_colors", "Saved Colors"),
+    ("saved_products", "Saved Products"),
+    ("saved_ideas", "Saved Ideas"),
+    ("quote_requests", "Quote Requests"),
+    ("quote_units", "Units Quoted"),
+    ("newsletter_signups", "Newsletter Signups"),
+    ("searches", "Searches"),
+)
+
+
+@admin.register(DailyMetric)
+class DailyMetricAdmin(admin.ModelAdmin):
+    """Read-only: rows are maintained by the rollup_metrics command."""
+    list_display = ("date", "metric", "key", "value")
+    list_filter = ("metric",)
+    search_fields = ("key",)
+    date_hierarchy = "date"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path("dashboard/", self.admin_site.admin_view(self.dashboard_view), name="home_dailymetric_dashboard"),
+        ] + super().get_urls()
+
+    def dashboard_view(self, request):
+        """Reads only the rollup table: one query for the daily series, two for the top terms."""
+        try:
+            days = int(request.GET.get("days", 30))
+        except ValueError:
+            days = 30
+        if days not in DASHBOARD_PERIODS:
+            days = 30
+        today = timezone.localdate()
+        since = today - timedelta(days=days - 1)
+
+        values = {}
+        for date, metric, value in DailyMetric.objects.filter(
+            date__gte=since, key="", metric__in=[m for m, _ in DASHBOARD_METRICS]
+        ).values_list("date", "metric", "value"):
+            values[(date, metric)] = value
+
+        dates = [today - timedelta(days=i) for i in range(days)]
+        rows = [(date, [values.get((date, m), 0) for m, _ in DASHBOARD_METRICS]) for date in dates]
+        totals = [sum(row[1][i] for row in rows) for i in range(len(DASHBOARD_METRICS))]
+
+        def top_terms(metric):
+            return (
+                DailyMetric.objects.filter(metric=metric, date__gte=since)
+                .values("key").annotate(total=Sum("value")).order_by("-total")[:20]
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Analytics Dashboard",
+            "days": days,
+            "periods": DASHBOARD_PERIODS,
+            "metrics": [label for _, label in DASHBOARD_METRICS],
+            "rows": rows,
+            "totals": totals,
+            "top_searches": top_terms("search_term"),
+            "top_no_results": top_terms("search_no_results"),
+            "watermarks": RollupWatermark.objects.order_by("source"),
+        }
+        return TemplateResponse(request, "admin/home/dashboard.html", context)
+
+
+# --- Search Query Log Admin ---
+@admin.register(SearchQueryLog)
+class SearchQueryLogAdmin(admin.ModelAdmin):
+    list_display = ("query", "result_count", "created_at")
+    search_fields = ("query",)
+    date_hierarchy = "created_at"
+    readonly_fields = ("query", "session_key", "result_count", "created_at")
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,148 @@
+"""
+Incremental daily rollups for the admin dashboard.
+
+Each source table has a time watermark: rows timestamped before it have been
+counted. A rollup run aggregates the rows from the watermark up to ROLLUP_LAG
+ago, adds the per-day counts to DailyMetric and moves the watermark there,
+all in one transaction, so the dashboard never has to GROUP BY the raw
+tables. The lag covers rows whose transaction commits after their
+timestamp was taken; a primary-key watermark would skip for good any row
+that commits after a higher id.
+
+Counts are events: a save that is later removed still counts on the day it
+happened.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyMetric, RollupWatermark, SearchQueryLog
+
+# metric -> (model label, datetime field, aggregate of the daily value)
+METRIC_SOURCES = {
+    "saved_colors": ("colors.SavedColor", "saved_at", Count("pk")),
+    "saved_products": ("products.SavedProducts", "saved_at", Count("pk")),
+    "saved_ideas": ("ideas.SavedIdea", "saved_at", Count("pk")),
+    "newsletter_signups": ("home.NewsletterSubscriber", "date_subscribed", Count("pk")),
+    "quote_requests": ("quote_request.QuoteRequest", "created_at", Count("pk")),
+    "quote_units": ("quote_request.QuoteLineItem", "created_at", Sum("quantity")),
+}
+
+SEARCH_SOURCE = "searches"
+
+# Rows younger than this are left for the next run: they may have committed
+# out of order, and a session's search chain may not be complete yet
+ROLLUP_LAG = timedelta(minutes=5)
+# A query followed within this window by a longer one starting with it is a keystroke prefix
+SEARCH_PREFIX_WINDOW = timedelta(seconds=60)
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())[:200]
+
+
+def add_counts(metric, counts):
+    """Adds {(date, key): value} to the DailyMetric rows of `metric`."""
+    counts = {k: v for k, v in counts.items() if v}
+    if not counts:
+        return
+    existing = {
+        (row.date, row.key): row
+        for row in DailyMetric.objects.filter(
+            metric=metric,
+            date__in={date for date, _ in counts},
+            key__in={key for _, key in counts},
+        )
+    }
+    to_update, to_create = [], []
+    for (date, key), value in counts.items():
+        row = existing.get((date, key))
+        if row is None:
+            to_create.append(DailyMetric(date=date, metric=metric, key=key, value=value))
+        else:
+            row.value += value
+            to_update.append(row)
+    DailyMetric.objects.bulk_update(to_update, ["value"], batch_size=1000)
+    DailyMetric.objects.bulk_create(to_create, batch_size=1000)
+
+
+def _new_rows(source, queryset, time_field):
+    """Locks the watermark and returns (watermark, rows from it up to the cutoff, cutoff)."""
+    watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(source=source)
+    cutoff = timezone.now() - ROLLUP_LAG
+    rows = queryset.filter(**{f"{time_field}__lt": cutoff})
+    if watermark.last_time is not None:
+        rows = rows.filter(**{f"{time_field}__gte": watermark.last_time})
+    return watermark, rows, cutoff
+
+
+def _advance(watermark, cutoff):
+    watermark.last_time = cutoff
+    watermark.save(update_fields=["last_time", "updated_at"])
+
+
+def rollup_metric(metric):
+    """Counts the new rows of one METRIC_SOURCES entry. Returns how many rows were processed."""
+    label, date_field, aggregate = METRIC_SOURCES[metric]
+    model = apps.get_model(label)
+    with transaction.atomic():
+        watermark, rows, cutoff = _new_rows(metric, model.objects.all(), date_field)
+        processed = rows.count()
+        if processed:
+            daily = rows.annotate(day=TruncDate(date_field)).values("day").annotate(value=aggregate).order_by()
+            add_counts(metric, {(row["day"], ""): row["value"] for row in daily})
+        _advance(watermark, cutoff)
+    return processed
+
+
+def rollup_searches():
+    """
+    Rolls up SearchQueryLog into "searches" (per day), "search_term" and
+    "search_no_results" (per day and normalized query). Returns rows processed.
+    """
+    with transaction.atomic():
+        watermark, rows, cutoff = _new_rows(SEARCH_SOURCE, SearchQueryLog.objects.all(), "created_at")
+
+        totals, terms, no_results = {}, {}, {}
+        processed = 0
+        previous = None
+
+        def count(row):
+            day = timezone.localdate(row.created_at)
+            term = normalize_query(row.query)
+            totals[(day, "")] = totals.get((day, ""), 0) + 1
+            terms[(day, term)] = terms.get((day, term), 0) + 1
+            if not row.result_count:
+                no_results[(day, term)] = no_results.get((day, term), 0) + 1
+
+        for row in rows.only("query", "session_key", "result_count", "created_at").order_by("session_key", "pk").iterator():
+            processed += 1
+            if previous is not None:
+                is_prefix = (
+                    previous.session_key
+                    and previous.session_key == row.session_key
+                    and row.created_at - previous.created_at <= SEARCH_PREFIX_WINDOW
+                    and normalize_query(row.query).startswith(normalize_query(previous.query))
+                )
+                if not is_prefix:
+                    count(previous)
+            previous = row
+        if previous is not None:
+            count(previous)
+
+        add_counts("searches", totals)
+        add_counts("search_term", terms)
+        add_counts("search_no_results", no_results)
+        _advance(watermark, cutoff)
+    return processed
+
+
+def rollup_all():
+    """Runs every rollup; returns {source: rows processed}."""
+    results = {metric: rollup_metric(metric) for metric in METRIC_SOURCES}
+    results[SEARCH_SOURCE] = rollup_searches()
+    return results
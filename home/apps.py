@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class HomeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'home'
+
+    def ready(self):
+        # Catalog changes bump version counters so every worker can drop stale caches
+        from .invalidation import connect_catalog_signals
+        connect_catalog_signals()
+
+        # Anonymous saves kept in the session move into the account on login
+        from django.contrib.auth.signals import user_logged_in
+        from .bookmarks import merge_session_saves
+        user_logged_in.connect(merge_session_saves, dispatch_uid="home.bookmarks.merge_session_saves")
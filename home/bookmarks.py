@@ -0,0 +1,152 @@
+"""
+Saved colors, products and ideas ("bookmarks") behind one batched API.
+
+A batch is a list of {"type", "id", "saved"} operations. Later operations on
+the same item win, so the front end can queue rapid clicks and send only
+the final state. Each type is applied with one bulk INSERT (ignore_conflicts,
+so double submits can't raise IntegrityError) and one filtered DELETE, then
+save_count of the touched items and the user's total for the type are
+recomputed with one UPDATE each (see home/counters.py), which stays exact
+however the inserts raced.
+
+Anonymous visitors can save too: their ids are kept in the session
+({type: [ids]}) and merged into their account with the same bulk INSERT
+when they log in (merge_session_saves, a user_logged_in receiver).
+"""
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Case, Value, When
+
+from . import counters
+
+# type -> (saved-item model label, foreign key on it, saved model label, per-user count field)
+BOOKMARK_TYPES = {
+    "color": ("colors.SavedColor", "color", "colors.Color", "saved_colors_count"),
+    "product": ("products.SavedProducts", "product", "products.Product", "saved_products_count"),
+    "idea": ("ideas.SavedIdea", "idea", "ideas.Idea", "saved_ideas_count"),
+}
+
+# Most operations accepted in one batch
+MAX_OPERATIONS = 200
+
+# Session key for anonymous saves, and the most ids kept per type there
+SESSION_KEY = "saved_items"
+SESSION_MAX_ITEMS = 200
+
+
+def parse_operations(operations):
+    """
+    Validates a list of operations and returns {type: {id: saved}}.
+    Raises ValueError with a user-facing message.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations must be a non-empty list")
+    if len(operations) > MAX_OPERATIONS:
+        raise ValueError(f"At most {MAX_OPERATIONS} operations per request")
+
+    changes = {}
+    for op in operations:
+        if not isinstance(op, dict) or op.get("type") not in BOOKMARK_TYPES:
+            raise ValueError(f"type must be one of: {', '.join(BOOKMARK_TYPES)}")
+        pk, saved = op.get("id"), op.get("saved")
+        if isinstance(pk, bool) or not isinstance(pk, (int, str)) or not str(pk).isdigit():
+            raise ValueError("id must be a positive integer")
+        if not isinstance(saved, bool):
+            raise ValueError("saved must be true or false")
+        changes.setdefault(op["type"], {})[int(pk)] = saved
+    return changes
+
+
+def apply(user, changes):
+    """
+    Applies {type: {id: saved}} for `user` in one transaction and returns
+    {type: set of ids now saved} for the ids in `changes`. Ids of missing or
+    inactive items can't be saved and are ignored.
+    """
+    state = {}
+    with transaction.atomic():
+        for kind, items in changes.items():
+            label, fk, target_label, user_field = BOOKMARK_TYPES[kind]
+            saved_model = apps.get_model(label)
+            target = apps.get_model(target_label)
+
+            to_save = [pk for pk, saved in items.items() if saved]
+            to_remove = [pk for pk, saved in items.items() if not saved]
+            if to_save:
+                valid = target._default_manager.filter(pk__in=to_save, is_active=True).values_list("pk", flat=True)
+                saved_model.objects.bulk_create(
+                    [saved_model(user=user, **{f"{fk}_id": pk}) for pk in valid],
+                    ignore_conflicts=True,
+                )
+            if to_remove:
+                saved_model.objects.filter(user=user, **{f"{fk}__in": to_remove}).delete()
+
+            counters.refresh(target_label, "save_count", items)
+            counters.refresh(settings.AUTH_USER_MODEL, user_field, [user.pk])
+            state[kind] = set(
+                saved_model.objects.filter(user=user, **{f"{fk}__in": list(items)})
+                .values_list(f"{fk}_id", flat=True)
+            )
+    return state
+
+
+def adjust_counts(user, kind, pk, delta):
+    """Single-item toggles: adds `delta` to the item's save_count and the user's total for its type."""
+    _, _, target_label, user_field = BOOKMARK_TYPES[kind]
+    counters.adjust(apps.get_model(target_label), pk, "save_count", delta)
+    counters.adjust(apps.get_model(settings.AUTH_USER_MODEL), user.pk, user_field, delta)
+
+
+# --- Anonymous (session) saves ---
+
+def session_ids(session, kind):
+    """Ids of `kind` saved in this (anonymous) session."""
+    return set(session.get(SESSION_KEY, {}).get(kind, []))
+
+
+def session_saved_annotation(session, kind):
+    """is_saved annotation for querysets shown to anonymous visitors."""
+    return Case(
+        When(pk__in=session_ids(session, kind), then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
+
+
+def apply_to_session(session, changes):
+    """Session counterpart of apply(), with the same arguments and result."""
+    saved = session.get(SESSION_KEY, {})
+    state = {}
+    for kind, items in changes.items():
+        ids = [pk for pk in saved.get(kind, []) if pk not in items]
+        # Newest last; the oldest saves drop off past the cap
+        ids += [pk for pk, is_saved in items.items() if is_saved]
+        saved[kind] = ids[-SESSION_MAX_ITEMS:]
+        state[kind] = set(saved[kind]) & set(items)
+    session[SESSION_KEY] = saved
+    return state
+
+
+def toggle_in_session(session, kind, pk):
+    """Flips one session save and returns the new state."""
+    return pk in apply_to_session(session, {kind: {pk: pk not in session_ids(session, kind)}})[kind]
+
+
+def merge_session_saves(sender, request, user, **kwargs):
+    """user_logged_in receiver: moves the session's anonymous saves into the account."""
+    if request is None or not hasattr(request, "session"):
+        return
+    saved = request.session.pop(SESSION_KEY, None)
+    changes = {
+        kind: dict.fromkeys(ids, True)
+        for kind, ids in (saved or {}).items() if kind in BOOKMARK_TYPES and ids
+    }
+    if not changes:
+        return
+    try:
+        apply(user, changes)
+    except Exception as e:
+        # Never block a login; keep the saves for the next one
+        print(f"Session saves merge error (user #{user.pk}): {e}")
+        request.session[SESSION_KEY] = saved
@@ -0,0 +1,101 @@
+"""
+"My Collection": a user's saved colors, products and ideas as one feed.
+
+One UNION ALL query returns a page of (type, item id, saved_at, row id),
+newest first, with keyset pagination on (saved_at, type, row id), so a deep
+page costs the same as the first one. The items on the page are then loaded
+with one query per type, whatever the page size. Per-type totals come from
+the counters on the user row (see home/counters.py) and cost no query.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.apps import apps
+from django.db.models import CharField, F, Q, Value
+
+from .bookmarks import BOOKMARK_TYPES
+
+PAGE_SIZE = 24
+
+# How each type's items are loaded for a page (no per-item queries in the template)
+ITEM_QUERYSETS = {
+    "color": lambda model: model.objects.all(),
+    "product": lambda model: model.objects.select_related("category"),
+    "idea": lambda model: model.objects.prefetch_related("images"),
+}
+
+
+def counts(user):
+    """{type: number of saved items} plus "all", read from the user's counters."""
+    totals = {kind: getattr(user, user_field) for kind, (_, _, _, user_field) in BOOKMARK_TYPES.items()}
+    totals["all"] = sum(totals.values())
+    return totals
+
+
+def encode_cursor(row):
+    raw = f"{row['saved_at'].isoformat()}|{row['kind']}|{row['row_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns (saved_at, type, row id), or None for a missing or malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        saved_at, kind, row_id = raw.split("|")
+        if kind not in BOOKMARK_TYPES:
+            return None
+        return datetime.fromisoformat(saved_at), kind, int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _rows(user, kind, after):
+    label, fk, _, _ = BOOKMARK_TYPES[kind]
+    rows = apps.get_model(label).objects.filter(user=user)
+    if after is not None:
+        # Strictly after the cursor in (saved_at, type, row id) descending order
+        saved_at, after_kind, row_id = after
+        if kind < after_kind:
+            rows = rows.filter(saved_at__lte=saved_at)
+        elif kind == after_kind:
+            rows = rows.filter(Q(saved_at__lt=saved_at) | Q(saved_at=saved_at, pk__lt=row_id))
+        else:
+            rows = rows.filter(saved_at__lt=saved_at)
+    return rows.annotate(
+        kind=Value(kind, output_field=CharField()),
+        item_id=F(f"{fk}_id"),
+        row_id=F("pk"),
+    ).values("kind", "item_id", "saved_at", "row_id").order_by()
+
+
+def saved_page(user, kind=None, cursor=None, page_size=PAGE_SIZE):
+    """
+    Returns (items, next cursor or None). Each item is the saved Color,
+    Product or Idea with `saved_type` and `saved_at` set, newest first.
+    `kind` limits the feed to one type.
+    """
+    after = decode_cursor(cursor)
+    kinds = [kind] if kind in BOOKMARK_TYPES else list(BOOKMARK_TYPES)
+    first, *rest = [_rows(user, k, after) for k in kinds]
+    feed = first.union(*rest, all=True) if rest else first
+    rows = list(feed.order_by("-saved_at", "-kind", "-row_id")[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    rows = rows[:page_size]
+
+    loaded = {}
+    for k in {row["kind"] for row in rows}:
+        model = apps.get_model(BOOKMARK_TYPES[k][2])
+        loaded[k] = ITEM_QUERYSETS[k](model).in_bulk([row["item_id"] for row in rows if row["kind"] == k])
+
+    items = []
+    for row in rows:
+        item = loaded[row["kind"]].get(row["item_id"])
+        if item is None:
+            continue
+        item.saved_type = row["kind"]
+        item.saved_at = row["saved_at"]
+        items.append(item)
+    return items, next_cursor
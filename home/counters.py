@@ -0,0 +1,94 @@
+"""
+Denormalized counters: save_count and view_count on catalog rows, and the
+per-type saved-item totals on users.
+
+Counters are changed with a single UPDATE ... SET field = field + n, so
+concurrent requests never lose increments, and never go below zero.
+QuerySet.update() sends no signals, so popularity changes don't invalidate
+catalog caches (see home/invalidation.py). The reconcile_counters command
+recomputes them from the source tables if they ever drift.
+"""
+from django.apps import apps
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+# (model label, counter field) -> (source model label, foreign key on the source)
+COUNTER_SOURCES = {
+    ("colors.Color", "save_count"): ("colors.SavedColor", "color"),
+    ("products.Product", "save_count"): ("products.SavedProducts", "product"),
+    ("ideas.Idea", "save_count"): ("ideas.SavedIdea", "idea"),
+    # Per-user "My Collection" totals
+    ("accounts.User", "saved_colors_count"): ("colors.SavedColor", "user"),
+    ("accounts.User", "saved_products_count"): ("products.SavedProducts", "user"),
+    ("accounts.User", "saved_ideas_count"): ("ideas.SavedIdea", "user"),
+}
+
+# Rows fixed per UPDATE when reconciling
+RECONCILE_BATCH_SIZE = 1000
+
+
+def adjust(model, pk, field="save_count", delta=1):
+    """Adds `delta` (may be negative) to `field` of one row."""
+    return model._default_manager.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+# Counter columns that only adjust() may write
+COUNTER_FIELDS = (
+    "save_count", "view_count", "download_count",
+    "saved_colors_count", "saved_products_count", "saved_ideas_count",
+)
+
+
+def exclude_counters(instance, kwargs):
+    """
+    Call at the start of Model.save(). When an existing row is saved with
+    all fields (e.g. from the admin), limits the UPDATE to the non-counter
+    columns so stale in-memory counts can't overwrite concurrent increments.
+    """
+    if instance._state.adding or kwargs.get("force_insert") or kwargs.get("update_fields") is not None:
+        return
+    kwargs["update_fields"] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in COUNTER_FIELDS
+    ]
+
+
+def _actual_count(label, field):
+    """(model, expression counting the source rows of each row)."""
+    source_label, fk = COUNTER_SOURCES[(label, field)]
+    source = apps.get_model(source_label)
+    actual = Coalesce(
+        Subquery(
+            source.objects.filter(**{fk: OuterRef("pk")}).order_by()
+            .values(fk).annotate(n=Count("pk")).values("n")
+        ),
+        0,
+    )
+    return apps.get_model(label), actual
+
+
+def refresh(label, field, pks):
+    """
+    Sets the COUNTER_SOURCES counter of the given rows from the source table
+    in one UPDATE. Used after bulk changes whose exact row count isn't known
+    (e.g. bulk_create with ignore_conflicts).
+    """
+    model, actual = _actual_count(label, field)
+    pks = list(pks)
+    for start in range(0, len(pks), RECONCILE_BATCH_SIZE):
+        batch = pks[start:start + RECONCILE_BATCH_SIZE]
+        model._default_manager.filter(pk__in=batch).update(**{field: actual})
+
+
+def reconcile(label, field):
+    """
+    Recomputes one COUNTER_SOURCES counter from its source table and
+    rewrites only the rows that drifted. Returns how many were fixed.
+    """
+    model, actual = _actual_count(label, field)
+    drifted = list(
+        model._default_manager.annotate(actual=actual)
+        .exclude(**{field: F("actual")}).values_list("pk", flat=True)
+    )
+    refresh(label, field, drifted)
+    return len(drifted)
@@ -0,0 +1,141 @@
+"""
+Cross-process cache invalidation for the catalog.
+
+Every catalog model has a version counter in the CatalogVersion table.
+Saves, deletes and M2M changes bump the counter once their transaction has
+committed (immediately under autocommit, which is how requests run), so
+every gunicorn worker (and every container sharing the database) can tell
+when something it cached in-process has gone stale. Bumping only after the
+commit means no worker can see the new version and still read (and cache)
+the old rows. Each bump is one UPDATE of that model's own counter row.
+
+The counters are read at most once per request (CatalogVersionMiddleware
+resets the snapshot), and only if something actually asks for them.
+
+Note: bulk_create(), bulk_update() and QuerySet.update() don't send signals,
+so code using them must call bump() itself.
+"""
+import threading
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+# Apps whose models make up the catalog.
+CATALOG_APPS = ("colors", "products", "ideas", "portfolio")
+
+# User data living in catalog apps; changes here never invalidate catalog caches.
+EXCLUDED_MODELS = {"colors.savedcolor", "products.savedproducts", "ideas.savedidea"}
+
+# Derived tables rebuilt in bulk by management commands, which bump() them
+# themselves. Without signal receivers their bulk and cascading deletes stay
+# single DELETE statements instead of one bump per row.
+DERIVED_MODELS = {"colors.colorharmony", "colors.colorcontrastpair"}
+
+_local = threading.local()
+_entries = {}
+_entries_lock = threading.Lock()
+
+
+def model_key(model):
+    """Returns the counter key for a model class, instance or key string."""
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.label_lower
+
+
+def get_versions():
+    """
+    Returns {key: version} for all counters.
+    Loaded with one query and reused until reset() is called.
+    """
+    versions = getattr(_local, "versions", None)
+    if versions is None:
+        from .models import CatalogVersion
+        versions = dict(CatalogVersion.objects.values_list("key", "version"))
+        _local.versions = versions
+    return versions
+
+
+def get_version(*models):
+    """Returns a tuple with the current version of each given model."""
+    versions = get_versions()
+    return tuple(versions.get(model_key(m), 0) for m in models)
+
+
+def reset():
+    """Forgets the loaded counters so the next read goes to the database."""
+    _local.versions = None
+
+
+def bump(*models):
+    """Increments the counters of the given models (classes or keys)."""
+    from .models import CatalogVersion
+
+    for key in {model_key(m) for m in models}:
+        # update() skips auto_now, so updated_at is set explicitly
+        updated = CatalogVersion.objects.filter(key=key).update(version=F("version") + 1, updated_at=Now())
+        if not updated:
+            _, created = CatalogVersion.objects.get_or_create(key=key, defaults={"version": 1})
+            if not created:
+                # Another worker created the row between our update and insert
+                CatalogVersion.objects.filter(key=key).update(version=F("version") + 1, updated_at=Now())
+    reset()
+
+
+def versioned(name, models, builder):
+    """
+    Per-process cache: returns builder() and keeps it until any of `models`
+    gets a newer version, then lazily rebuilds it on the next call.
+    """
+    version = get_version(*models)
+    entry = _entries.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    value = builder()
+    with _entries_lock:
+        _entries[name] = (version, value)
+    return value
+
+
+def clear():
+    """Drops everything cached via versioned() in this process."""
+    with _entries_lock:
+        _entries.clear()
+    reset()
+
+
+# --- Signal receivers ---
+
+def _on_change(sender, **kwargs):
+    transaction.on_commit(lambda: bump(sender))
+
+
+def _on_m2m_change(sender, instance, action, model, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        models = (sender, type(instance), model)
+        transaction.on_commit(lambda: bump(*models))
+
+
+def connect_catalog_signals():
+    """Hooks save/delete/M2M signals of every catalog model. Called from HomeConfig.ready()."""
+    for label in CATALOG_APPS:
+        for model in apps.get_app_config(label).get_models():
+            key = model_key(model)
+            if key in EXCLUDED_MODELS or key in DERIVED_MODELS:
+                continue
+
+            post_save.connect(_on_change, sender=model, dispatch_uid=f"catalog_version_save_{key}")
+            post_delete.connect(_on_change, sender=model, dispatch_uid=f"catalog_version_delete_{key}")
+
+            for field in model._meta.local_many_to_many:
+                through = field.remote_field.through
+                if model_key(through) in EXCLUDED_MODELS:
+                    continue
+                m2m_changed.connect(
+                    _on_m2m_change, sender=through,
+                    dispatch_uid=f"catalog_version_m2m_{model_key(through)}"
+                )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from home.sitemaps import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the sitemap index and per-section shards to SITEMAP_ROOT for nginx to serve. "
+        "Only shards whose contents changed since the last run are rewritten, so it is cheap "
+        "to run from cron, e.g. hourly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rewrite every shard")
+
+    def handle(self, *args, **options):
+        result = generate(force=options["force"])
+        for name in result["written"]:
+            self.stdout.write(f"Wrote {name}")
+        for name in result["removed"]:
+            self.stdout.write(f"Removed {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Sitemaps are up to date ({len(result['written'])} written, {len(result['removed'])} removed)."
+        ))
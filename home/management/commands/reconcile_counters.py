@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from home.counters import COUNTER_SOURCES, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized save counters on colors, products, ideas and users "
+        "from the saved-item tables and fix any rows that drifted. Safe to run from cron, e.g. nightly."
+    )
+
+    def handle(self, *args, **options):
+        for label, field in COUNTER_SOURCES:
+            fixed = reconcile(label, field)
+            self.stdout.write(f"{label}.{field}: {fixed} rows corrected")
+        self.stdout.write(self.style.SUCCESS("Counters are reconciled."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from home.analytics import rollup_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Add new saves, quote requests, newsletter signups and searches to the daily "
+        "rollup tables (only rows since the last run). Run it from cron, e.g. every 15 minutes."
+    )
+
+    def handle(self, *args, **options):
+        for source, processed in rollup_all().items():
+            self.stdout.write(f"{source}: {processed} new rows")
+        self.stdout.write(self.style.SUCCESS("Rollups are up to date."))
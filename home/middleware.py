@@ -0,0 +1,18 @@
+from . import invalidation
+
+
+class CatalogVersionMiddleware:
+    """
+    Makes every request start with a fresh view of the catalog version counters.
+    The counters themselves are only loaded if something asks for them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        invalidation.reset()
+        try:
+            return self.get_response(request)
+        finally:
+            invalidation.reset()
@@ -3,7 +3,7 @@ from django.db import models
 class NewsletterSubscriber(models.Model):
     """Stores email addresses of newsletter subscribers."""
     email = models.EmailField(unique=True, max_length=150)
-    date_subscribed = models.DateTimeField(auto_now_add=True)
+    date_subscribed = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return self.email
@@ -25,4 +25,76 @@ class Newsletter(models.Model):
         return self.subject
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+class CatalogVersion(models.Model):
+    """
+    Monotonically increasing version counter per catalog model.
+    Bumped on every save/delete so each worker process can tell when its
+    in-process caches are stale. See home/invalidation.py.
+    """
+    key = models.CharField(max_length=100, unique=True, help_text="Model label, e.g. colors.color")
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+    class Meta:
+        verbose_name = "Catalog Version"
+        verbose_name_plural = "Catalog Versions"
+
+
+class SearchQueryLog(models.Model):
+    """
+    One row per live search, written once the customer stops typing (see
+    home/search_tracking.py). Rolled up into DailyMetric by the
+    rollup_metrics command.
+    """
+    query = models.CharField(max_length=200)
+    session_key = models.CharField(max_length=40, blank=True)
+    result_count = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.query
+
+    class Meta:
+        verbose_name = "Search Query"
+        verbose_name_plural = "Search Queries"
+
+
+class DailyMetric(models.Model):
+    """
+    Daily rollup counter, e.g. ("2025-01-31", "saved_colors", "") = 42 or
+    ("2025-01-31", "search_term", "ocean blue") = 7. Maintained incrementally
+    by the rollup_metrics command and read by the admin dashboard.
+    """
+    date = models.DateField()
+    metric = models.CharField(max_length=50)
+    key = models.CharField(max_length=200, blank=True, default="")
+    value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} {self.metric}{f' [{self.key}]' if self.key else ''}: {self.value}"
+
+    class Meta:
+        ordering = ["-date", "metric", "key"]
+        constraints = [
+            models.UniqueConstraint(fields=["date", "metric", "key"], name="unique_daily_metric"),
+        ]
+        indexes = [
+            models.Index(fields=["metric", "date"], name="dailymetric_metric_date_idx"),
+        ]
+        verbose_name = "Daily Metric"
+        verbose_name_plural = "Daily Metrics"
+
+
+class RollupWatermark(models.Model):
+    """Time up to which a source table has been counted into DailyMetric (see home/analytics.py)."""
+    source = models.CharField(max_length=100, unique=True)
+    last_time = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.last_time}"
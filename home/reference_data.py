@@ -0,0 +1,68 @@
+"""
+Per-process cache for the small reference tables behind the listing filters
+(collections, finishes, categories, tags...).
+
+These change maybe once a month, so each worker keeps them in memory and
+only reloads a table when its catalog version changes (see invalidation.py).
+The cached objects are shared between requests: treat them as read-only.
+"""
+from django.apps import apps
+
+from . import invalidation
+
+
+class ReferenceTable:
+    """An ordered list and an id -> object map for one small model."""
+
+    def __init__(self, model_label, prefetch=(), depends_on=()):
+        self.model_label = model_label
+        self.prefetch = tuple(prefetch)
+        # Other models whose changes must also reload this table (e.g. prefetched children)
+        self.depends_on = tuple(depends_on)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def _load(self):
+        # Uses the model's Meta.ordering, which is "name" for all reference tables
+        objects = list(self.model.objects.prefetch_related(*self.prefetch))
+        return objects, {obj.pk: obj for obj in objects}
+
+    def _get(self):
+        return invalidation.versioned(
+            f"reference:{self.model_label}",
+            (self.model_label, *self.depends_on),
+            self._load,
+        )
+
+    def all(self):
+        """Returns every row, in the model's default ordering."""
+        return self._get()[0]
+
+    def by_id(self):
+        """Returns a {pk: object} map."""
+        return self._get()[1]
+
+    def get(self, pk, default=None):
+        """Returns the object with the given pk (int or numeric string), or default."""
+        try:
+            return self.by_id().get(int(pk), default)
+        except (TypeError, ValueError):
+            return default
+
+
+# --- Colors ---
+color_collections = ReferenceTable("colors.ColorCollection")
+finishes = ReferenceTable("colors.Finish")
+surfaces = ReferenceTable("colors.Surface")
+room_types = ReferenceTable("colors.RoomType")
+
+# --- Products ---
+product_categories = ReferenceTable(
+    "products.Category", prefetch=("subcategories",), depends_on=("products.SubCategory",)
+)
+
+# --- Ideas ---
+idea_categories = ReferenceTable("ideas.Category")
+idea_tags = ReferenceTable("ideas.Tag")
@@ -0,0 +1,115 @@
+"""
+Buffered live-search logging.
+
+The search box asks live_search for results while the customer types
+(debounced in base.html), so one search arrives as "oc", "oce", "ocean".
+Logging every request would be an INSERT per keystroke on the busiest
+endpoint. Instead each worker keeps the latest query of every searcher in
+memory (keyed by session, or by client address for visitors without one);
+a query that extends or trims the previous one replaces it. A daemon thread,
+started in each gunicorn worker by gunicorn.conf.py, writes the searches
+that have been quiet for SEARCH_SETTLE_SECONDS as SearchQueryLog rows with
+one bulk_create, so a search is one row, written once. Processes without a
+flusher (runserver, tests) write settled searches as the next one arrives.
+
+A worker that exits or is recycled writes everything it holds (gunicorn's
+worker_exit hook, and atexit); a killed worker loses only its unsettled
+searches. Chains split across workers are still collapsed by the rollup
+(see home/analytics.py).
+"""
+import atexit
+import os
+import threading
+import time
+
+from django.db import connection
+
+from .models import SearchQueryLog
+
+# Seconds without a further keystroke after which a search is final
+SEARCH_SETTLE_SECONDS = 10
+
+# Searchers buffered at most; past this every pending search is treated as final
+MAX_PENDING = 10000
+
+# searcher -> [query, session_key, result_count, last keystroke (monotonic)]
+_pending = {}
+# Final searches waiting for the next write
+_ready = []
+_lock = threading.Lock()
+# pid of the process whose flusher thread is running (threads don't survive a fork)
+_flusher_pid = None
+
+
+def _continues(previous, query):
+    previous, query = previous.lower(), query.lower()
+    return query.startswith(previous) or previous.startswith(query)
+
+
+def start_flusher():
+    """Starts this process's flusher thread (called once per gunicorn worker)."""
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name="search-log-flusher", daemon=True).start()
+
+
+def record(request, query, result_count):
+    """Buffers one live search request."""
+    session_key = request.session.session_key or ""
+    searcher = session_key or request.META.get("REMOTE_ADDR", "")
+    with _lock:
+        previous = _pending.get(searcher)
+        if previous is not None and not _continues(previous[0], query):
+            _ready.append(previous)
+        _pending[searcher] = [query[:200], session_key, result_count, time.monotonic()]
+        if len(_pending) > MAX_PENDING:
+            _ready.extend(_pending.values())
+            _pending.clear()
+        buffered = _flusher_pid == os.getpid()
+    if not buffered:
+        flush()
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(SEARCH_SETTLE_SECONDS)
+        try:
+            flush()
+        finally:
+            # The thread's own connection; don't hold it open between flushes
+            connection.close()
+
+
+def _take(everything):
+    global _ready
+    settled = time.monotonic() - SEARCH_SETTLE_SECONDS
+    with _lock:
+        entries, _ready = _ready, []
+        for searcher, entry in list(_pending.items()):
+            if everything or entry[3] <= settled:
+                entries.append(entry)
+                del _pending[searcher]
+    return entries
+
+
+def flush(everything=False):
+    """Writes the settled searches (all of them with everything=True). Failed writes are dropped."""
+    entries = _take(everything)
+    if not entries:
+        return
+    try:
+        SearchQueryLog.objects.bulk_create(
+            [
+                SearchQueryLog(query=query, session_key=session_key, result_count=result_count)
+                for query, session_key, result_count, _ in entries
+            ],
+            batch_size=500,
+        )
+    except Exception as e:
+        print(f"Search log flush error: {e}")
+
+
+atexit.register(flush, everything=True)
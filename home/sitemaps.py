@@ -0,0 +1,128 @@
+"""
+Static sitemap files for colors, products, ideas and portfolio projects.
+
+Each section is split into shards by primary key range (SHARD_SIZE ids per
+shard), written as SITEMAP_ROOT/sitemap-<section>-<n>.xml, with one
+sitemap.xml index over all of them. nginx serves the files directly (see
+nginx/default.conf), so crawlers never reach Django.
+
+Generation is incremental. One aggregate query per section gives each
+shard's signature (active row count, sum of ids, latest updated_at); only
+shards whose signature differs from the last run, recorded in
+manifest.json, are rewritten. Counter updates (save_count, view_count) go
+through QuerySet.update() and don't touch updated_at, so they never cause
+rewrites. Files are replaced atomically.
+"""
+import json
+import os
+from xml.sax.saxutils import escape
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Count, F, Max, Sum
+
+# section -> model label; the model needs slug, updated_at, is_active and get_absolute_url()
+SITEMAP_SOURCES = {
+    "colors": "colors.Color",
+    "products": "products.Product",
+    "ideas": "ideas.Idea",
+    "portfolio": "portfolio.PortfolioProject",
+}
+
+# Ids per shard (the sitemap protocol allows up to 50,000 URLs per file)
+SHARD_SIZE = 10000
+
+INDEX_NAME = "sitemap.xml"
+MANIFEST_NAME = "manifest.json"
+
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def shard_name(section, shard):
+    return f"sitemap-{section}-{shard}.xml"
+
+
+def _write_atomic(path, chunks):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(chunks)
+    os.replace(tmp, path)
+
+
+def _load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _signatures(model):
+    """{shard: [count, id sum, latest updated_at]} for the active rows of `model`."""
+    rows = (
+        model._default_manager.filter(is_active=True)
+        .annotate(shard=(F("pk") - 1) / SHARD_SIZE)
+        .values("shard")
+        .annotate(count=Count("pk"), id_sum=Sum("pk"), lastmod=Max("updated_at"))
+        .order_by("shard")
+    )
+    return {
+        str(row["shard"]): [row["count"], row["id_sum"], row["lastmod"].isoformat()]
+        for row in rows
+    }
+
+
+def _shard_urls(model, shard, site):
+    start = int(shard) * SHARD_SIZE
+    items = (
+        model._default_manager.filter(is_active=True, pk__gt=start, pk__lte=start + SHARD_SIZE)
+        .only("pk", "slug", "updated_at")
+        .order_by("pk")
+    )
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+    for item in items.iterator(chunk_size=2000):
+        loc = escape(site + item.get_absolute_url())
+        yield f"<url><loc>{loc}</loc><lastmod>{item.updated_at.isoformat()}</lastmod></url>\n"
+    yield "</urlset>\n"
+
+
+def _index(manifest, site):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">\n'
+    for section, shards in manifest.items():
+        for shard, (_, _, lastmod) in sorted(shards.items(), key=lambda s: int(s[0])):
+            loc = escape(f"{site}/{shard_name(section, shard)}")
+            yield f"<sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def generate(force=False):
+    """
+    Brings SITEMAP_ROOT up to date and returns {"written": [...], "removed": [...]}
+    file names. With force=True every shard is rewritten.
+    """
+    root = settings.SITEMAP_ROOT
+    site = settings.SITE_URL.rstrip("/")
+    os.makedirs(root, exist_ok=True)
+
+    previous = _load_manifest(root)
+    manifest, written, removed = {}, [], []
+    for section, label in SITEMAP_SOURCES.items():
+        model = apps.get_model(label)
+        old = previous.get(section, {})
+        manifest[section] = _signatures(model)
+        for shard, signature in manifest[section].items():
+            if force or old.get(shard) != signature:
+                _write_atomic(os.path.join(root, shard_name(section, shard)), _shard_urls(model, shard, site))
+                written.append(shard_name(section, shard))
+        for shard in old.keys() - manifest[section].keys():
+            try:
+                os.remove(os.path.join(root, shard_name(section, shard)))
+            except FileNotFoundError:
+                pass
+            removed.append(shard_name(section, shard))
+
+    index_path = os.path.join(root, INDEX_NAME)
+    if written or removed or not os.path.exists(index_path):
+        _write_atomic(index_path, _index(manifest, site))
+        _write_atomic(os.path.join(root, MANIFEST_NAME), [json.dumps(manifest)])
+    return {"written": written, "removed": removed}
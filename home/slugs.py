@@ -0,0 +1,95 @@
+"""
+Unique slug allocation shared by Color, Product, Idea and PortfolioProject.
+
+Instead of probing "slug", "slug-1", "slug-2"... with one exists() query each,
+the taken slugs for a base are fetched with a single prefix query and the
+next free suffix is picked in Python. allocate_slugs() does the same for a
+whole batch (e.g. bulk imports) with at most two queries.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Room kept free at the end of a long slug for a "-<counter>" suffix
+SUFFIX_RESERVE = 8
+
+# How often save_with_unique_slug() retries after losing a race
+MAX_ATTEMPTS = 5
+
+
+def _stem(base, max_length):
+    return base[:max_length - SUFFIX_RESERVE].rstrip("-")
+
+
+def allocate_slugs(model, values, field="slug", exclude_pk=None, reserved=()):
+    """
+    Returns one unique slug per item in `values` (the strings to slugify),
+    in order. Slugs in `reserved` are treated as taken, so callers can
+    allocate across several batches before anything is written.
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = [slugify(value)[:max_length] or model._meta.model_name for value in values]
+
+    queryset = model._default_manager.all()
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+
+    taken = set(reserved)
+    taken |= set(queryset.filter(**{f"{field}__in": set(bases)}).values_list(field, flat=True))
+
+    # Only bases that collide (with the table or within the batch) need their suffixes looked up
+    seen, colliding = set(), set()
+    for base in bases:
+        if base in taken or base in seen:
+            colliding.add(_stem(base, max_length))
+        seen.add(base)
+    if colliding:
+        prefix_filter = reduce(or_, (Q(**{f"{field}__startswith": stem}) for stem in colliding))
+        taken |= set(queryset.filter(prefix_filter).values_list(field, flat=True))
+
+    next_counter = {}
+    slugs = []
+    for base in bases:
+        slug = base
+        if slug in taken:
+            stem = _stem(base, max_length)
+            if stem not in next_counter:
+                pattern = re.compile(rf"^{re.escape(stem)}-(\d+)$")
+                used = [int(m.group(1)) for m in map(pattern.match, taken) if m]
+                next_counter[stem] = max(used, default=0) + 1
+            while f"{stem}-{next_counter[stem]}" in taken:
+                next_counter[stem] += 1
+            slug = f"{stem}-{next_counter[stem]}"
+            next_counter[stem] += 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def unique_slug(instance, value, field="slug"):
+    """Returns a free slug for `value` on the instance's model."""
+    return allocate_slugs(type(instance), [value], field=field, exclude_pk=instance.pk)[0]
+
+
+def save_with_unique_slug(instance, value, save, *args, field="slug", **kwargs):
+    """
+    Fills in a unique slug and calls save(*args, **kwargs). If a concurrent
+    save grabbed the same slug first, the unique constraint fires and we
+    retry with the next free one.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        setattr(instance, field, unique_slug(instance, value, field=field))
+        try:
+            with transaction.atomic():
+                save(*args, **kwargs)
+            return
+        except IntegrityError:
+            slug = getattr(instance, field)
+            collided = type(instance)._default_manager.filter(**{field: slug}).exclude(pk=instance.pk).exists()
+            if not collided or attempt == MAX_ATTEMPTS - 1:
+                setattr(instance, field, "")
+                raise
@@ -1,3 +1,476 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import brotli
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.files.storage import FileSystemStorage
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from colors.models import Color, Finish, SavedColor
+from home import (
+    analytics, bookmarks, collection, counters, invalidation, reference_data, search_tracking, sitemaps,
+    view_tracking,
+)
+from home.models import CatalogVersion, DailyMetric, SearchQueryLog
+from home.slugs import allocate_slugs
+from home.storage import CheckedStaticFilesStorage, CompressedManifestStaticFilesStorage
+from ideas.models import Idea, SavedIdea
+from products.models import Category, Product, SavedProducts
+from quote_request.models import QuoteRequest
+
+
+class CatalogVersionTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+
+    def current(self, model):
+        invalidation.reset()
+        return invalidation.get_version(model)[0]
+
+    def test_bump_increments_counter_and_updated_at(self):
+        invalidation.bump(Color)
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        CatalogVersion.objects.filter(key="colors.color").update(updated_at=an_hour_ago)
+        first = CatalogVersion.objects.get(key="colors.color")
+        invalidation.bump(Color)
+        second = CatalogVersion.objects.get(key="colors.color")
+        self.assertEqual(second.version, first.version + 1)
+        self.assertGreater(second.updated_at, an_hour_ago)
+
+    def test_save_bumps_only_after_commit(self):
+        before = self.current(Color)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Color.objects.create(name="Ocean Breeze", code="OB-202", hex_code="#5DADE3")
+            self.assertEqual(self.current(Color), before)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(self.current(Color), before)
+
+    def test_versioned_rebuilds_after_bump(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(invalidation.versioned("test", [Color], build), 1)
+        self.assertEqual(invalidation.versioned("test", [Color], build), 1)
+        invalidation.bump(Color)
+        self.assertEqual(invalidation.versioned("test", [Color], build), 2)
+
+
+class ReferenceTableTests(TestCase):
+    def setUp(self):
+        invalidation.clear()
+
+    def test_reloads_after_change(self):
+        matte = Finish.objects.create(name="Matte")
+        self.assertEqual(reference_data.finishes.all(), [matte])
+        with self.captureOnCommitCallbacks(execute=True):
+            gloss = Finish.objects.create(name="Gloss")
+        invalidation.reset()
+        self.assertEqual(reference_data.finishes.all(), [gloss, matte])
+
+    def test_get_accepts_numeric_strings_only(self):
+        matte = Finish.objects.create(name="Matte")
+        self.assertEqual(reference_data.finishes.get(str(matte.pk)), matte)
+        self.assertIsNone(reference_data.finishes.get("matte"))
+        self.assertIsNone(reference_data.finishes.get(None))
+
+
+class SlugAllocationTests(TestCase):
+    def test_free_slugs_are_used_as_is(self):
+        self.assertEqual(allocate_slugs(Color, ["Ocean Breeze", "Fern"]), ["ocean-breeze", "fern"])
+
+    def test_collisions_get_the_next_free_suffix(self):
+        Color.objects.create(name="Fern", code="A", slug="fern")
+        Color.objects.create(name="Fern 2", code="B", slug="fern-2")
+        self.assertEqual(allocate_slugs(Color, ["Fern", "fern", "Fern"]), ["fern-3", "fern-4", "fern-5"])
+
+    def test_reserved_slugs_count_as_taken(self):
+        self.assertEqual(allocate_slugs(Color, ["Fern"], reserved={"fern", "fern-1"}), ["fern-2"])
+
+    def test_long_values_keep_room_for_the_suffix(self):
+        max_length = Color._meta.get_field("slug").max_length
+        first, second = allocate_slugs(Color, ["x" * 500, "x" * 500])
+        self.assertEqual(len(first), max_length)
+        self.assertLessEqual(len(second), max_length)
+        self.assertNotEqual(first, second)
+
+    def test_save_fills_in_a_unique_slug(self):
+        first = Color.objects.create(name="Fern", code="FD-1")
+        second = Color.objects.create(name="Fern!", code="FD 1")
+        self.assertEqual(first.slug, "fern-fd-1")
+        self.assertEqual(second.slug, "fern-fd-1-1")
+
+
+class RollupTests(TestCase):
+    def backdate(self, queryset, minutes):
+        queryset.update(created_at=timezone.now() - timedelta(minutes=minutes))
+
+    def metric(self, metric, key=""):
+        return sum(DailyMetric.objects.filter(metric=metric, key=key).values_list("value", flat=True))
+
+    def test_rows_are_counted_once_and_only_after_the_lag(self):
+        for name in ("A", "B", "C"):
+            QuoteRequest.objects.create(name=name, email="a@example.com")
+        self.backdate(QuoteRequest.objects.exclude(name="C"), 10)
+
+        self.assertEqual(analytics.rollup_metric("quote_requests"), 2)
+        self.assertEqual(analytics.rollup_metric("quote_requests"), 0)
+        self.assertEqual(self.metric("quote_requests"), 2)
+
+        # C commits with a timestamp inside the lag: picked up once it is old enough
+        self.backdate(QuoteRequest.objects.filter(name="C"), 4)
+        with mock.patch.object(analytics.timezone, "now", return_value=timezone.now() + timedelta(minutes=2)):
+            self.assertEqual(analytics.rollup_metric("quote_requests"), 1)
+        self.assertEqual(self.metric("quote_requests"), 3)
+
+    def test_keystroke_prefixes_are_collapsed(self):
+        for session_key, query, results in [
+            ("s1", "oc", 9), ("s1", "oce", 4), ("s1", "Ocean ", 3),
+            ("s2", "ocean", 3), ("s2", "zinc primer", 0), ("", "oc", 9), ("", "ocean", 3),
+        ]:
+            SearchQueryLog.objects.create(session_key=session_key, query=query, result_count=results)
+        self.backdate(SearchQueryLog.objects.all(), 10)
+
+        self.assertEqual(analytics.rollup_searches(), 7)
+        self.assertEqual(self.metric("searches"), 5)
+        self.assertEqual(self.metric("search_term", "ocean"), 3)
+        self.assertEqual(self.metric("search_term", "oc"), 1)
+        self.assertEqual(self.metric("search_no_results", "zinc primer"), 1)
+
+
+class SearchTrackingTests(TestCase):
+    def setUp(self):
+        # Buffer like a gunicorn worker, but without its flusher thread: the tests flush by hand
+        self.enterContext(mock.patch.object(search_tracking, "_flusher_pid", os.getpid()))
+        search_tracking._pending.clear()
+        search_tracking._ready.clear()
+
+    def request(self, session_key):
+        request = RequestFactory().get("/ajax/search/")
+        request.session = SessionStore(session_key)
+        return request
+
+    def test_one_row_per_search(self):
+        for query in ("oc", "oce", "ocean", "ocea", "zinc"):
+            search_tracking.record(self.request("customer00000001"), query, 3)
+        search_tracking.record(self.request(None), "primer", 0)
+
+        search_tracking.flush()
+        self.assertEqual(list(SearchQueryLog.objects.values_list("query", flat=True)), ["ocea"])
+
+        search_tracking.flush(everything=True)
+        self.assertEqual(
+            sorted(SearchQueryLog.objects.values_list("query", "session_key")),
+            [("ocea", "customer00000001"), ("primer", ""), ("zinc", "customer00000001")],
+        )
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.color = Color.objects.create(name="Fern", code="FD-1")
+
+    def save_count(self):
+        return Color.objects.values_list("save_count", flat=True).get(pk=self.color.pk)
+
+    def test_adjust_never_goes_below_zero(self):
+        counters.adjust(Color, self.color.pk, delta=2)
+        self.assertEqual(self.save_count(), 2)
+        counters.adjust(Color, self.color.pk, delta=-5)
+        self.assertEqual(self.save_count(), 0)
+
+    def test_full_saves_leave_counters_alone(self):
+        stale = Color.objects.get(pk=self.color.pk)
+        counters.adjust(Color, self.color.pk, delta=3)
+        stale.name = "Fern Green"
+        stale.save()
+        self.assertEqual(self.save_count(), 3)
+        self.assertEqual(Color.objects.get(pk=self.color.pk).name, "Fern Green")
+
+    def test_reconcile_fixes_only_drifted_rows(self):
+        users = [User.objects.create_user(f"user{i}", password="pw") for i in range(2)]
+        SavedColor.objects.bulk_create([SavedColor(user=user, color=self.color) for user in users])
+        counters.adjust(User, users[0].pk, "saved_colors_count", 1)
+
+        self.assertEqual(counters.reconcile("colors.Color", "save_count"), 1)
+        self.assertEqual(self.save_count(), 2)
+        self.assertEqual(counters.reconcile("accounts.User", "saved_colors_count"), 1)
+        self.assertEqual(counters.reconcile("colors.Color", "save_count"), 0)
+
+
+class ViewTrackingTests(TestCase):
+    def setUp(self):
+        # Buffer like a gunicorn worker, but without its flusher thread: the tests flush by hand
+        self.enterContext(mock.patch.object(view_tracking, "_flusher_pid", os.getpid()))
+        view_tracking._pending.clear()
+        self.fern = Color.objects.create(name="Fern", code="FD-1")
+        self.sky = Color.objects.create(name="Sky", code="SK-1")
+
+    def view_counts(self):
+        return dict(Color.objects.values_list("code", "view_count"))
+
+    def test_flush_adds_the_buffered_views(self):
+        for color in (self.fern, self.fern, self.fern, self.sky):
+            view_tracking.record(color)
+        self.assertEqual(self.view_counts(), {"FD-1": 0, "SK-1": 0})
+        with mock.patch.object(view_tracking, "FLUSH_BATCH_SIZE", 1):
+            view_tracking.flush()
+        self.assertEqual(self.view_counts(), {"FD-1": 3, "SK-1": 1})
+        view_tracking.flush()
+        self.assertEqual(self.view_counts(), {"FD-1": 3, "SK-1": 1})
+
+    def test_failed_writes_are_kept_for_the_next_flush(self):
+        view_tracking.record(self.fern)
+        with mock.patch.object(view_tracking, "_write", side_effect=Exception("simulated write failure")):
+            view_tracking.flush()
+        view_tracking.record(self.fern)
+        view_tracking.flush()
+        self.assertEqual(self.view_counts()["FD-1"], 2)
+
+    def test_detail_page_views_are_buffered(self):
+        self.client.get(reverse("color_detail", args=[self.fern.slug]))
+        self.assertEqual(view_tracking._pending[Color][self.fern.pk], 1)
+
+    def test_views_are_written_at_once_without_a_flusher(self):
+        with mock.patch.object(view_tracking, "_flusher_pid", None):
+            view_tracking.record(self.fern)
+        self.assertEqual(self.view_counts()["FD-1"], 1)
+        self.assertEqual(view_tracking._pending, {})
+
+
+class BookmarkBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("wanjiru", password="pw")
+        self.fern = Color.objects.create(name="Fern", code="FD-1")
+        self.sky = Color.objects.create(name="Sky", code="SK-1")
+        self.hidden = Color.objects.create(name="Old", code="OLD", is_active=False)
+
+    def post(self, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(reverse("update_bookmarks"), body, content_type="application/json")
+
+    def test_parse_operations_keeps_the_last_state(self):
+        changes = bookmarks.parse_operations([
+            {"type": "color", "id": 1, "saved": True},
+            {"type": "color", "id": "1", "saved": False},
+            {"type": "idea", "id": 2, "saved": True},
+        ])
+        self.assertEqual(changes, {"color": {1: False}, "idea": {2: True}})
+
+    def test_rejects_malformed_batches(self):
+        self.client.force_login(self.user)
+        for payload in (
+            "{", "[]", {}, {"operations": []},
+            {"operations": [{"type": "paint", "id": 1, "saved": True}]},
+            {"operations": [{"type": "color", "id": -1, "saved": True}]},
+            {"operations": [{"type": "color", "id": True, "saved": True}]},
+            {"operations": [{"type": "color", "id": 1, "saved": "yes"}]},
+            {"operations": [{"type": "color", "id": 1, "saved": True}] * (bookmarks.MAX_OPERATIONS + 1)},
+        ):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+
+    def test_apply_saves_and_recounts(self):
+        self.client.force_login(self.user)
+        response = self.post({"operations": [
+            {"type": "color", "id": self.fern.pk, "saved": True},
+            {"type": "color", "id": self.sky.pk, "saved": True},
+            {"type": "color", "id": self.hidden.pk, "saved": True},
+        ]})
+        self.assertEqual(
+            {item["id"]: item["saved"] for item in response.json()["bookmarks"]},
+            {self.fern.pk: True, self.sky.pk: True, self.hidden.pk: False},
+        )
+        # Saving twice is harmless
+        self.post({"operations": [
+            {"type": "color", "id": self.fern.pk, "saved": True},
+            {"type": "color", "id": self.sky.pk, "saved": False},
+        ]})
+        self.assertEqual(list(SavedColor.objects.values_list("color__code", flat=True)), ["FD-1"])
+        self.assertEqual(dict(Color.objects.values_list("code", "save_count")), {"FD-1": 1, "SK-1": 0, "OLD": 0})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.saved_colors_count, 1)
+
+
+class CollectionFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("wanjiru", password="pw")
+        category = Category.objects.create(name="Paints")
+        noon = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        # Several saves share a timestamp so the feed has to break ties across the UNION
+        for i in range(5):
+            color = Color.objects.create(name=f"Color {i}", code=f"C-{i}")
+            product = Product.objects.create(name=f"Product {i}", description="-", category=category)
+            idea = Idea.objects.create(title=f"Idea {i}", description="-")
+            saved_at = noon - timedelta(hours=i // 2)
+            for model, field, item in ((SavedColor, "color", color), (SavedProducts, "product", product),
+                                       (SavedIdea, "idea", idea)):
+                row = model.objects.create(user=self.user, **{field: item})
+                model.objects.filter(pk=row.pk).update(saved_at=saved_at)
+
+    def walk(self, kind=None, page_size=4):
+        seen, cursor = [], None
+        while True:
+            items, cursor = collection.saved_page(self.user, kind=kind, cursor=cursor, page_size=page_size)
+            seen += [(item.saved_type, item.pk, item.saved_at) for item in items]
+            if cursor is None:
+                return seen
+
+    def test_cursor_round_trip(self):
+        saved_at = timezone.now()
+        cursor = collection.encode_cursor({"saved_at": saved_at, "kind": "idea", "row_id": 42})
+        self.assertEqual(collection.decode_cursor(cursor), (saved_at, "idea", 42))
+
+    def test_malformed_cursors_start_from_the_top(self):
+        bad_kind = collection.encode_cursor({"saved_at": timezone.now(), "kind": "paint", "row_id": 1})
+        for cursor in (None, "", "!!!", "bm90IGEgY3Vyc29y", bad_kind):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(collection.decode_cursor(cursor))
+
+    def test_pages_cover_every_item_once_newest_first(self):
+        seen = self.walk()
+        self.assertEqual(len(seen), 15)
+        self.assertEqual(len({(kind, pk) for kind, pk, _ in seen}), 15)
+        times = [saved_at for _, _, saved_at in seen]
+        self.assertEqual(times, sorted(times, reverse=True))
+
+    def test_single_type_feed(self):
+        seen = self.walk(kind="product", page_size=2)
+        self.assertEqual([kind for kind, _, _ in seen], ["product"] * 5)
+
+    def test_page_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("my_collection"), {"type": "idea"},
+                                   headers={"x-requested-with": "XMLHttpRequest"})
+        self.assertIsNone(response.json()["next_cursor"])
+        self.assertIn("Idea 4", response.json()["html"])
+
+
+class SessionSaveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("wanjiru", password="pw")
+        self.fern = Color.objects.create(name="Fern", code="FD-1")
+        self.sky = Color.objects.create(name="Sky", code="SK-1")
+
+    def save(self, *colors, saved=True):
+        operations = [{"type": "color", "id": color.pk, "saved": saved} for color in colors]
+        return self.client.post(reverse("update_bookmarks"), {"operations": operations}, content_type="application/json")
+
+    def test_visitors_save_to_the_session(self):
+        self.save(self.fern, self.sky)
+        self.save(self.sky, saved=False)
+        self.assertEqual(self.client.session[bookmarks.SESSION_KEY], {"color": [self.fern.pk]})
+        self.assertFalse(SavedColor.objects.exists())
+        response = self.client.get(reverse("color_list"), headers={"x-requested-with": "XMLHttpRequest"})
+        self.assertEqual({c["code"]: c["is_saved"] for c in response.json()["colors"]}, {"FD-1": True, "SK-1": False})
+
+    def test_session_keeps_the_newest_saves(self):
+        session = {}
+        for pk in range(bookmarks.SESSION_MAX_ITEMS + 10):
+            bookmarks.apply_to_session(session, {"idea": {pk: True}})
+        ids = session[bookmarks.SESSION_KEY]["idea"]
+        self.assertEqual(len(ids), bookmarks.SESSION_MAX_ITEMS)
+        self.assertEqual(ids[-1], bookmarks.SESSION_MAX_ITEMS + 9)
+
+    def test_saves_move_to_the_account_on_login(self):
+        self.save(self.fern)
+        self.client.login(username="wanjiru", password="pw")
+        self.assertEqual(list(SavedColor.objects.values_list("user", "color")), [(self.user.pk, self.fern.pk)])
+        self.assertNotIn(bookmarks.SESSION_KEY, self.client.session)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.saved_colors_count, 1)
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        self.root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(SITEMAP_ROOT=self.root))
+        self.enterContext(mock.patch.object(sitemaps, "SHARD_SIZE", 2))
+        self.colors = [Color.objects.create(name=f"Color {i}", code=f"C-{i}") for i in range(4)]
+
+    def shard_of(self, color):
+        return sitemaps.shard_name("colors", (color.pk - 1) // 2)
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_only_changed_shards_are_rewritten(self):
+        first = sitemaps.generate()
+        self.assertEqual(sorted(first["written"]), sorted({self.shard_of(c) for c in self.colors}))
+        self.assertIn(self.shard_of(self.colors[0]), self.read(sitemaps.INDEX_NAME))
+        self.assertIn(self.colors[0].get_absolute_url(), self.read(self.shard_of(self.colors[0])))
+
+        self.assertEqual(sitemaps.generate(), {"written": [], "removed": []})
+
+        # Popularity counters don't change the sitemap
+        counters.adjust(Color, self.colors[0].pk, "view_count", 10)
+        self.assertEqual(sitemaps.generate()["written"], [])
+
+        self.colors[3].name = "Renamed"
+        self.colors[3].save()
+        self.assertEqual(sitemaps.generate()["written"], [self.shard_of(self.colors[3])])
+
+    def test_emptied_shards_are_removed(self):
+        sitemaps.generate()
+        last = self.shard_of(self.colors[3])
+        Color.objects.filter(pk__in=[c.pk for c in self.colors if self.shard_of(c) == last]).update(is_active=False)
+        self.assertEqual(sitemaps.generate()["removed"], [last])
+        self.assertFalse(os.path.exists(os.path.join(self.root, last)))
+        self.assertNotIn(last, self.read(sitemaps.INDEX_NAME))
+
+    def test_force_rewrites_everything(self):
+        sitemaps.generate()
+        self.assertEqual(len(sitemaps.generate(force=True)["written"]), len({self.shard_of(c) for c in self.colors}))
+
+
+class CompressedStaticStorageTests(TestCase):
+    FILES = {
+        "css/style.css": b"body { color: #333; }\n" * 100,
+        "js/tiny.js": b"var a = 1;",
+        "img/logo.png": bytes(range(256)) * 4,
+    }
+
+    def setUp(self):
+        source = self.enterContext(tempfile.TemporaryDirectory())
+        for name, data in self.FILES.items():
+            os.makedirs(os.path.join(source, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(source, name), "wb") as f:
+                f.write(data)
+        self.root = self.enterContext(tempfile.TemporaryDirectory())
+        self.storage = CompressedManifestStaticFilesStorage(location=self.root)
+        source_storage = FileSystemStorage(location=source)
+        for name in self.FILES:
+            with source_storage.open(name) as f:
+                self.storage.save(name, f)
+        list(self.storage.post_process({name: (source_storage, name) for name in self.FILES}))
+
+    def test_compressible_files_get_gzip_and_brotli_siblings(self):
+        hashed = self.storage.stored_name("css/style.css")
+        self.assertNotEqual(hashed, "css/style.css")
+        for name in ("css/style.css", hashed):
+            path = self.storage.path(name)
+            with open(path + ".gz", "rb") as f:
+                self.assertEqual(gzip.decompress(f.read()), self.FILES["css/style.css"])
+            with open(path + ".br", "rb") as f:
+                self.assertEqual(brotli.decompress(f.read()), self.FILES["css/style.css"])
+
+    def test_small_and_binary_files_are_left_alone(self):
+        for name in ("js/tiny.js", "img/logo.png"):
+            self.assertFalse(os.path.exists(self.storage.path(self.storage.stored_name(name)) + ".gz"))
+
+    def test_missing_files_fail_loudly(self):
+        with self.assertRaises(ValueError):
+            self.storage.stored_name("img/never-collected.jpg")
+        with self.assertRaises(ValueError):
+            CheckedStaticFilesStorage(location=self.root).url("img/never-collected.jpg")
+        self.assertEqual(CheckedStaticFilesStorage(location=self.root).url("js/tiny.js"), "/static/js/tiny.js")
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.index, name='home'),
     path('my-collection/', views.my_collection, name='my_collection'),
+    path('ajax/bookmarks/', views.update_bookmarks, name='update_bookmarks'),
     path("about/", views.about, name="about"),
     path("contact/", views.contact, name="contact"),
     path('ajax/search/', views.live_search, name='live_search'),
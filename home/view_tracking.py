@@ -0,0 +1,110 @@
+"""
+Buffered detail-page view counts.
+
+Views are counted in a per-process buffer, not in the database. A daemon
+thread, started in each gunicorn worker by gunicorn.conf.py, writes the
+buffer every VIEW_COUNT_FLUSH_INTERVAL seconds with one UPDATE per model:
+
+    UPDATE ... SET view_count = view_count + CASE WHEN id IN (...) THEN 2 ... END
+    WHERE id IN (...)
+
+Increments are relative, so any number of gunicorn workers can flush
+independently. The flush runs on time whether or not the worker is serving
+requests, so a worker that is killed loses at most one interval of views; a
+worker that exits or is recycled flushes what is left (gunicorn's worker_exit
+hook, and atexit). Processes without a flusher (runserver, management
+commands, tests) write each view straight away.
+
+Like the save counters (see home/counters.py), view_count is only written
+with QuerySet.update(), which sends no signals and invalidates no caches.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+# Rows per UPDATE (keeps the IN lists under SQLite's parameter limit)
+FLUSH_BATCH_SIZE = 500
+
+_pending = {}
+_lock = threading.Lock()
+# pid of the process whose flusher thread is running (threads don't survive a fork)
+_flusher_pid = None
+
+
+def start_flusher():
+    """Starts this process's flusher thread (called once per gunicorn worker)."""
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name="view-count-flusher", daemon=True).start()
+
+
+def record(obj):
+    """Counts one view of a model instance that has a view_count column."""
+    model = obj._meta.concrete_model
+    with _lock:
+        _pending.setdefault(model, Counter())[obj.pk] += 1
+        buffered = _flusher_pid == os.getpid()
+    if not buffered:
+        flush()
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(settings.VIEW_COUNT_FLUSH_INTERVAL)
+        try:
+            flush()
+        finally:
+            # The thread's own connection; don't hold it open between flushes
+            connection.close()
+
+
+def _take():
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    return pending
+
+
+def _restore(model, counts):
+    with _lock:
+        _pending.setdefault(model, Counter()).update(counts)
+
+
+def _write(model, batch):
+    # One WHEN per distinct increment, not per row
+    by_increment = {}
+    for pk, n in batch:
+        by_increment.setdefault(n, []).append(pk)
+    increment = Case(
+        *[When(pk__in=pks, then=Value(n)) for n, pks in by_increment.items()],
+        default=Value(0),
+        output_field=PositiveIntegerField(),
+    )
+    model._default_manager.filter(pk__in=[pk for pk, _ in batch]).update(
+        view_count=F("view_count") + increment
+    )
+
+
+def flush():
+    """Writes the buffered counts. Batches that fail to write are kept for the next flush."""
+    for model, counts in _take().items():
+        items = list(counts.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            try:
+                _write(model, batch)
+            except Exception as e:
+                print(f"View count flush error ({model._meta.label}): {e}")
+                _restore(model, dict(batch))
+
+
+atexit.register(flush)
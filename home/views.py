@@ -10,12 +10,13 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 
 # --- Imported Models ---
-from colors.models import Color, SavedColor
-from ideas.models import SavedIdea
+from colors.models import Color
 # NOTE: Ensure 'Category' here refers to your MainCategory model if you renamed it.
 # Based on your previous requests, it seems 'Category' is now the main one.
-from products.models import Product, Category, SubCategory, SavedProducts
+from products import document_text
+from products.models import Product, SubCategory
 from .models import NewsletterSubscriber, Newsletter
+from . import bookmarks, collection, reference_data, search_tracking
 
 
 def index(request):
@@ -26,8 +27,8 @@ def index(request):
     If it doesn't, it uses the main category itself.
     """
 
-    # 1. Fetch all main categories with their subcategories pre-fetched
-    main_categories = Category.objects.prefetch_related('subcategories').order_by('name')
+    # 1. Fetch all main categories with their subcategories pre-fetched (cached per process)
+    main_categories = reference_data.product_categories.all()
 
     # 2. Build the list of filter names (mixed main and sub categories)
     filter_names = []
@@ -93,46 +94,63 @@ def index(request):
 @login_required
 def my_collection(request):
     """
-    Displays all items saved by the current user.
+    Displays the items saved by the current user, newest first, one page at a time
+    (see home/collection.py). AJAX requests get the next page as rendered HTML.
     """
-    saved_product_relations = SavedProducts.objects.filter(user=request.user) \
-        .select_related('product', 'product__category') \
-        .order_by('-saved_at')
-
-    products = []
-    for rel in saved_product_relations:
-        product = rel.product
-        product.is_saved = True
-        products.append(product)
-
-    saved_color_relations = SavedColor.objects.filter(user=request.user) \
-        .select_related('color') \
-        .order_by('-saved_at')
-
-    colors = []
-    for rel in saved_color_relations:
-        color = rel.color
-        color.is_saved = True
-        colors.append(color)
-
-    saved_idea_relations = SavedIdea.objects.filter(user=request.user) \
-        .select_related('idea') \
-        .order_by('-saved_at')
-
-    ideas = []
-    for rel in saved_idea_relations:
-        idea = rel.idea
-        idea.is_saved = True
-        ideas.append(idea)
+    selected_type = request.GET.get('type')
+    if selected_type not in bookmarks.BOOKMARK_TYPES:
+        selected_type = None
+    items, next_cursor = collection.saved_page(request.user, kind=selected_type, cursor=request.GET.get('after'))
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        html = render_to_string('home/partials/collection_items.html', {'items': items}, request=request)
+        return JsonResponse({'html': html, 'next_cursor': next_cursor})
 
     context = {
-        'saved_products': products,
-        'saved_colors': colors,
-        'saved_ideas': ideas,
+        'items': items,
+        'next_cursor': next_cursor,
+        'selected_type': selected_type,
+        'counts': collection.counts(request.user),
     }
     return render(request, 'home/my_collection.html', context)
 
 
+@require_POST
+def update_bookmarks(request):
+    """
+    AJAX: Saves/unsaves a batch of colors, products and ideas. Anonymous
+    visitors' saves are kept in their session until they log in.
+    Body: {"operations": [{"type": "color", "id": 12, "saved": true}, ...]}
+    Returns the resulting saved state of every item in the batch.
+    """
+    try:
+        payload = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+
+    try:
+        changes = bookmarks.parse_operations(payload.get('operations') if isinstance(payload, dict) else None)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    try:
+        if request.user.is_authenticated:
+            state = bookmarks.apply(request.user, changes)
+        else:
+            state = bookmarks.apply_to_session(request.session, changes)
+    except Exception as e:
+        print(f"Bookmark update error: {e}")
+        return JsonResponse({'status': 'error', 'message': 'Could not update saved items'}, status=500)
+
+    return JsonResponse({
+        'status': 'success',
+        'bookmarks': [
+            {'type': kind, 'id': pk, 'saved': pk in state[kind]}
+            for kind, items in changes.items() for pk in items
+        ],
+    })
+
+
 def about(request):
     return render(request, "home/about.html")
 
@@ -198,7 +216,8 @@ def live_search(request):
 
     product_queryset = Product.objects.filter(
         Q(name__icontains=query) |
-        Q(description__icontains=query),
+        Q(description__icontains=query) |
+        document_text.matching_documents(query),
         is_active=True
     ).select_related('category', 'subcategory')[:5]
 
@@ -216,6 +235,9 @@ def live_search(request):
             'image_url': img_url
         })
 
+    # Buffered until the customer stops typing, then logged for the search analytics rollup
+    search_tracking.record(request, query, len(results['colors']) + len(results['products']))
+
     return JsonResponse(results, safe=False)
 
 
@@ -51,6 +51,8 @@ class IdeaAdmin(admin.ModelAdmin):
         "created_by",
         "is_featured",
         "is_active",
+        "save_count",
+        "view_count",
         "created_at",
     )
     list_filter = (
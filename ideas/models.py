@@ -6,6 +6,8 @@ from django.conf import settings
 from django.utils.text import slugify
 from django.urls import reverse
 from colors.models import Color  # <-- IMPORT THE COLOR MODEL
+from home import counters
+from home.slugs import save_with_unique_slug
 
 
 class Category(models.Model):
@@ -91,6 +93,8 @@ class Idea(models.Model):
     )
     is_featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
+    save_count = models.PositiveIntegerField(default=0, editable=False, help_text="Times saved by users")
+    view_count = models.PositiveIntegerField(default=0, editable=False, help_text="Detail page views")
 
     # Saved / favorite relationship
     saved_by = models.ManyToManyField(
@@ -107,6 +111,10 @@ class Idea(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Idea"
         verbose_name_plural = "Ideas"
+        indexes = [
+            # "Most popular" sort
+            models.Index(fields=["is_active", "-save_count"], name="idea_active_popular_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -122,7 +130,11 @@ class Idea(models.Model):
         if self.main_image and hasattr(self.main_image, 'url'):
             return self.main_image.url
 
-        first_gallery_image = self.images.first()
+        # Use prefetch_related("images") when it was applied (lists, My Collection)
+        if "images" in getattr(self, "_prefetched_objects_cache", {}):
+            first_gallery_image = next(iter(self.images.all()), None)
+        else:
+            first_gallery_image = self.images.first()
 
         # Check for a valid gallery image file
         if (first_gallery_image and
@@ -138,15 +150,11 @@ class Idea(models.Model):
 
     # --- IMPROVEMENT 4: UNIQUE SLUG GENERATION ---
     def save(self, *args, **kwargs):
+        counters.exclude_counters(self, kwargs)
         if not self.slug:
-            base_slug = slugify(self.title)[:255]
-            slug = base_slug
-            counter = 1
-            # Check for uniqueness and append a counter if needed
-            while Idea.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            # One prefix query finds the next free suffix; retries if a concurrent save wins
+            save_with_unique_slug(self, self.title, super().save, *args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
 
@@ -178,7 +186,7 @@ class SavedIdea(models.Model):
     idea = models.ForeignKey(
         Idea, on_delete=models.CASCADE, related_name="saved_by_users"
     )
-    saved_at = models.DateTimeField(auto_now_add=True)
+    saved_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = ("user", "idea")
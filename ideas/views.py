@@ -1,8 +1,9 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.db.models import Q
-from .models import Idea, Category, Tag, SavedIdea
+from django.db import transaction
+from home import bookmarks, reference_data, view_tracking
+from .models import Idea, SavedIdea
 from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 
 
@@ -11,8 +12,8 @@ def idea_list(request):
     Displays all active ideas with dynamic filtering by category and tag.
     """
     ideas = Idea.objects.filter(is_active=True).prefetch_related('tags', 'category')
-    categories = Category.objects.all().order_by("name")
-    tags = Tag.objects.all().order_by("name")
+    categories = reference_data.idea_categories.all()
+    tags = reference_data.idea_tags.all()
 
     # --- Filters ---
     category_slug = request.GET.get("category")
@@ -37,6 +38,8 @@ def idea_list(request):
     sort = request.GET.get("sort", "newest")
     if sort == "featured":
         ideas = ideas.order_by("-is_featured", "-created_at")
+    elif sort == "popular":
+        ideas = ideas.order_by("-save_count", "-created_at")
     else:
         ideas = ideas.order_by("-created_at")
 
@@ -44,7 +47,7 @@ def idea_list(request):
     if request.user.is_authenticated:
         saved_idea_ids = SavedIdea.objects.filter(user=request.user).values_list('idea_id', flat=True)
     else:
-        saved_idea_ids = []
+        saved_idea_ids = bookmarks.session_ids(request.session, 'idea')
 
     # Attach save status to each idea object
     idea_list = []
@@ -78,10 +81,13 @@ def idea_detail(request, slug):
         is_active=True
     )
 
+    view_tracking.record(idea)
+
     # Check if the current user has saved this idea
-    is_saved = False
     if request.user.is_authenticated:
         is_saved = SavedIdea.objects.filter(user=request.user, idea=idea).exists()
+    else:
+        is_saved = idea.id in bookmarks.session_ids(request.session, 'idea')
 
     # Get other ideas from the same category
     related_ideas = Idea.objects.filter(
@@ -96,11 +102,11 @@ def idea_detail(request, slug):
     })
 
 
-@login_required
 @require_POST
 def save_idea_toggle(request):
     """
-    AJAX view to save or unsave an idea for a user.
+    AJAX view to save or unsave an idea. Anonymous visitors' saves are
+    kept in their session until they log in (see home/bookmarks.py).
     """
     idea_id = request.POST.get('idea_id')
     if not idea_id:
@@ -111,15 +117,23 @@ def save_idea_toggle(request):
     except Idea.DoesNotExist:
         return JsonResponse({'status': 'error', 'message': 'Idea not found.'}, status=404)
 
-    # Check if it already exists
-    saved_obj, created = SavedIdea.objects.get_or_create(user=request.user, idea=idea)
+    if not request.user.is_authenticated:
+        is_saved = bookmarks.toggle_in_session(request.session, 'idea', idea.id)
+        return JsonResponse({'status': 'success', 'is_saved': is_saved})
 
-    if created:
-        # We just saved it
-        is_saved = True
-    else:
-        # It existed, so we delete it (unsave)
-        saved_obj.delete()
-        is_saved = False
+    # Check if it already exists
+    with transaction.atomic():
+        saved_obj, created = SavedIdea.objects.get_or_create(user=request.user, idea=idea)
+
+        if created:
+            # We just saved it
+            bookmarks.adjust_counts(request.user, 'idea', idea.id, 1)
+            is_saved = True
+        else:
+            # It existed, so we delete it (unsave); only the request that deleted it decrements
+            deleted, _ = SavedIdea.objects.filter(pk=saved_obj.pk).delete()
+            if deleted:
+                bookmarks.adjust_counts(request.user, 'idea', idea.id, -1)
+            is_saved = False
 
     return JsonResponse({'status': 'success', 'is_saved': is_saved})
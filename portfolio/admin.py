@@ -23,6 +23,7 @@ class PortfolioProjectAdmin(admin.ModelAdmin):
         "completion_date",
         "is_featured",
         "is_active",
+        "view_count",
         "created_at",
     )
     list_filter = (
@@ -1,8 +1,9 @@
 from django.db import models
-from django.utils.text import slugify
 from django.urls import reverse
 from products.models import Product
 from colors.models import Color
+from home import counters
+from home.slugs import save_with_unique_slug
 
 
 class PortfolioProject(models.Model):
@@ -35,6 +36,7 @@ class PortfolioProject(models.Model):
 
     is_featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
+    view_count = models.PositiveIntegerField(default=0, editable=False, help_text="Detail page views")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -71,15 +73,11 @@ class PortfolioProject(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        # This unique slug logic is correct
+        counters.exclude_counters(self, kwargs)
+        # Unique slug shared logic (see home/slugs.py)
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while PortfolioProject.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug[:160]
+            save_with_unique_slug(self, self.title, super().save, *args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -1,4 +1,5 @@
 from django.shortcuts import render, get_object_or_404
+from home import view_tracking
 from .models import PortfolioProject
 
 
@@ -40,6 +41,8 @@ def portfolio_detail(request, slug):
         is_active=True
     )
 
+    view_tracking.record(project)
+
     return render(request, "portfolio/portfolio_detail.html", {
         "project": project
     })
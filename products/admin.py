@@ -67,6 +67,8 @@ class ProductAdmin(admin.ModelAdmin):
         "category",
         "subcategory", # Added subcategory to list view
         "is_active",
+        "save_count",
+        "view_count",
         "created_at",
     )
     list_filter = (
@@ -123,6 +125,7 @@ class SafetyDocumentAdmin(admin.ModelAdmin):
         "version",
         "effective_date",
         "is_active",
+        "download_count",
         "uploaded_at",
     )
     list_filter = (
@@ -153,7 +156,13 @@ class SafetyDocumentAdmin(admin.ModelAdmin):
         ("Status", {
             "fields": ("is_active",),
         }),
+        ("Extracted Text", {
+            "fields": ("text",),
+            "classes": ("collapse",),
+            "description": "Filled in by the extract_document_text command; used by product search.",
+        }),
     )
+    readonly_fields = ("text",)
 
 
 # ---------- SAVED PRODUCTS ADMIN ----------
@@ -0,0 +1,191 @@
+"""
+Searchable text of safety documents (SDS/TDS PDFs).
+
+Customers search for "low VOC", "zinc" or "drying time", which only appear
+inside the PDFs. The extract_document_text command (run from cron) pulls the
+text out with pypdf (pdf_text.py) in worker processes and stores it on
+SafetyDocument.text, together with the SHA-256 of the file it came from
+(text_hash). Uploads in the admin never wait for any of this.
+
+Finding the changed files is cheap: each document also remembers the name,
+size and mtime of its file (text_stamp), and only files whose stamp differs
+are hashed. Only files whose hash differs are parsed.
+
+Each file is parsed in its own spawned process with its own deadline
+(EXTRACT_TIMEOUT); a process that runs past it is killed, so a PDF that
+sends pypdf into a loop can't hang the cron job.
+
+Every stored text is also split into its distinct words (SafetyDocumentTerm),
+and product searches match documents with matching_documents(query): each
+word of the query must prefix-match an indexed term, so a search never scans
+the texts themselves.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import time
+from multiprocessing.connection import wait
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .models import SafetyDocument, SafetyDocumentTerm
+from .pdf_text import extract_to_pipe
+
+# Seconds one document may take in its worker process
+EXTRACT_TIMEOUT = 120
+
+# Words shorter or longer than this are not indexed (or searched for)
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+
+# Query words looked up per search; the rest are ignored
+MAX_QUERY_TERMS = 5
+
+_WORD = re.compile(r"\w+")
+
+
+def terms(text):
+    """Distinct lower-case words of `text` that are worth indexing."""
+    return {
+        word for word in (w.casefold() for w in _WORD.findall(text or ""))
+        if MIN_TERM_LENGTH <= len(word) <= MAX_TERM_LENGTH
+    }
+
+
+def file_hash(document):
+    digest = hashlib.sha256()
+    with document.file.open("rb") as f:
+        for chunk in f.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stamp(document):
+    """Name, size and mtime of the document's file; raises OSError if it is missing."""
+    stat = os.stat(document.file.path)
+    return f"{document.file.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _store(document, **fields):
+    # A plain UPDATE: admin saves leave these columns alone (see SafetyDocument.save)
+    SafetyDocument.objects.filter(pk=document.pk).update(**fields)
+
+
+def _store_text(document, text, content_hash, stamp):
+    """Saves extracted text and replaces the document's indexed terms in one transaction."""
+    with transaction.atomic():
+        _store(document, text=text, text_hash=content_hash, text_stamp=stamp)
+        SafetyDocumentTerm.objects.filter(document_id=document.pk).delete()
+        SafetyDocumentTerm.objects.bulk_create(
+            [SafetyDocumentTerm(document_id=document.pk, term=term) for term in sorted(terms(text))],
+            batch_size=1000,
+        )
+
+
+def reindex_terms():
+    """Rebuilds the term index of every document from its stored text. Returns the number of documents."""
+    count = 0
+    for document in SafetyDocument.objects.only("pk", "text", "text_hash", "text_stamp").iterator():
+        _store_text(document, document.text, document.text_hash, document.text_stamp)
+        count += 1
+    return count
+
+
+def _pending_jobs(limit, force):
+    """([(document, hash, stamp), ...] to extract, number unchanged, number unreadable)."""
+    jobs, unchanged, failed = [], 0, 0
+    documents = SafetyDocument.objects.exclude(file="").only("pk", "file", "text_hash", "text_stamp").order_by("pk")
+    for document in documents:
+        try:
+            stamp = file_stamp(document)
+            if stamp == document.text_stamp and not force:
+                unchanged += 1
+                continue
+            content_hash = file_hash(document)
+        except OSError as e:
+            print(f"Document text: can't read #{document.pk}: {e}")
+            failed += 1
+            continue
+        if content_hash == document.text_hash and not force:
+            # Touched or re-uploaded with the same content
+            _store(document, text_stamp=stamp)
+            unchanged += 1
+            continue
+        jobs.append((document, content_hash, stamp))
+        if limit and len(jobs) >= limit:
+            break
+    return jobs, unchanged, failed
+
+
+def extract_pending(limit=None, force=False):
+    """
+    Extracts the text of every document whose file changed since its last
+    extraction (all of them with force=True). Returns (extracted, unchanged, failed).
+    """
+    jobs, unchanged, failed = _pending_jobs(limit, force)
+    extracted = 0
+    # spawn: never fork a process that holds DB connections (see colors/processing.py)
+    context = multiprocessing.get_context("spawn")
+    running = []
+
+    while jobs or running:
+        while jobs and len(running) < settings.DOCUMENT_TEXT_WORKERS:
+            document, content_hash, stamp = jobs.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=extract_to_pipe, args=(document.file.path, sender), daemon=True)
+            process.start()
+            sender.close()
+            running.append((document, content_hash, stamp, process, receiver, time.monotonic() + EXTRACT_TIMEOUT))
+
+        ready = wait([job[4] for job in running], timeout=1)
+        for job in list(running):
+            document, content_hash, stamp, process, receiver, deadline = job
+            if receiver in ready:
+                try:
+                    status, value = receiver.recv()
+                except EOFError:
+                    # The process died (e.g. out of memory): leave the file pending for the next run
+                    status, value = "crashed", f"exit code {process.exitcode}"
+            elif time.monotonic() > deadline:
+                process.kill()
+                status, value = "error", f"timed out after {EXTRACT_TIMEOUT}s"
+            else:
+                continue
+            running.remove(job)
+            receiver.close()
+            process.join()
+
+            if status == "ok":
+                extracted += 1
+                _store_text(document, value, content_hash, stamp)
+                continue
+            print(f"Document text: extraction failed for #{document.pk}: {value}")
+            failed += 1
+            if status == "error":
+                # Broken, encrypted or pathological PDFs: record the hash so they aren't retried until replaced
+                _store_text(document, "", content_hash, stamp)
+    return extracted, unchanged, failed
+
+
+def matching_documents(query):
+    """
+    Filter for Product querysets: has an active safety document in which every
+    word of `query` starts an indexed term ("zin" finds "zinc").
+    """
+    words = sorted(terms(query), key=len, reverse=True)[:MAX_QUERY_TERMS]
+    if not words:
+        return Q(pk__in=[])
+    documents = SafetyDocument.objects.filter(is_active=True)
+    for word in words:
+        documents = documents.filter(Exists(
+            SafetyDocumentTerm.objects.filter(document_id=OuterRef("pk"), term__startswith=word)
+        ))
+    return Exists(
+        SafetyDocument.products.through.objects.filter(
+            product_id=OuterRef("pk"),
+            safetydocument__in=documents,
+        )
+    )
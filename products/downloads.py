@@ -0,0 +1,133 @@
+"""
+Safety document (SDS/TDS) delivery.
+
+Document URLs point at a Django view (SafetyDocumentStorage.url), never at
+the media files themselves: the view checks the document is published,
+counts the download and answers with an empty response carrying
+X-Accel-Redirect, and nginx sends the file from an internal location
+(see nginx/default.conf), with Range requests, sendfile and all. Python
+never reads the bytes. Without nginx (SAFETY_DOCS_X_ACCEL off) the view
+falls back to FileResponse.
+
+Bulk downloads ("every SDS on this quote") are built as a ZIP that is
+streamed while it is written: zipfile writes into a buffer that is emptied
+after each chunk, so memory stays at one chunk whatever the archive size.
+"""
+import mimetypes
+import os
+import zipfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.deconstruct import deconstructible
+
+# Most documents in one ZIP
+ZIP_MAX_DOCUMENTS = 200
+
+
+@deconstructible
+class SafetyDocumentStorage(FileSystemStorage):
+    """Media storage whose URLs go through the counting download view."""
+
+    def url(self, name):
+        return reverse("safety_document_download", args=[name])
+
+
+def count_downloads(queryset):
+    # A plain UPDATE: no signals, so downloads don't invalidate catalog caches
+    queryset.update(download_count=F("download_count") + 1)
+
+
+def _is_first_request(request):
+    """PDF viewers fetch a file in byte ranges; only the request starting at 0 counts."""
+    range_header = request.headers.get("Range", "")
+    return not range_header or range_header.replace(" ", "").startswith("bytes=0-")
+
+
+def serve(request, document):
+    """Response delivering one document; counts it unless it is a follow-up range request."""
+    if _is_first_request(request):
+        count_downloads(type(document).objects.filter(pk=document.pk))
+
+    filename = os.path.basename(document.file.name)
+    if not settings.SAFETY_DOCS_X_ACCEL:
+        return FileResponse(document.file.open("rb"), filename=filename)
+
+    response = HttpResponse(content_type=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+    response["X-Accel-Redirect"] = settings.MEDIA_URL + quote(document.file.name)
+    response["Content-Disposition"] = f"inline; filename=\"{filename}\"; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+class _ZipBuffer:
+    """Write-only, unseekable file object; zipfile writes into it and the generator empties it."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _archive_names(documents):
+    """Readable, unique file names inside the ZIP: "SDS/Title (English).pdf"."""
+    names, seen = {}, set()
+    for document in documents:
+        extension = os.path.splitext(document.file.name)[1] or ".pdf"
+        title = f"{document.title} ({document.language})" if document.language else document.title
+        # One folder per document type; separators in titles would make more
+        base = f"{document.doc_type}/{title.replace('/', '-').replace(chr(92), '-')}"
+        name = f"{base}{extension}"
+        if name in seen:
+            name = f"{base} #{document.pk}{extension}"
+        seen.add(name)
+        names[document.pk] = name
+    return names
+
+
+def _zip_chunks(documents):
+    buffer = _ZipBuffer()
+    names = _archive_names(documents)
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for document in documents:
+            try:
+                source = document.file.open("rb")
+            except OSError as e:
+                print(f"Safety document ZIP: skipping #{document.pk}: {e}")
+                continue
+            with source:
+                info = zipfile.ZipInfo(names[document.pk], date_time=document.uploaded_at.timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                # Known up front, so zipfile can pick the right (zip64 or not) headers
+                info.file_size = document.file.size
+                with archive.open(info, mode="w") as target:
+                    for chunk in source.chunks():
+                        target.write(chunk)
+                        yield buffer.take()
+            yield buffer.take()
+    yield buffer.take()
+
+
+def zip_response(documents, filename):
+    """Streams the given documents as one ZIP and counts a download for each."""
+    documents = list(documents[:ZIP_MAX_DOCUMENTS])
+    if documents:
+        count_downloads(type(documents[0]).objects.filter(pk__in=[d.pk for d in documents]))
+    response = StreamingHttpResponse(_zip_chunks(documents), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    # Pass the archive through as it is written
+    response["X-Accel-Buffering"] = "no"
+    return response
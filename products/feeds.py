@@ -0,0 +1,167 @@
+"""
+Streaming catalog feed for partners and marketplaces: one row per product
+variant (product x color x size), as CSV, JSON Lines or XML, optionally gzipped.
+
+Nothing is built in memory. Products, product colors and product sizes are
+read as three values-only queries with iterator(), all ordered by product
+id, and merged like a merge join, so only one product's variants exist at a
+time. URLs are built from prefixes computed once per export. Output is
+buffered into ~64 KB chunks and compressed on the fly.
+"""
+import csv
+import io
+import json
+import zlib
+from itertools import groupby
+from operator import itemgetter
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.urls import reverse
+
+from .models import Product
+
+FEED_FIELDS = (
+    "id", "item_group_id", "title", "description", "link", "image_link",
+    "product_type", "color", "color_code", "color_hex", "size",
+)
+
+# Rows fetched per database round trip
+CHUNK_SIZE = 2000
+# Bytes collected before a chunk is yielded (and compressed)
+BUFFER_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+
+
+class _SortedGroups:
+    """Rows sorted by their first column, taken one key at a time in ascending order."""
+
+    def __init__(self, rows):
+        self._groups = groupby(rows, key=itemgetter(0))
+        self._current = next(self._groups, None)
+
+    def take(self, key):
+        while self._current is not None and self._current[0] < key:
+            self._current = next(self._groups, None)
+        if self._current is None or self._current[0] != key:
+            return []
+        rows = list(self._current[1])
+        self._current = next(self._groups, None)
+        return rows
+
+
+def _url_prefixes():
+    site = settings.SITE_URL.rstrip("/")
+    product_prefix, product_suffix = reverse("product_detail", args=["__slug__"]).split("__slug__")
+    media = settings.MEDIA_URL if "://" in settings.MEDIA_URL else site + settings.MEDIA_URL
+    return site + product_prefix, product_suffix, media
+
+
+def feed_rows():
+    """Yields one dict of FEED_FIELDS per active product variant."""
+    product_prefix, product_suffix, media_prefix = _url_prefixes()
+
+    products = Product.objects.filter(is_active=True).order_by("pk").values_list(
+        "pk", "name", "slug", "description", "main_image",
+        "category__name", "subcategory__name", "category__features_colors", "category__features_sizes",
+    ).iterator(chunk_size=CHUNK_SIZE)
+    colors = _SortedGroups(
+        Product.available_colors.through.objects.filter(product__is_active=True, color__is_active=True)
+        .order_by("product_id", "color__name")
+        .values_list("product_id", "color__name", "color__code", "color__hex_code")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    sizes = _SortedGroups(
+        Product.available_sizes.through.objects.filter(product__is_active=True)
+        .order_by("product_id", "size__name")
+        .values_list("product_id", "size__name")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+    for pk, name, slug, description, image, category, subcategory, has_colors, has_sizes in products:
+        product_colors = colors.take(pk) if has_colors else []
+        product_sizes = sizes.take(pk) if has_sizes else []
+        base = {
+            "item_group_id": pk,
+            "description": description,
+            "link": f"{product_prefix}{slug}{product_suffix}",
+            "image_link": f"{media_prefix}{quote(image)}" if image else "",
+            "product_type": f"{category} > {subcategory}" if subcategory else category,
+        }
+        for _, color_name, color_code, color_hex in product_colors or [(None, None, None, None)]:
+            for _, size in product_sizes or [(None, None)]:
+                yield {
+                    "id": f"{pk}-{color_code or 0}-{size or 0}",
+                    "title": " - ".join(filter(None, [name, color_name, size])),
+                    "color": color_name or "",
+                    "color_code": color_code or "",
+                    "color_hex": color_hex or "",
+                    "size": size or "",
+                    **base,
+                }
+
+
+# --- Writers: rows -> str pieces ---
+
+def _csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FEED_FIELDS)
+    for row in rows:
+        writer.writerow([row[field] for field in FEED_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl(rows):
+    for row in rows:
+        yield json.dumps({field: row[field] for field in FEED_FIELDS}, ensure_ascii=False) + "\n"
+
+
+def _xml(rows):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<catalog>\n'
+    for row in rows:
+        fields = "".join(f"<{field}>{escape(str(row[field]))}</{field}>" for field in FEED_FIELDS if row[field] != "")
+        yield f"<item>{fields}</item>\n"
+    yield "</catalog>\n"
+
+
+# format -> (content type, writer)
+FEED_FORMATS = {
+    "csv": ("text/csv", _csv),
+    "jsonl": ("application/x-ndjson", _jsonl),
+    "xml": ("application/xml", _xml),
+}
+
+
+def _buffered(pieces):
+    """Joins str pieces into UTF-8 chunks of about BUFFER_SIZE bytes."""
+    parts, size = [], 0
+    for piece in pieces:
+        data = piece.encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b"".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(fmt, compress=False):
+    """Yields the feed in `fmt` (a FEED_FORMATS key) as bytes chunks."""
+    _, writer = FEED_FORMATS[fmt]
+    chunks = _buffered(writer(feed_rows()))
+    return _gzipped(chunks) if compress else chunks
@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products import feeds
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the product variant feed (product x color x size) as CSV, JSON Lines or XML. "
+        "Streams in constant memory, so it is safe for any catalog size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(feeds.FEED_FORMATS), default="csv")
+        parser.add_argument("--output", default="-", help="File to write ('-' for stdout)")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output")
+
+    def handle(self, *args, **options):
+        try:
+            stream = sys.stdout.buffer if options["output"] == "-" else open(options["output"], "wb")
+        except OSError as e:
+            raise CommandError(str(e))
+
+        written = 0
+        try:
+            for chunk in feeds.export(options["format"], compress=options["gzip"]):
+                stream.write(chunk)
+                written += len(chunk)
+        finally:
+            if stream is not sys.stdout.buffer:
+                stream.close()
+            else:
+                stream.flush()
+
+        if options["output"] != "-":
+            self.stderr.write(f"Wrote {written} bytes to {options['output']}")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from products.document_text import extract_pending, reindex_terms
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract searchable text from safety document PDFs in worker processes. Documents whose "
+        "file hasn't changed since the last run are skipped, so it is cheap to run from cron, "
+        "e.g. every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Most documents to extract in one run")
+        parser.add_argument("--force", action="store_true", help="Re-extract unchanged documents too")
+        parser.add_argument(
+            "--reindex", action="store_true", help="Only rebuild the search terms from the stored text (no PDF parsing)"
+        )
+
+    def handle(self, *args, **options):
+        if options["reindex"]:
+            count = reindex_terms()
+            self.stdout.write(self.style.SUCCESS(f"Reindexed the search terms of {count} documents."))
+            return
+        extracted, unchanged, failed = extract_pending(limit=options["limit"], force=options["force"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Extracted {extracted} documents ({unchanged} unchanged, {failed} failed)."
+        ))
@@ -4,6 +4,9 @@ from django.urls import reverse
 from django.conf import settings
 
 from colors.models import Color
+from home import counters
+from home.slugs import save_with_unique_slug
+from .downloads import SafetyDocumentStorage
 
 
 class Category(models.Model):
@@ -81,6 +84,9 @@ class Size(models.Model):
 class SafetyDocument(models.Model):
     """Represents a safety, technical, or compliance document."""
 
+    # Written only by products/document_text.py
+    TEXT_FIELDS = ("text", "text_hash", "text_stamp")
+
     SAFETY_DOC_TYPES = [
         ("SDS", "Safety Data Sheet (SDS)"),
         ("TDS", "Technical Data Sheet (TDS)"),
@@ -91,12 +97,19 @@ class SafetyDocument(models.Model):
 
     doc_type = models.CharField(max_length=20, choices=SAFETY_DOC_TYPES)
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to="products/safety_docs/")
+    # Served through the counting download view (see products/downloads.py)
+    file = models.FileField(upload_to="products/safety_docs/", storage=SafetyDocumentStorage())
     language = models.CharField(max_length=50, blank=True, null=True, help_text="e.g. English, French")
     version = models.CharField(max_length=50, blank=True, null=True, help_text="Document version code")
     effective_date = models.DateField(blank=True, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    download_count = models.PositiveIntegerField(default=0, editable=False, help_text="Times downloaded")
+
+    # Searchable text, written by the extract_document_text command (see products/document_text.py)
+    text = models.TextField(blank=True, editable=False)
+    text_hash = models.CharField(max_length=64, blank=True, editable=False, help_text="SHA-256 of the file the text came from")
+    text_stamp = models.CharField(max_length=400, blank=True, editable=False, help_text="File name, size and mtime when last checked")
 
     products = models.ManyToManyField(
         "Product",
@@ -113,6 +126,34 @@ class SafetyDocument(models.Model):
     def __str__(self):
         return f"{self.title} ({self.get_doc_type_display()})"
 
+    def save(self, *args, **kwargs):
+        full_update = not self._state.adding and kwargs.get("update_fields") is None
+        counters.exclude_counters(self, kwargs)
+        if full_update:
+            # Like the counters, the extracted text is only written by its own UPDATE
+            kwargs["update_fields"] = [f for f in kwargs["update_fields"] if f not in self.TEXT_FIELDS]
+        super().save(*args, **kwargs)
+
+
+class SafetyDocumentTerm(models.Model):
+    """
+    One distinct word of a safety document's extracted text. Written together
+    with SafetyDocument.text by products/document_text.py, so product searches
+    find documents through the term index instead of scanning every text.
+    """
+    document = models.ForeignKey(SafetyDocument, on_delete=models.CASCADE, related_name="terms")
+    term = models.CharField(max_length=40, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["document", "term"], name="unique_safety_document_term"),
+        ]
+        verbose_name = "Safety Document Term"
+        verbose_name_plural = "Safety Document Terms"
+
+    def __str__(self):
+        return f"{self.document_id}: {self.term}"
+
 
 class Product(models.Model):
     """Product model for all items."""
@@ -156,24 +197,26 @@ class Product(models.Model):
     )
 
     is_active = models.BooleanField(default=True)
+    save_count = models.PositiveIntegerField(default=0, editable=False, help_text="Times saved by users")
+    view_count = models.PositiveIntegerField(default=0, editable=False, help_text="Detail page views")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # "Most popular" sort
+            models.Index(fields=["is_active", "-save_count"], name="product_active_popular_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
+        counters.exclude_counters(self, kwargs)
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug[:160]
+            save_with_unique_slug(self, self.name, super().save, *args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -188,7 +231,7 @@ class SavedProducts(models.Model):
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="saved_products"
     )
-    saved_at = models.DateTimeField(auto_now_add=True)
+    saved_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = ("user", "product")
@@ -0,0 +1,39 @@
+"""
+Text extraction from SDS/TDS PDFs.
+
+Runs inside the extraction pool (see document_text.py), so this module must
+only depend on pypdf - never on Django or the database.
+"""
+import re
+
+import pypdf
+
+# Longest text kept per document (SDS are a few pages; this stops runaway brochures)
+MAX_TEXT_CHARS = 200_000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def extract_text(path):
+    """The text of the PDF at `path`, with whitespace collapsed. Non-PDF files give ""."""
+    if not path.lower().endswith(".pdf"):
+        return ""
+    reader = pypdf.PdfReader(path)
+    parts, size = [], 0
+    for page in reader.pages:
+        text = _WHITESPACE.sub(" ", page.extract_text() or "").strip()
+        parts.append(text)
+        size += len(text) + 1
+        if size >= MAX_TEXT_CHARS:
+            break
+    return " ".join(parts)[:MAX_TEXT_CHARS]
+
+
+def extract_to_pipe(path, conn):
+    """Process target: sends ("ok", text) or ("error", message) through `conn`."""
+    try:
+        conn.send(("ok", extract_text(path)))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
@@ -1,3 +1,246 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import zipfile
+from io import StringIO
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from colors.models import Color
+from . import document_text, downloads, feeds, pdf_text
+from .models import Category, Product, SafetyDocument, Size
+
+
+class CatalogFeedTests(TestCase):
+    def setUp(self):
+        paints = Category.objects.create(name="Paints")
+        tools = Category.objects.create(name="Tools", features_colors=False, features_sizes=False)
+        self.paint = Product.objects.create(name="Silk Emulsion", description="Interior & <wipeable>", category=paints)
+        self.paint.available_colors.add(
+            Color.objects.create(name="Fern", code="FD-1", hex_code="#4F7942"),
+            Color.objects.create(name="Sky", code="SK-1", hex_code="#87CEEB"),
+        )
+        self.paint.available_sizes.add(Size.objects.create(name="1L"), Size.objects.create(name="5L"))
+        self.brush = Product.objects.create(name="Brush", description="2 inch", category=tools)
+        Product.objects.create(name="Retired", description="-", category=paints, is_active=False)
+
+    def test_one_row_per_variant(self):
+        rows = list(feeds.feed_rows())
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [f"{self.paint.pk}-FD-1-1L", f"{self.paint.pk}-FD-1-5L", f"{self.paint.pk}-SK-1-1L",
+             f"{self.paint.pk}-SK-1-5L", f"{self.brush.pk}-0-0"],
+        )
+        self.assertEqual(rows[0]["title"], "Silk Emulsion - Fern - 1L")
+        self.assertEqual(rows[0]["link"], "https://extrapaints.co.ke" + self.paint.get_absolute_url())
+        self.assertEqual(rows[-1]["product_type"], "Tools")
+
+    def test_formats(self):
+        with mock.patch.object(feeds, "BUFFER_SIZE", 100):
+            chunks = list(feeds.export("csv"))
+        self.assertGreater(len(chunks), 1)
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["color_hex"], "#4F7942")
+
+        lines = b"".join(feeds.export("jsonl")).decode().splitlines()
+        self.assertEqual(json.loads(lines[-1])["title"], "Brush")
+
+        catalog = ElementTree.fromstring(b"".join(feeds.export("xml")))
+        self.assertEqual(catalog.find("item/description").text, "Interior & <wipeable>")
+        self.assertIsNone(catalog.findall("item")[-1].find("color"))
+
+    def test_gzip(self):
+        compressed = b"".join(feeds.export("jsonl", compress=True))
+        self.assertEqual(gzip.decompress(compressed), b"".join(feeds.export("jsonl")))
+
+    @override_settings(CATALOG_FEED_TOKEN="s3cret")
+    def test_view_requires_staff_or_the_token(self):
+        url = reverse("catalog_feed", kwargs={"fmt": "csv"})
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, {"token": "wrong"}).status_code, 403)
+        response = self.client.get(url + ".gz", {"token": "s3cret"})
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn(b"Silk Emulsion", gzip.decompress(b"".join(response.streaming_content)))
+
+    def test_no_token_configured_means_staff_only(self):
+        url = reverse("catalog_feed", kwargs={"fmt": "xml"})
+        self.assertEqual(self.client.get(url, {"token": ""}).status_code, 403)
+
+
+class SafetyDocumentTestCase(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        self.product = Product.objects.create(
+            name="Silk Emulsion", description="Interior", category=Category.objects.create(name="Paints")
+        )
+
+    def document(self, title, doc_type="SDS", content=b"%PDF-1.4 sds", **fields):
+        document = SafetyDocument.objects.create(
+            doc_type=doc_type, title=title, file=SimpleUploadedFile(f"{title}.pdf", content), **fields
+        )
+        document.products.add(self.product)
+        return document
+
+    def download_count(self, document):
+        return SafetyDocument.objects.values_list("download_count", flat=True).get(pk=document.pk)
+
+
+class SafetyDocumentDownloadTests(SafetyDocumentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sds = self.document("Silk SDS")
+
+    def test_url_goes_through_the_view(self):
+        self.assertEqual(self.sds.file.url, reverse("safety_document_download", args=[self.sds.file.name]))
+
+    def test_only_the_first_range_request_counts(self):
+        url = self.sds.file.url
+        response = self.client.get(url)
+        self.assertEqual(response["X-Accel-Redirect"], "/media/" + self.sds.file.name)
+        self.client.get(url, headers={"range": "bytes=0-65535"})
+        self.client.get(url, headers={"range": "bytes=65536-131071"})
+        self.assertEqual(self.download_count(self.sds), 2)
+
+    def test_unpublished_documents_are_staff_only(self):
+        SafetyDocument.objects.filter(pk=self.sds.pk).update(is_active=False)
+        self.assertEqual(self.client.get(self.sds.file.url).status_code, 404)
+        self.client.force_login(User.objects.create_user("ops", password="pw", is_staff=True))
+        self.assertEqual(self.client.get(self.sds.file.url).status_code, 200)
+
+    @override_settings(SAFETY_DOCS_X_ACCEL=False)
+    def test_file_response_without_nginx(self):
+        response = self.client.get(self.sds.file.url)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 sds")
+
+
+class SafetyDocumentZipTests(SafetyDocumentTestCase):
+    def read_zip(self, response):
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_archive_names_are_unique(self):
+        first = self.document("Silk / Matt", language="English")
+        second = self.document("Silk / Matt", language="English")
+        names = downloads._archive_names([first, second])
+        self.assertEqual(names[first.pk], "SDS/Silk - Matt (English).pdf")
+        self.assertEqual(names[second.pk], f"SDS/Silk - Matt (English) #{second.pk}.pdf")
+
+    def test_zip_streams_every_document_and_counts_them(self):
+        documents = [self.document("Silk SDS", content=b"a" * 200000), self.document("Silk TDS", doc_type="TDS")]
+        archive = self.read_zip(downloads.zip_response(SafetyDocument.objects.order_by("pk"), "docs.zip"))
+        self.assertEqual(archive.read("SDS/Silk SDS.pdf"), b"a" * 200000)
+        self.assertEqual(archive.namelist(), ["SDS/Silk SDS.pdf", "TDS/Silk TDS.pdf"])
+        self.assertEqual([self.download_count(d) for d in documents], [1, 1])
+
+    def test_quote_documents(self):
+        self.document("Silk SDS")
+        self.document("Silk TDS", doc_type="TDS")
+        url = reverse("quote_documents")
+        self.assertRedirects(self.client.get(url), reverse("quote_detail"), fetch_redirect_response=False)
+
+        self.client.post(reverse("quote_add"), {"product_id": self.product.pk})
+        self.assertEqual(self.read_zip(self.client.get(url)).namelist(), ["SDS/Silk SDS.pdf"])
+        self.assertEqual(len(self.read_zip(self.client.get(url, {"type": "all"})).namelist()), 2)
+
+
+def pdf_bytes(text):
+    """A one-page PDF showing `text`."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class DocumentTextTests(SafetyDocumentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sds = self.document("Silk SDS", content=pdf_bytes("Low VOC   zinc-free formula"))
+
+    def text(self, document):
+        return SafetyDocument.objects.values_list("text", flat=True).get(pk=document.pk)
+
+    def test_extract_text(self):
+        self.assertEqual(pdf_text.extract_text(self.sds.file.path), "Low VOC zinc-free formula")
+        self.assertEqual(pdf_text.extract_text(self.sds.file.path.replace(".pdf", ".txt")), "")
+
+    def test_only_changed_files_are_extracted(self):
+        self.assertEqual(document_text.extract_pending(), (1, 0, 0))
+        self.assertEqual(self.text(self.sds), "Low VOC zinc-free formula")
+        self.assertEqual(document_text.extract_pending(), (0, 1, 0))
+
+        # Touched but identical: re-hashed, not parsed
+        os.utime(self.sds.file.path, (1, 1))
+        self.assertEqual(document_text.extract_pending(), (0, 1, 0))
+        stamp = SafetyDocument.objects.values_list("text_stamp", flat=True).get(pk=self.sds.pk)
+        self.assertEqual(stamp, document_text.file_stamp(self.sds))
+
+        with open(self.sds.file.path, "wb") as f:
+            f.write(pdf_bytes("Water based acrylic"))
+        self.assertEqual(document_text.extract_pending(), (1, 0, 0))
+        self.assertEqual(self.text(self.sds), "Water based acrylic")
+
+    def test_broken_and_missing_files(self):
+        broken = self.document("Broken", content=b"%PDF-1.4 not really")
+        missing = self.document("Missing")
+        os.remove(missing.file.path)
+        self.assertEqual(document_text.extract_pending(), (1, 0, 2))
+        # The broken file is recorded and not retried until it changes
+        self.assertEqual(document_text.extract_pending(), (0, 2, 1))
+        self.assertEqual(self.text(broken), "")
+
+    def test_slow_extractions_are_killed(self):
+        # The worker never answers in time
+        with mock.patch.object(document_text, "EXTRACT_TIMEOUT", 0), \
+                mock.patch.object(document_text, "wait", return_value=[]):
+            self.assertEqual(document_text.extract_pending(), (0, 0, 1))
+        self.assertEqual(document_text.extract_pending(), (0, 1, 0))
+        self.assertEqual(document_text.extract_pending(force=True), (1, 0, 0))
+
+    def test_admin_saves_keep_the_text(self):
+        document_text.extract_pending()
+        document = SafetyDocument.objects.get(pk=self.sds.pk)
+        document.text = ""
+        document.title = "Silk Emulsion SDS"
+        document.save()
+        self.assertEqual(self.text(self.sds), "Low VOC zinc-free formula")
+
+    def test_product_search_matches_document_text(self):
+        document_text.extract_pending()
+        found = Product.objects.filter(document_text.matching_documents("zinc-free"))
+        self.assertEqual(list(found), [self.product])
+        self.assertEqual(
+            set(self.sds.terms.values_list("term", flat=True)), {"low", "voc", "zinc", "free", "formula"}
+        )
+        self.assertTrue(Product.objects.filter(document_text.matching_documents("LOW zin")).exists())
+        self.assertFalse(Product.objects.filter(document_text.matching_documents("low lead")).exists())
+        self.assertFalse(Product.objects.filter(document_text.matching_documents("-")).exists())
+        SafetyDocument.objects.filter(pk=self.sds.pk).update(is_active=False)
+        self.assertFalse(Product.objects.filter(document_text.matching_documents("zinc-free")).exists())
+
+    def test_reindex_rebuilds_terms_from_stored_text(self):
+        SafetyDocument.objects.filter(pk=self.sds.pk).update(text="Drying time 2 hours")
+        call_command("extract_document_text", "--reindex", stdout=StringIO())
+        self.assertEqual(set(self.sds.terms.values_list("term", flat=True)), {"drying", "time", "hours"})
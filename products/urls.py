@@ -1,9 +1,11 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 urlpatterns = [
     path('', views.product_list, name='product_list'),
     path('save-toggle/', views.save_product_toggle, name='save_product_toggle'),  # move this above
+    re_path(r'^feed\.(?P<fmt>csv|jsonl|xml)(?P<gz>\.gz)?$', views.catalog_feed, name='catalog_feed'),
+    path('documents/<path:name>', views.safety_document_download, name='safety_document_download'),
     path('<slug:slug>/', views.product_detail, name='product_detail'),
 ]
 
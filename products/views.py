@@ -1,9 +1,13 @@
 import json
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q, Exists, OuterRef, Value, BooleanField
-from .models import Product, Category, SubCategory, SavedProducts
-from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.db.models import Q, Exists, OuterRef
+from django.db import transaction
+from home import bookmarks, reference_data, view_tracking
+from . import document_text, downloads, feeds
+from .models import Product, SubCategory, SavedProducts, SafetyDocument
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.http import require_POST
 
 
@@ -15,6 +19,7 @@ def product_list(request):
     query = request.GET.get("q")
     category_slug = request.GET.get("category")
     subcategory_slug = request.GET.get("subcategory")
+    sort = request.GET.get("sort", "newest")
 
     products = Product.objects.filter(is_active=True).select_related("category", "subcategory")
 
@@ -25,7 +30,15 @@ def product_list(request):
         products = products.filter(subcategory__slug=subcategory_slug)
 
     if query:
-        products = products.filter(Q(name__icontains=query) | Q(description__icontains=query))
+        products = products.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+            # Text inside the product's SDS/TDS PDFs
+            | document_text.matching_documents(query)
+        )
+
+    # --- Sort (default keeps the model ordering) ---
+    if sort == "popular":
+        products = products.order_by("-save_count", "name")
 
     # --- Add 'is_saved' status ---
     if request.user.is_authenticated:
@@ -35,7 +48,7 @@ def product_list(request):
         )
         products = products.annotate(is_saved=Exists(saved_subquery))
     else:
-        products = products.annotate(is_saved=Value(False, output_field=BooleanField()))
+        products = products.annotate(is_saved=bookmarks.session_saved_annotation(request.session, 'product'))
 
     # --- AJAX JSON HANDLING ---
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -58,8 +71,8 @@ def product_list(request):
         return JsonResponse({'products': products_data})
 
     # --- STANDARD FULL PAGE RENDER ---
-    # Fetch categories for the sidebar only on full page load
-    categories = Category.objects.prefetch_related('subcategories').all()
+    # Fetch categories for the sidebar only on full page load (cached per process)
+    categories = reference_data.product_categories.all()
 
     context = {
         "products": products,
@@ -67,6 +80,7 @@ def product_list(request):
         "selected_category": category_slug,
         "selected_subcategory": subcategory_slug,
         "query": query or "",
+        "sort": sort,
     }
     return render(request, "products/product_list.html", context)
 
@@ -83,10 +97,13 @@ def product_detail(request, slug):
         is_active=True
     )
 
+    view_tracking.record(product)
+
     # --- Check save status ---
-    is_saved = False
     if request.user.is_authenticated:
         is_saved = SavedProducts.objects.filter(user=request.user, product=product).exists()
+    else:
+        is_saved = product.id in bookmarks.session_ids(request.session, 'product')
 
     # --- Feature Flags from Main Category ---
     show_colors = product.category.features_colors
@@ -122,11 +139,11 @@ def product_detail(request, slug):
     return render(request, "products/product_detail.html", context)
 
 
-@login_required
 @require_POST
 def save_product_toggle(request):
     """
-    AJAX view to save or unsave a product for a user.
+    AJAX view to save or unsave a product. Anonymous visitors' saves are
+    kept in their session until they log in (see home/bookmarks.py).
     """
     product_id = request.POST.get('product_id')
     if not product_id:
@@ -137,15 +154,58 @@ def save_product_toggle(request):
     except Product.DoesNotExist:
         return JsonResponse({'status': 'error', 'message': 'Product not found.'}, status=404)
 
-    saved_obj, created = SavedProducts.objects.get_or_create(
-        user=request.user,
-        product=product
-    )
+    if not request.user.is_authenticated:
+        is_saved = bookmarks.toggle_in_session(request.session, 'product', product.id)
+        return JsonResponse({'status': 'success', 'is_saved': is_saved})
 
-    if created:
-        is_saved = True
-    else:
-        saved_obj.delete()
-        is_saved = False
+    with transaction.atomic():
+        saved_obj, created = SavedProducts.objects.get_or_create(
+            user=request.user,
+            product=product
+        )
+
+        if created:
+            bookmarks.adjust_counts(request.user, 'product', product.id, 1)
+            is_saved = True
+        else:
+            # Only the request that actually deleted the row decrements the counter
+            deleted, _ = SavedProducts.objects.filter(pk=saved_obj.pk).delete()
+            if deleted:
+                bookmarks.adjust_counts(request.user, 'product', product.id, -1)
+            is_saved = False
+
+    return JsonResponse({'status': 'success', 'is_saved': is_saved})
 
-    return JsonResponse({'status': 'success', 'is_saved': is_saved})
\ No newline at end of file
+
+def catalog_feed(request, fmt, gz=None):
+    """
+    Streams the product variant feed (see products/feeds.py) as
+    feed.csv, feed.jsonl or feed.xml, gzipped when the path ends in .gz.
+    Open to staff, or to partners holding CATALOG_FEED_TOKEN.
+    """
+    token = request.GET.get('token', '')
+    has_token = bool(settings.CATALOG_FEED_TOKEN) and constant_time_compare(token, settings.CATALOG_FEED_TOKEN)
+    if not (request.user.is_staff or has_token):
+        return JsonResponse({'status': 'error', 'message': 'Not allowed.'}, status=403)
+
+    content_type, _ = feeds.FEED_FORMATS[fmt]
+    filename = f"catalog.{fmt}"
+    if gz:
+        content_type, filename = 'application/gzip', filename + '.gz'
+
+    response = StreamingHttpResponse(feeds.export(fmt, compress=bool(gz)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Let nginx pass chunks through as they are produced
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def safety_document_download(request, name):
+    """
+    Counts a download of a published safety document and hands the file to
+    nginx (X-Accel-Redirect). Staff can also fetch unpublished ones.
+    """
+    document = SafetyDocument.objects.filter(file=name).first()
+    if document is None or not (document.is_active or request.user.is_staff):
+        raise Http404("Document not found")
+    return downloads.serve(request, document)
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+from django.contrib import admin, messages
+from django.db.models import Count, Max, Sum
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .models import QuoteRequest, QuoteLineItem
+from .notifications import send_quote_email
+
+# Period choices (days) for the report page
+REPORT_PERIODS = (7, 30, 90, 365)
+REPORT_TOP = 20
+
+
+# --- Status Actions ---
+def _set_status(status):
+    @admin.action(description=f"Mark selected as {status.label}")
+    def action(modeladmin, request, queryset):
+        updated = queryset.update(status=status, updated_at=timezone.now())
+        messages.success(request, f"{updated} quote request(s) marked as {status.label}.")
+    action.__name__ = f"mark_{status.value}"
+    return action
+
+
+@admin.action(description="Resend sales-team email")
+def resend_email(modeladmin, request, queryset):
+    sent = sum(send_quote_email(quote, resend=True) for quote in queryset)
+    messages.info(request, f"{sent} of {len(queryset)} email(s) sent.")
+
+
+# --- Quote Line Item Inline ---
+class QuoteLineItemInline(admin.TabularInline):
+    model = QuoteLineItem
+    extra = 0
+    fields = ("product_name", "color_name", "color_code", "size_name", "quantity", "product", "color", "size")
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+# --- Quote Request Admin ---
+@admin.register(QuoteRequest)
+class QuoteRequestAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "email", "phone", "status", "email_status", "item_count", "created_at")
+    list_filter = ("status", "email_status", "created_at")
+    search_fields = ("name", "email", "phone", "message", "items__product_name", "items__color_code")
+    date_hierarchy = "created_at"
+    ordering = ("-created_at",)
+    readonly_fields = ("user", "email_status", "email_attempts", "emailed_at", "last_error", "created_at", "updated_at")
+    inlines = [QuoteLineItemInline]
+    actions = [
+        _set_status(QuoteRequest.Status.IN_PROGRESS),
+        _set_status(QuoteRequest.Status.QUOTED),
+        _set_status(QuoteRequest.Status.CLOSED),
+        resend_email,
+    ]
+    list_per_page = 50
+
+    fieldsets = (
+        ("Customer", {"fields": ("name", "email", "phone", "user", "message")}),
+        ("Status", {"fields": ("status",)}),
+        ("Email Delivery", {"fields": ("email_status", "email_attempts", "emailed_at", "last_error")}),
+        ("Timestamps", {"fields": ("created_at", "updated_at")}),
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(item_count=Count("items"))
+
+    @admin.display(description="Items", ordering="item_count")
+    def item_count(self, obj):
+        return obj.item_count
+
+    def get_urls(self):
+        return [
+            path("report/", self.admin_site.admin_view(self.report_view), name="quote_request_report"),
+        ] + super().get_urls()
+
+    def report_view(self, request):
+        """Top requested products, colors and sizes for a period (aggregate queries on QuoteLineItem)."""
+        try:
+            days = int(request.GET.get("days", 30))
+        except ValueError:
+            days = 30
+        if days not in REPORT_PERIODS:
+            days = 30
+        since = timezone.now() - timedelta(days=days)
+
+        lines = QuoteLineItem.objects.filter(created_at__gte=since)
+
+        def top(field, **names):
+            return (
+                lines.filter(**{f"{field}__isnull": False})
+                .values(field)
+                .annotate(
+                    **{alias: Max(name_field) for alias, name_field in names.items()},
+                    quantity=Sum("quantity"),
+                    quotes=Count("quote", distinct=True),
+                )
+                .order_by("-quantity")[:REPORT_TOP]
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Quote Request Report",
+            "days": days,
+            "periods": REPORT_PERIODS,
+            "since": since,
+            "totals": {
+                "quotes": QuoteRequest.objects.filter(created_at__gte=since).count(),
+                **lines.aggregate(lines=Count("id"), quantity=Sum("quantity")),
+            },
+            "status_counts": (
+                QuoteRequest.objects.filter(created_at__gte=since)
+                .values("status").annotate(count=Count("id")).order_by("status")
+            ),
+            "top_products": top("product", name="product_name"),
+            "top_colors": top("color", name="color_name", code="color_code"),
+            "top_sizes": top("size", name="size_name"),
+        }
+        return TemplateResponse(request, "admin/quote_request/report.html", context)
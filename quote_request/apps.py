@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class QuoteRequestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quote_request'
+
+    def ready(self):
+        # The quote list built before logging in is merged with the account's saved one,
+        # which is written back on logout
+        from django.contrib.auth.signals import user_logged_in, user_logged_out
+        from .quote import merge_saved_quote_list, save_quote_list
+        user_logged_in.connect(merge_saved_quote_list, dispatch_uid="quote_request.merge_saved_quote_list")
+        user_logged_out.connect(save_quote_list, dispatch_uid="quote_request.save_quote_list")
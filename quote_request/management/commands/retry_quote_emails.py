@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from quote_request.notifications import MAX_EMAIL_ATTEMPTS, pending_quotes, send_quote_email
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the sales-team email for quote requests that were saved but never emailed "
+        f"(gives up after {MAX_EMAIL_ATTEMPTS} attempts). Run it from cron every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=100, help="Most quotes to process in one run")
+
+    def handle(self, *args, **options):
+        sent = failed = 0
+        for quote in pending_quotes()[:options["limit"]]:
+            if send_quote_email(quote):
+                sent += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} quote emails, {failed} failed."))
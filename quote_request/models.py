@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.db import models, transaction
+
+
+class QuoteRequest(models.Model):
+    """
+    A submitted quote request. Saved before any email is sent, so a mail
+    outage never loses a request (see quote_request/notifications.py).
+    `status` is the sales workflow; `email_status` tracks the sales-team
+    email on its own, so sending or resending never touches the workflow.
+    """
+    class Status(models.TextChoices):
+        NEW = "new", "New"
+        IN_PROGRESS = "in_progress", "In Progress"
+        QUOTED = "quoted", "Quoted"
+        CLOSED = "closed", "Closed"
+
+    class EmailStatus(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENDING = "sending", "Sending"
+        FAILED = "failed", "Failed"
+        SENT = "sent", "Sent to Sales"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="quote_requests"
+    )
+    name = models.CharField(max_length=255)
+    email = models.EmailField()
+    phone = models.CharField(max_length=50, blank=True)
+    message = models.TextField(blank=True)
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.NEW)
+    email_status = models.CharField(max_length=20, choices=EmailStatus.choices, default=EmailStatus.PENDING)
+    email_attempts = models.PositiveSmallIntegerField(default=0)
+    emailed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="quote_status_created_idx"),
+            models.Index(fields=["email_status", "created_at"], name="quote_email_status_created_idx"),
+        ]
+        verbose_name = "Quote Request"
+        verbose_name_plural = "Quote Requests"
+
+    def __str__(self):
+        return f"Quote #{self.pk} from {self.name}"
+
+    @classmethod
+    def create_from_list(cls, quote_list, user=None, **contact):
+        """
+        Saves the session quote list as a QuoteRequest plus its line items in
+        one transaction (one bulk INSERT for the lines). Products, colors and
+        sizes are loaded with one in_bulk query each; lines whose product is
+        gone are dropped. Returns the saved quote.
+        """
+        from products.models import Product, Size
+        from colors.models import Color
+
+        lines = list(quote_list.quote_list.values())
+        products = Product.objects.in_bulk({line['product_id'] for line in lines})
+        colors = Color.objects.in_bulk({line['color_id'] for line in lines if line['color_id'] is not None})
+        sizes = Size.objects.in_bulk({line['size_id'] for line in lines if line['size_id'] is not None})
+
+        with transaction.atomic():
+            quote = cls.objects.create(user=user if user and user.is_authenticated else None, **contact)
+            items = []
+            for line in lines:
+                product = products.get(line['product_id'])
+                if product is None:
+                    continue
+                color = colors.get(line['color_id'])
+                size = sizes.get(line['size_id'])
+                items.append(QuoteLineItem(
+                    quote=quote,
+                    product=product,
+                    color=color,
+                    size=size,
+                    product_name=product.name,
+                    color_name=color.name if color else "",
+                    color_code=color.code if color else "",
+                    size_name=size.name if size else "",
+                    quantity=line['quantity'],
+                    created_at=quote.created_at,
+                ))
+            QuoteLineItem.objects.bulk_create(items)
+        return quote
+
+
+class QuoteLineItem(models.Model):
+    """
+    One line of a quote request. Names are copied at submission time so the
+    ledger still reads correctly after products or colors are renamed or deleted.
+    created_at is copied from the quote so period reports stay on one indexed table.
+    """
+    quote = models.ForeignKey(QuoteRequest, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey("products.Product", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    color = models.ForeignKey("colors.Color", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    size = models.ForeignKey("products.Size", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
+    product_name = models.CharField(max_length=255)
+    color_name = models.CharField(max_length=100, blank=True)
+    color_code = models.CharField(max_length=50, blank=True)
+    size_name = models.CharField(max_length=50, blank=True)
+    quantity = models.PositiveIntegerField(default=1)
+
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["created_at", "product"], name="quoteline_created_product_idx"),
+            models.Index(fields=["created_at", "color"], name="quoteline_created_color_idx"),
+            models.Index(fields=["created_at", "size"], name="quoteline_created_size_idx"),
+        ]
+        verbose_name = "Quote Line Item"
+        verbose_name_plural = "Quote Line Items"
+
+    def __str__(self):
+        details = ", ".join(filter(None, [self.color_name, self.size_name]))
+        return f"{self.product_name}{f' ({details})' if details else ''} x {self.quantity}"
+
+
+class SavedQuoteList(models.Model):
+    """
+    A signed-in user's quote list (same format as the session one). Written
+    on logout and merged into the session on login, so the list survives
+    logging out and follows the user to other devices. Changes in a session
+    that expires without a logout are not kept.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="saved_quote_list")
+    items = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Saved Quote List"
+        verbose_name_plural = "Saved Quote Lists"
+
+    def __str__(self):
+        return f"Quote list of {self.user}"
@@ -0,0 +1,137 @@
+"""
+Sales-team email for submitted quote requests.
+
+Sending is separate from saving: the quote is already in the database when
+we try SMTP, and a failure only marks its email_status FAILED so the
+retry_quote_emails command can pick it up later. The submit view hands the
+send to a background thread (send_in_background), so the customer never
+waits on SMTP.
+
+Every send first claims the quote with a conditional UPDATE to SENDING; a
+sender that loses the race skips the quote, so the request's thread and the
+cron retry can never email the same quote twice. The retry leaves PENDING
+quotes alone for SEND_GRACE (their first send is still under way) and reclaims
+SENDING quotes only after SENDING_TIMEOUT (their sender died). Only
+email_status changes here; the sales workflow status is left alone.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import QuoteRequest
+
+# Quotes are not retried after this many failed sends
+MAX_EMAIL_ATTEMPTS = 5
+
+# The retry ignores PENDING quotes younger than this (the submit's own send is running)
+SEND_GRACE = timedelta(minutes=5)
+
+# A quote stuck in SENDING this long lost its sender (e.g. a killed worker) and may be claimed again
+SENDING_TIMEOUT = timedelta(minutes=15)
+
+
+def quote_summary(quote):
+    """Plain-text body for the sales team, built from the saved line items."""
+    items_summary = ""
+    for item in quote.items.all():
+        items_summary += f"- {item}\n"
+
+    return (
+        f"New Quote Request #{quote.pk} from: {quote.name} ({quote.email}, {quote.phone})\n\n"
+        f"Message: {quote.message}\n\n"
+        " ITEMS REQUESTED ------------------------------\n"
+        f" {items_summary}"
+    )
+
+
+def claim(quote, resend=False):
+    """
+    Marks the quote SENDING and counts the attempt, unless another sender has
+    it or it was already emailed (resend=True takes any quote not being sent).
+    Returns True if this caller may send it.
+    """
+    now = timezone.now()
+    if resend:
+        claimable = ~Q(email_status=QuoteRequest.EmailStatus.SENDING)
+    else:
+        claimable = Q(email_status__in=[QuoteRequest.EmailStatus.PENDING, QuoteRequest.EmailStatus.FAILED])
+    claimable |= Q(email_status=QuoteRequest.EmailStatus.SENDING, updated_at__lt=now - SENDING_TIMEOUT)
+    return bool(QuoteRequest.objects.filter(claimable, pk=quote.pk).update(
+        email_status=QuoteRequest.EmailStatus.SENDING,
+        email_attempts=F("email_attempts") + 1,
+        updated_at=now,
+    ))
+
+
+def _record(quote, **fields):
+    QuoteRequest.objects.filter(pk=quote.pk).update(updated_at=timezone.now(), **fields)
+    for name, value in fields.items():
+        setattr(quote, name, value)
+
+
+def send_quote_email(quote, resend=False):
+    """
+    Emails a saved quote to the sales team and records the outcome on it.
+    Returns True if the email went out; False if it failed or another sender
+    had already claimed the quote.
+    """
+    if not claim(quote, resend=resend):
+        return False
+
+    subject = f'New Quote Request #{quote.pk}'
+    body = quote_summary(quote)
+    html_content = render_to_string('quote_request/simple_branded_email.html', {
+        'subject': subject,
+        'content': body,
+        'site_name': 'ExtraPaints',
+    })
+
+    try:
+        msg = EmailMultiAlternatives(
+            subject,
+            body,
+            settings.DEFAULT_FROM_EMAIL,
+            [settings.SALES_TEAM_EMAIL],
+            reply_to=[quote.email],
+        )
+        msg.attach_alternative(html_content, "text/html")
+        msg.send(fail_silently=False)
+    except Exception as e:
+        print(f"Quote request email error (quote #{quote.pk}): {e}")
+        _record(quote, email_status=QuoteRequest.EmailStatus.FAILED, last_error=str(e))
+        return False
+
+    _record(quote, email_status=QuoteRequest.EmailStatus.SENT, emailed_at=timezone.now(), last_error="")
+    return True
+
+
+def _send_and_close(quote):
+    try:
+        send_quote_email(quote)
+    except Exception as e:
+        # Left PENDING or SENDING, so the retry command picks it up
+        print(f"Quote request email thread error (quote #{quote.pk}): {e}")
+    finally:
+        connection.close()
+
+
+def send_in_background(quote):
+    """Sends the quote's email from a daemon thread, after the response has been returned."""
+    threading.Thread(target=_send_and_close, args=(quote,), name=f"quote-email-{quote.pk}", daemon=True).start()
+
+
+def pending_quotes():
+    """Quotes whose email never went out, that still have attempts left and that no sender holds."""
+    now = timezone.now()
+    return QuoteRequest.objects.filter(
+        Q(email_status=QuoteRequest.EmailStatus.FAILED)
+        | Q(email_status=QuoteRequest.EmailStatus.PENDING, created_at__lt=now - SEND_GRACE)
+        | Q(email_status=QuoteRequest.EmailStatus.SENDING, updated_at__lt=now - SENDING_TIMEOUT),
+        email_attempts__lt=MAX_EMAIL_ATTEMPTS,
+    ).order_by("created_at")
@@ -1,5 +1,9 @@
 class QuoteList:
-    """A simple session-based list for quote requests."""
+    """
+    A simple session-based list for quote requests. Signed-in users' lists
+    are copied to their SavedQuoteList on logout (see save_quote_list), not
+    on every change.
+    """
 
     def __init__(self, request):
         self.session = request.session
@@ -11,10 +15,21 @@ class QuoteList:
     def save(self):
         self.session.modified = True
 
-    def add(self, product, quantity, color=None, size=None):
+    def merge(self, items):
         """
-        Adds a product to the quote list. Color and size are optional.
+        Adds lines from another quote list (e.g. the account's saved one) with
+        a single write. Lines already in this list keep their quantity.
+        Returns the number of lines added.
         """
+        added = 0
+        for item_key, line in items.items():
+            if item_key not in self.quote_list:
+                self.quote_list[item_key] = line
+                added += 1
+        self.save()
+        return added
+
+    def _set(self, product, quantity, color=None, size=None):
         product_id = str(product.id)
         color_id = str(color.id) if color else 'None'
         size_id = str(size.id) if size else 'None'
@@ -29,8 +44,28 @@ class QuoteList:
             'size_id': size.id if size else None,
             'quantity': quantity,
         }
+
+    def add(self, product, quantity, color=None, size=None):
+        """
+        Adds a product to the quote list. Color and size are optional.
+        """
+        self._set(product, quantity, color=color, size=size)
         self.save()
 
+    def add_many(self, items):
+        """
+        Adds several items with a single session write.
+        items: iterable of dicts with 'product', 'quantity' and optional 'color' / 'size'.
+        Returns the number of items added or updated.
+        """
+        count = 0
+        for item in items:
+            self._set(item['product'], item['quantity'], color=item.get('color'), size=item.get('size'))
+            count += 1
+        if count:
+            self.save()
+        return count
+
     def update(self, item_key, quantity):
         """
         Updates the quantity for a specific item.
@@ -96,4 +131,32 @@ class QuoteList:
 
     def clear(self):
         del self.session['quote_list']
-        self.save()
\ No newline at end of file
+        self.quote_list = {}
+        self.save()
+
+
+def merge_saved_quote_list(sender, request, user, **kwargs):
+    """
+    user_logged_in receiver: merges the account's saved quote list into the
+    list built before logging in. The result lives in the session until logout.
+    """
+    from .models import SavedQuoteList
+
+    if request is None or not hasattr(request, 'session'):
+        return
+    saved = SavedQuoteList.objects.filter(user=user).values_list('items', flat=True).first() or {}
+    quote_list = QuoteList(request)
+    if saved or quote_list.quote_list:
+        quote_list.merge(saved)
+
+
+def save_quote_list(sender, request, user, **kwargs):
+    """
+    user_logged_out receiver: keeps the account's quote list for its next
+    login (the session is flushed right after this signal).
+    """
+    from .models import SavedQuoteList
+
+    if user is None or request is None or not hasattr(request, 'session'):
+        return
+    SavedQuoteList.objects.update_or_create(user=user, defaults={'items': request.session.get('quote_list') or {}})
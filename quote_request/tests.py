@@ -0,0 +1,184 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from colors.models import Color
+from portfolio.models import PortfolioProject
+from products.models import Category, Product, Size
+from . import notifications
+from .models import QuoteRequest, SavedQuoteList
+from .views import QUOTE_BATCH_MAX_LINES, QUOTE_MAX_QUANTITY
+
+
+class QuoteTestCase(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Paints")
+        self.product = Product.objects.create(name="Silk Emulsion", description="Interior", category=category)
+        self.newer = Product.objects.create(name="Matt Emulsion", description="Interior", category=category)
+        self.color = Color.objects.create(name="Ocean Breeze", code="OB-202")
+        self.size = Size.objects.create(name="5L")
+
+    def quote_list(self):
+        return self.client.session.get('quote_list') or {}
+
+
+class AddManyToQuoteTests(QuoteTestCase):
+    def post(self, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(reverse('quote_add_many'), body, content_type='application/json')
+
+    def test_rejects_malformed_requests(self):
+        for payload in ('{', '[]', {}, {'items': []}, {'items': [{'product_id': 1}] * (QUOTE_BATCH_MAX_LINES + 1)}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+
+    def test_nothing_is_added_if_a_line_is_invalid(self):
+        response = self.post({'items': [
+            {'product_id': self.product.pk, 'quantity': 2},
+            {'product_id': self.product.pk + 100},
+            {'product_id': self.product.pk, 'color_id': self.color.pk + 1},
+            {'product_id': self.product.pk, 'size_id': 'x'},
+            {'product_id': self.product.pk, 'quantity': 0},
+            'oops',
+            {'product_id': self.product.pk, 'quantity': float('inf')},
+            {'product_id': True},
+            {'product_id': self.product.pk, 'quantity': QUOTE_MAX_QUANTITY + 1},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['line'] for error in errors], [1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertIn(str(QUOTE_MAX_QUANTITY), errors[-1]['message'])
+        self.assertEqual(self.quote_list(), {})
+
+    def test_adds_every_line(self):
+        response = self.post({'items': [
+            {'product_id': self.product.pk, 'color_id': self.color.pk, 'size_id': self.size.pk, 'quantity': 3},
+            {'product_id': self.newer.pk},
+        ]})
+        self.assertEqual(response.json()['quote_item_count'], 2)
+        line = self.quote_list()[f'{self.product.pk}_{self.color.pk}_{self.size.pk}']
+        self.assertEqual(line['quantity'], 3)
+
+    def test_accepts_numeric_string_ids(self):
+        response = self.post({'items': [{'product_id': str(self.product.pk), 'color_id': f' {self.color.pk} '}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'{self.product.pk}_{self.color.pk}_None', self.quote_list())
+
+
+class AddPaletteToQuoteTests(QuoteTestCase):
+    def test_unknown_or_non_numeric_sources_404(self):
+        url = reverse('quote_add_palette')
+        for data in ({}, {'project': 'abc'}, {'idea': '1; drop'}, {'project': '\u00b2'}, {'idea': '\u0663'}, {'project': '999'}, {'idea': '999'}):
+            with self.subTest(data=data):
+                self.assertEqual(self.client.post(url, data).status_code, 404)
+
+    def test_prefers_the_projects_own_products(self):
+        unavailable = Color.objects.create(name="Fern", code="FD-1")
+        self.product.available_colors.add(self.color)
+        self.newer.available_colors.add(self.color)
+        project = PortfolioProject.objects.create(title="Harbour House")
+        project.colors_used.add(self.color, unavailable)
+        project.products_used.add(self.product)
+
+        response = self.client.post(reverse('quote_add_palette'), {'project': project.pk})
+        self.assertRedirects(response, reverse('quote_detail'), fetch_redirect_response=False)
+        self.assertEqual(list(self.quote_list()), [f'{self.product.pk}_{self.color.pk}_None'])
+
+
+class QuoteEmailTests(QuoteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.quote = QuoteRequest.objects.create(name="Wanjiru", email="wanjiru@example.com")
+
+    def test_a_quote_is_emailed_once(self):
+        self.assertTrue(notifications.send_quote_email(self.quote))
+        self.assertFalse(notifications.send_quote_email(self.quote))
+        self.assertEqual(len(mail.outbox), 1)
+        self.quote.refresh_from_db()
+        self.assertEqual((self.quote.email_status, self.quote.email_attempts), (QuoteRequest.EmailStatus.SENT, 1))
+        self.assertEqual(mail.outbox[0].reply_to, ["wanjiru@example.com"])
+
+    def test_resend(self):
+        notifications.send_quote_email(self.quote)
+        self.assertTrue(notifications.send_quote_email(self.quote, resend=True))
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_resend_keeps_the_workflow_status(self):
+        notifications.send_quote_email(self.quote)
+        QuoteRequest.objects.filter(pk=self.quote.pk).update(status=QuoteRequest.Status.QUOTED)
+        self.quote.refresh_from_db()
+        self.assertTrue(notifications.send_quote_email(self.quote, resend=True))
+        self.quote.refresh_from_db()
+        self.assertEqual(self.quote.status, QuoteRequest.Status.QUOTED)
+        self.assertEqual(self.quote.email_status, QuoteRequest.EmailStatus.SENT)
+
+    def test_a_quote_being_sent_is_not_claimed_again(self):
+        QuoteRequest.objects.filter(pk=self.quote.pk).update(email_status=QuoteRequest.EmailStatus.SENDING)
+        self.assertFalse(notifications.claim(self.quote, resend=True))
+        stale = timezone.now() - notifications.SENDING_TIMEOUT - timedelta(minutes=1)
+        QuoteRequest.objects.filter(pk=self.quote.pk).update(updated_at=stale)
+        self.assertTrue(notifications.claim(self.quote))
+
+    def test_failures_are_recorded(self):
+        with mock.patch("django.core.mail.EmailMultiAlternatives.send", side_effect=OSError("SMTP down")):
+            self.assertFalse(notifications.send_quote_email(self.quote))
+        self.quote.refresh_from_db()
+        self.assertEqual((self.quote.email_status, self.quote.last_error), (QuoteRequest.EmailStatus.FAILED, "SMTP down"))
+        self.assertEqual(list(notifications.pending_quotes()), [self.quote])
+
+    def test_pending_quotes(self):
+        old = timezone.now() - notifications.SEND_GRACE - timedelta(minutes=1)
+        waiting = QuoteRequest.objects.create(name="Otieno", email="otieno@example.com")
+        QuoteRequest.objects.filter(pk=waiting.pk).update(created_at=old)
+        QuoteRequest.objects.create(
+            name="Given up", email="x@example.com",
+            email_status=QuoteRequest.EmailStatus.FAILED, email_attempts=notifications.MAX_EMAIL_ATTEMPTS,
+        )
+        # self.quote is PENDING but still inside the grace period
+        self.assertEqual(list(notifications.pending_quotes()), [waiting])
+
+    def test_submit_saves_the_quote_and_sends_in_the_background(self):
+        session = self.client.session
+        session['quote_list'] = {
+            f'{self.product.pk}_None_None': {'product_id': self.product.pk, 'color_id': None, 'size_id': None, 'quantity': 2},
+        }
+        session.save()
+        with mock.patch("quote_request.views.send_in_background") as send:
+            response = self.client.post(reverse('quote_detail'), {'name': 'Amina', 'email': 'amina@example.com'})
+        self.assertEqual(response.status_code, 200)
+        quote = QuoteRequest.objects.get(name='Amina')
+        send.assert_called_once_with(quote)
+        self.assertEqual(quote.items.get().quantity, 2)
+        self.assertEqual(self.quote_list(), {})
+
+
+class SavedQuoteListTests(QuoteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("wanjiru", password="pw")
+
+    def add(self, product, quantity=1):
+        self.client.post(reverse('quote_add'), {'product_id': product.pk, 'quantity': quantity})
+
+    def test_list_is_kept_between_logins(self):
+        self.client.login(username="wanjiru", password="pw")
+        self.add(self.product, 2)
+        self.assertFalse(SavedQuoteList.objects.exists())
+
+        self.client.logout()
+        self.assertEqual(len(SavedQuoteList.objects.get(user=self.user).items), 1)
+        self.assertEqual(self.quote_list(), {})
+
+        # A visitor's list is merged with the saved one; lines already on it keep their quantity
+        self.add(self.product, 5)
+        self.add(self.newer)
+        self.client.login(username="wanjiru", password="pw")
+        quote_list = self.quote_list()
+        self.assertEqual(len(quote_list), 2)
+        self.assertEqual(quote_list[f'{self.product.pk}_None_None']['quantity'], 5)
@@ -6,6 +6,10 @@ from . import views
 urlpatterns = [
     path('', views.quote_detail, name='quote_detail'),
     path('add/', views.add_to_quote, name='quote_add'),
+    path('add-many/', views.add_many_to_quote, name='quote_add_many'),
+    path('add-palette/', views.add_palette_to_quote, name='quote_add_palette'),
     path('remove/', views.remove_from_quote, name='quote_remove'),
     path('update/', views.update_quote, name='quote_update'),
+    path('documents.zip', views.quote_safety_documents, name='quote_documents'),
+    path('<int:quote_id>/documents.zip', views.quote_safety_documents, name='quote_request_documents'),
 ]
\ No newline at end of file
@@ -1,16 +1,30 @@
+import json
+
 from django.shortcuts import render
 
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.contrib import messages
-from products.models import Product, Size
+from products import downloads
+from products.models import Product, SafetyDocument, Size
 from colors.models import Color
+from ideas.models import Idea
+from portfolio.models import PortfolioProject
+from .models import QuoteRequest
+from .notifications import send_in_background
 from .quote import QuoteList  # Our new class
 
+# Most lines accepted by add_many_to_quote in one request
+QUOTE_BATCH_MAX_LINES = 500
+
+# Largest quantity accepted for one batch line (QuoteLineItem.quantity is a 32-bit PositiveIntegerField)
+QUOTE_MAX_QUANTITY = 10000
+
+# Session key listing the quote requests submitted from this session (for their document downloads)
+SUBMITTED_QUOTES_KEY = 'submitted_quote_ids'
+SUBMITTED_QUOTES_MAX = 20
+
 
 @require_POST
 def add_to_quote(request):
@@ -56,63 +70,33 @@ def quote_detail(request):
     quote_list = QuoteList(request)
 
     if request.method == 'POST':
-        name = request.POST.get('name')
-        email = request.POST.get('email')
-        phone = request.POST.get('phone')
-        message = request.POST.get('message')
-
-        items_summary = ""
-        for item in quote_list:
-            # Build string based on what's available
-            details = []
-            if item['color']:
-                details.append(item['color'].name)
-            if item['size']:
-                details.append(item['size'].name)
-
-            details_str = f" ({', '.join(details)})" if details else ""
-
-            items_summary += f"- {item['product'].name}{details_str} x {item['quantity']}\n"
-
-        full_quote_request = (
-            f"New Quote Request from: {name} ({email}, {phone})\n\n"
-            f"Message: {message}\n\n"
-            " TEMS REQUESTED ------------------------------\n"
-            f" {items_summary}"
-        )
-
-        # --- Email Styling Logic ---
-        subject = 'New Quote Request'
-        html_content = render_to_string('quote_request/simple_branded_email.html', {
-            'subject': subject,
-            'content': full_quote_request,
-            'site_name': 'ExtraPaints',
-        })
-        # ---------------------------
+        contact = {
+            'name': (request.POST.get('name') or '').strip(),
+            'email': (request.POST.get('email') or '').strip(),
+            'phone': (request.POST.get('phone') or '').strip(),
+            'message': (request.POST.get('message') or '').strip(),
+        }
+        if not contact['name'] or not contact['email'] or not len(quote_list):
+            messages.error(request, "Please enter your name and email, and add at least one item.")
+            return render(request, 'quote_request/quote_detail.html', {'quote_list': quote_list})
 
+        # Save first: the request is kept even if the email can't be sent right now
+        # (failed sends are retried by the retry_quote_emails command).
         try:
-            msg = EmailMultiAlternatives(
-                subject,
-                full_quote_request,
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.SALES_TEAM_EMAIL],  # Sends to sales team email
-            )
-            msg.attach_alternative(html_content, "text/html")
-            msg.send(fail_silently=False)
-
-            # If the email sends successfully:
-            quote_list.clear()
-            messages.success(request, "Your quote request was successfully sent! We will contact you soon.")
-            return render(request, 'quote_request/quote_submitted.html')
-
+            quote = QuoteRequest.create_from_list(quote_list, user=request.user, **contact)
         except Exception as e:
-            # If the email FAILS to send:
-            print(f"Quote request email error: {e}")
+            print(f"Quote request save error: {e}")
             messages.error(request, "There was an error submitting your quote request. Please try again.")
-
             # IMPORTANT: Re-render the page showing the error message, but KEEP the items
             return render(request, 'quote_request/quote_detail.html', {'quote_list': quote_list})
 
+        quote_list.clear()
+        submitted = request.session.get(SUBMITTED_QUOTES_KEY, [])
+        request.session[SUBMITTED_QUOTES_KEY] = (submitted + [quote.pk])[-SUBMITTED_QUOTES_MAX:]
+        send_in_background(quote)
+        messages.success(request, "Your quote request was successfully sent! We will contact you soon.")
+        return render(request, 'quote_request/quote_submitted.html', {'quote': quote})
+
     return render(request, 'quote_request/quote_detail.html', {'quote_list': quote_list})
 
 @require_POST
@@ -143,4 +127,167 @@ def update_quote(request):
     if item_key:
         quote_list.update(item_key=item_key, quantity=quantity)
 
-    return redirect('quote_detail')
\ No newline at end of file
+    return redirect('quote_detail')
+
+
+def _line_id(value):
+    """
+    The integer id in a request field: a JSON number or, from form-style
+    clients, a numeric string. None for anything else.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+@require_POST
+def add_many_to_quote(request):
+    """
+    AJAX: Adds many lines to the quote list in one request.
+    JSON body: {"items": [{"product_id", "color_id", "size_id", "quantity"}, ...]}
+    (color_id / size_id optional). Each model is validated with one in_bulk
+    query and the session is written once. Nothing is added if a line is invalid.
+    """
+    try:
+        lines = json.loads(request.body or b'{}').get('items')
+    except (ValueError, AttributeError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON.'}, status=400)
+    if not isinstance(lines, list) or not lines:
+        return JsonResponse({'status': 'error', 'message': 'No items to add.'}, status=400)
+    if len(lines) > QUOTE_BATCH_MAX_LINES:
+        return JsonResponse(
+            {'status': 'error', 'message': f'At most {QUOTE_BATCH_MAX_LINES} items per request.'}, status=400
+        )
+
+    def ids(field):
+        return {_line_id(line.get(field)) for line in lines if isinstance(line, dict)} - {None}
+
+    products = Product.objects.in_bulk(ids('product_id'))
+    colors = Color.objects.in_bulk(ids('color_id'))
+    sizes = Size.objects.in_bulk(ids('size_id'))
+
+    items, errors = [], []
+    for index, line in enumerate(lines):
+        if not isinstance(line, dict):
+            errors.append({'line': index, 'message': 'Invalid item.'})
+            continue
+        product = products.get(_line_id(line.get('product_id')))
+        color = colors.get(_line_id(line.get('color_id')))
+        size = sizes.get(_line_id(line.get('size_id')))
+        try:
+            quantity = int(line.get('quantity', 1))
+        except (TypeError, ValueError, OverflowError):
+            # OverflowError: JSON Infinity or 1e400
+            quantity = 0
+
+        if product is None:
+            errors.append({'line': index, 'message': 'Unknown product.'})
+        elif line.get('color_id') is not None and color is None:
+            errors.append({'line': index, 'message': 'Unknown color.'})
+        elif line.get('size_id') is not None and size is None:
+            errors.append({'line': index, 'message': 'Unknown size.'})
+        elif quantity < 1:
+            errors.append({'line': index, 'message': 'Quantity must be at least 1.'})
+        elif quantity > QUOTE_MAX_QUANTITY:
+            errors.append({'line': index, 'message': f'Quantity must be at most {QUOTE_MAX_QUANTITY}.'})
+        else:
+            items.append({'product': product, 'color': color, 'size': size, 'quantity': quantity})
+
+    if errors:
+        return JsonResponse({'status': 'error', 'message': 'Some items are invalid.', 'errors': errors}, status=400)
+
+    quote_list = QuoteList(request)
+    added = quote_list.add_many(items)
+    return JsonResponse({
+        'status': 'success',
+        'message': f'{added} items added to quote list.',
+        'quote_item_count': len(quote_list),
+    })
+
+
+@require_POST
+def add_palette_to_quote(request):
+    """
+    Adds every color of an idea (paint_colors) or portfolio project
+    (colors_used) to the quote list in one go. Each color is paired with a
+    product it is available in, preferring the project's own products_used.
+    """
+    project_id = _line_id(request.POST.get('project', ''))
+    idea_id = _line_id(request.POST.get('idea', ''))
+    if project_id is None and idea_id is None:
+        raise Http404("No such idea or project.")
+
+    if project_id is not None:
+        source = get_object_or_404(PortfolioProject, id=project_id, is_active=True)
+        palette = source.colors_used.filter(is_active=True)
+        preferred = set(source.products_used.values_list('id', flat=True))
+    else:
+        source = get_object_or_404(Idea, id=idea_id, is_active=True)
+        palette = source.paint_colors.filter(is_active=True)
+        preferred = set()
+
+    colors = {color.id: color for color in palette}
+
+    # One query for every (color, product) availability of the palette, newest products first
+    product_for = {}
+    availability = Product.available_colors.through.objects.filter(
+        color_id__in=colors, product__is_active=True
+    ).order_by('-product__created_at').values_list('color_id', 'product_id')
+    for color_id, product_id in availability:
+        if color_id not in product_for or (product_id in preferred and product_for[color_id] not in preferred):
+            product_for[color_id] = product_id
+
+    products = Product.objects.in_bulk(set(product_for.values()))
+    quote_list = QuoteList(request)
+    added = quote_list.add_many(
+        {'product': products[product_id], 'color': colors[color_id], 'quantity': 1}
+        for color_id, product_id in product_for.items()
+    )
+
+    skipped = [colors[color_id].name for color_id in colors if color_id not in product_for]
+    if added:
+        messages.success(request, f"Added {added} colors from \"{source}\" to your quote list.")
+    if skipped:
+        messages.warning(request, f"No product is available in: {', '.join(skipped)}.")
+    return redirect('quote_detail')
+
+
+def quote_safety_documents(request, quote_id=None):
+    """
+    Streams a ZIP with the safety documents (SDS by default, ?type=all for
+    every kind) of all products on the current quote list, or on a submitted
+    quote request made by this user or from this session.
+    """
+    if quote_id is None:
+        product_ids = {line['product_id'] for line in QuoteList(request).quote_list.values()}
+        filename = 'quote-documents.zip'
+    else:
+        quote = get_object_or_404(QuoteRequest, pk=quote_id)
+        allowed = (
+            request.user.is_staff
+            or (request.user.is_authenticated and quote.user_id == request.user.pk)
+            or quote.pk in request.session.get(SUBMITTED_QUOTES_KEY, [])
+        )
+        if not allowed:
+            raise Http404("Quote not found")
+        product_ids = set(quote.items.values_list('product_id', flat=True))
+        filename = f'quote-{quote.pk}-documents.zip'
+
+    documents = SafetyDocument.objects.filter(
+        is_active=True, products__in=product_ids, products__is_active=True
+    ).distinct().order_by('doc_type', 'title')
+    doc_type = request.GET.get('type', 'SDS')
+    if doc_type != 'all':
+        documents = documents.filter(doc_type=doc_type)
+
+    if not product_ids or not documents.exists():
+        messages.warning(request, "There are no documents for the items on this quote.")
+        return redirect('quote_detail')
+    return downloads.zip_response(documents, filename)